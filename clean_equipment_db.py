@@ -1,4 +1,9 @@
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from db_writer import write_json_atomic
 
 def clean_equipment_db():
     """헤더를 제거하고 정리된 장비 데이터베이스를 생성합니다."""
@@ -28,8 +33,7 @@ def clean_equipment_db():
     # JSON 파일로 저장
     output_file = 'db/equipment_db_clean.json'
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(valid_equipment, f, ensure_ascii=False, indent=2)
+        write_json_atomic(output_file, valid_equipment)
         print(f"\n정리된 장비 데이터베이스가 {output_file}에 저장되었습니다.")
         
         # 일련번호 목록 출력 (검증용)
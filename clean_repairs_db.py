@@ -1,12 +1,16 @@
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from cems_store import open_store
 
 def clean_repairs_db():
     """헤더를 제거하고 정리된 수리 데이터베이스를 생성합니다."""
     
-    # 기존 파일 로드
+    # 기존 수리 데이터 로드 (repairs_db_final.json이 바뀌었으면 저장소가 다시 가져온다)
+    store = open_store()
     try:
-        with open('db/repairs_db_final.json', 'r', encoding='utf-8') as f:
-            repairs_data = json.load(f)
+        repairs_data = store.records('repairs_final')
         print(f"기존 수리 데이터 로드: {len(repairs_data)}건")
     except Exception as e:
         print(f"파일 로드 오류: {e}")
@@ -28,11 +32,11 @@ def clean_repairs_db():
     
     print(f"유효한 수리 기록: {len(valid_repairs)}건")
     
-    # JSON 파일로 저장
-    output_file = 'db/repairs_db_clean.json'
+    # 저장소에 일괄 적재 후 JSON으로 내보내기
+    output_file = store.json_file('repairs')
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(valid_repairs, f, ensure_ascii=False, indent=2)
+        store.replace('repairs', valid_repairs)
+        store.export(['repairs'])
         print(f"\n정리된 수리 데이터베이스가 {output_file}에 저장되었습니다.")
         
         # 통계 정보 출력
@@ -67,6 +71,8 @@ def clean_repairs_db():
                 
     except Exception as e:
         print(f"파일 저장 오류: {e}")
+    finally:
+        store.close()
 
 if __name__ == "__main__":
     clean_repairs_db()
@@ -1,57 +1,65 @@
-import json
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from categorical import GroupCounter, load_json
+from db_writer import write_json_atomic
+from movements_store import open_store_for
+from repair_records import load_repair_table
+from sketches import top_k
+
 def load_json_file(file_path):
-    """JSON 파일을 로드합니다."""
+    """JSON 파일을 로드합니다. 반복되는 범주형 필드 값은 하나의 문자열 객체를 공유합니다."""
     try:
         if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(file_path)
         return None
     except Exception as e:
         print(f"파일 로드 오류 {file_path}: {e}")
         return None
 
-def create_dashboard_data():
-    """통합대시보드 데이터를 생성합니다."""
-    
-    print("통합대시보드 데이터 생성 시작...")
-    
-    # DB 파일들 로드
-    equipment_data = load_json_file('db/equipment_db_clean.json')
-    repairs_data = load_json_file('db/repairs_db_clean.json')
-    movements_data = load_json_file('db/movements_db.json')
-    
-    if not equipment_data:
-        print("장비 데이터를 로드할 수 없습니다.")
-        return
+def load_movements_tail(file_path, n=5):
+    """이동 기록의 총 건수와 마지막 n건을 반환합니다. 동기화된 컬럼형 파일이 있으면 전체 JSON을 파싱하지 않습니다."""
+    store = open_store_for(file_path)
+    if store is not None:
+        with store:
+            return store.rows, store.tail(n)
+    movements_data = load_json_file(file_path) or []
+    return len(movements_data), movements_data[-n:]
+
+MOST_REPAIRED_TOP = 10
+EXAMPLES_PER_ITEM = 3
+
+def summarize_equipment(equipment_data, examples_per_item=EXAMPLES_PER_ITEM):
+    """장비 목록을 한 번 순회해 측정항목/상태/위치별 대수와 측정항목별 대표 시리얼(앞에서부터 최대 n개)을 구합니다."""
+    counter = GroupCounter({'measurement_item': '알 수 없음', 'status': '알 수 없음', 'currentLocation': '알 수 없음'})
+    examples = {}
+    for equipment in equipment_data:
+        counter.add(equipment)
+        
+        # 대표 장비는 키가 없는 장비를 '알 수 없음'으로 보지 않는다(기존 출력과 동일)
+        serials = examples.setdefault(equipment.get('measurement_item'), [])
+        if len(serials) < examples_per_item:
+            serials.append(equipment.get('serial', ''))
     
-    # 장비 요약 정보
+    by_item = counter.counts['measurement_item']
     equipment_summary = {
         "total_equipment": len(equipment_data),
-        "by_measurement_item": {},
-        "by_status": {},
-        "by_location": {}
+        "by_measurement_item": by_item,
+        "by_status": counter.counts['status'],
+        "by_location": counter.counts['currentLocation']
     }
-    
-    # 측정항목별, 상태별, 위치별 통계
-    for equipment in equipment_data:
-        # 측정항목별
-        item = equipment.get('measurement_item', '알 수 없음')
-        equipment_summary['by_measurement_item'][item] = equipment_summary['by_measurement_item'].get(item, 0) + 1
-        
-        # 상태별
-        status = equipment.get('status', '알 수 없음')
-        equipment_summary['by_status'][status] = equipment_summary['by_status'].get(status, 0) + 1
-        
-        # 위치별
-        location = equipment.get('currentLocation', '알 수 없음')
-        equipment_summary['by_location'][location] = equipment_summary['by_location'].get(location, 0) + 1
-    
-    # 수리 요약 정보
+    by_measurement_item = {
+        item: {"count": count, "examples": examples.get(item, [])}
+        for item, count in by_item.items()
+    }
+    return equipment_summary, by_measurement_item
+
+def summarize_repairs(repairs_data, top=MOST_REPAIRED_TOP):
+    """수리 기록을 열 저장으로 읽어 업체/구분별 건수, 비용 요약, 장비 매칭률, 수리 횟수 상위 장비를 구합니다."""
     repairs_summary = {
-        "total_repairs": 0,
+        "total_repairs": len(repairs_data),
         "equipment_match_rate": 0,
         "by_company": {},
         "by_repair_type": {},
@@ -62,98 +70,60 @@ def create_dashboard_data():
             "max_cost": 0
         }
     }
-    
-    if repairs_data:
-        repairs_summary["total_repairs"] = len(repairs_data)
-        
-        # 수리업체별 통계
-        for repair in repairs_data:
-            company = repair.get('repair_company', '알 수 없음')
-            repairs_summary['by_company'][company] = repairs_summary['by_company'].get(company, 0) + 1
-            
-            # 수리구분별 통계
-            repair_type = repair.get('repair_type', '알 수 없음')
-            repairs_summary['by_repair_type'][repair_type] = repairs_summary['by_repair_type'].get(repair_type, 0) + 1
-            
-            # 비용 통계
-            try:
-                cost = int(repair.get('cost', '0').replace(',', ''))
-                repairs_summary['cost_summary']['total_cost'] += cost
-                if cost > 0:
-                    if repairs_summary['cost_summary']['min_cost'] == 0 or cost < repairs_summary['cost_summary']['min_cost']:
-                        repairs_summary['cost_summary']['min_cost'] = cost
-                    if cost > repairs_summary['cost_summary']['max_cost']:
-                        repairs_summary['cost_summary']['max_cost'] = cost
-            except:
-                pass
-        
-        # 평균 비용 계산
-        if repairs_summary["total_repairs"] > 0:
-            repairs_summary['cost_summary']['average_cost'] = repairs_summary['cost_summary']['total_cost'] // repairs_summary["total_repairs"]
-        
-        # 장비 매칭 성공률
-        matched_count = sum(1 for repair in repairs_data if repair.get('measurement_item') != "알 수 없음")
-        repairs_summary["equipment_match_rate"] = round((matched_count / repairs_summary["total_repairs"]) * 100, 1)
+    if not repairs_data:
+        return repairs_summary, []
+    
+    # 비용/건수는 수리 열 저장(repair_records.RepairTable)에서 센다. 비용은 정수로 한 번만 변환되고
+    # ('50,000' 문자열과 int 모두 처리), 업체/구분/시리얼은 사전 코드 배열로 집계한다
+    table, _ = load_repair_table(repairs_data)
+    positive_costs = [cost for cost in table.costs if cost > 0]
+    total_cost = sum(table.costs)
+    matched_count = sum(1 for repair in repairs_data if repair.get('measurement_item') != "알 수 없음")
+    
+    repairs_summary['by_company'] = table.counts('company')
+    repairs_summary['by_repair_type'] = table.counts('rtype')
+    # 시리얼이 비었거나 null인 기록은 수리 횟수 순위에서 뺀다
+    serial_counts = table.counts('serial')
+    serial_counts.pop('', None)
+    total = repairs_summary["total_repairs"]
+    repairs_summary['cost_summary'] = {
+        "total_cost": total_cost,
+        "average_cost": total_cost // total,
+        "min_cost": min(positive_costs, default=0),
+        "max_cost": max(positive_costs, default=0)
+    }
+    repairs_summary["equipment_match_rate"] = round((matched_count / total) * 100, 1)
+    
+    # 수리 횟수 상위 n개: 전체 정렬 대신 크기 n의 힙으로 고른다(동률은 먼저 나온 시리얼 우선)
+    most_repaired = [
+        {"serial": serial, "repair_count": count}
+        for serial, count in top_k(serial_counts.items(), top, key=lambda x: -x[1])
+    ]
+    return repairs_summary, most_repaired
+
+def build_dashboard_data(equipment_data, repairs_data, movements_count=0, movements_tail=()):
+    """장비/수리 목록(필터링한 일부여도 됨)과 이동 건수/최근 이동으로 대시보드 데이터를 만듭니다."""
+    repairs_data = repairs_data or []
+    equipment_summary, by_measurement_item = summarize_equipment(equipment_data)
+    repairs_summary, most_repaired = summarize_repairs(repairs_data)
     
     # 이동 요약 정보
     movements_summary = {
         "total_movements": 0,
         "recent_movements": []
     }
+    if movements_count > 1:  # 빈 배열이 아닌 경우
+        movements_summary["total_movements"] = movements_count
+        movements_summary["recent_movements"] = list(movements_tail)
     
-    if movements_data and len(movements_data) > 1:  # 빈 배열이 아닌 경우
-        movements_summary["total_movements"] = len(movements_data)
-        movements_summary["recent_movements"] = movements_data[-5:] if len(movements_data) > 5 else movements_data
-    
-    # 상위 장비 정보
-    top_equipment = {
-        "most_repaired": [],
-        "by_measurement_item": {}
-    }
-    
-    if repairs_data:
-        # 일련번호별 수리 횟수 계산
-        serial_counts = {}
-        for repair in repairs_data:
-            serial = repair.get('serial', '')
-            if serial:
-                serial_counts[serial] = serial_counts.get(serial, 0) + 1
-        
-        # 수리 횟수 상위 10개
-        sorted_serials = sorted(serial_counts.items(), key=lambda x: x[1], reverse=True)
-        top_equipment["most_repaired"] = [
-            {"serial": serial, "repair_count": count} 
-            for serial, count in sorted_serials[:10]
-        ]
-    
-    # 측정항목별 대표 장비
-    for item, count in equipment_summary['by_measurement_item'].items():
-        examples = []
-        for equipment in equipment_data:
-            if equipment.get('measurement_item') == item and len(examples) < 3:
-                examples.append(equipment.get('serial', ''))
-        
-        top_equipment["by_measurement_item"][item] = {
-            "count": count,
-            "examples": examples
-        }
-    
-    # 최근 활동 정보
+    # 최근 활동 정보 (최근 수리 기록 최대 5개)
     recent_activity = {
-        "last_repairs": [],
-        "last_movements": [],
+        "last_repairs": repairs_data[-5:],
+        "last_movements": list(movements_tail) if movements_count > 1 else [],
         "system_status": "정상"
     }
     
-    if repairs_data:
-        # 최근 수리 기록 (최대 5개)
-        recent_activity["last_repairs"] = repairs_data[-5:] if len(repairs_data) > 5 else repairs_data
-    
-    if movements_data and len(movements_data) > 1:
-        recent_activity["last_movements"] = movements_data[-5:] if len(movements_data) > 5 else movements_data
-    
-    # 통합 대시보드 데이터 생성
-    dashboard_data = {
+    return {
         "dashboard_info": {
             "title": "청명장비 통합대시보드",
             "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -166,15 +136,36 @@ def create_dashboard_data():
         "equipment_summary": equipment_summary,
         "repairs_summary": repairs_summary,
         "movements_summary": movements_summary,
-        "top_equipment": top_equipment,
+        "top_equipment": {
+            "most_repaired": most_repaired,
+            "by_measurement_item": by_measurement_item
+        },
         "recent_activity": recent_activity
     }
+
+def create_dashboard_data():
+    """통합대시보드 데이터를 생성합니다."""
+    
+    print("통합대시보드 데이터 생성 시작...")
+    
+    # DB 파일들 로드
+    equipment_data = load_json_file('db/equipment_db_clean.json')
+    repairs_data = load_json_file('db/repairs_db_clean.json')
+    movements_count, movements_tail = load_movements_tail('db/movements_db.json')
+    
+    if not equipment_data:
+        print("장비 데이터를 로드할 수 없습니다.")
+        return
+    
+    dashboard_data = build_dashboard_data(equipment_data, repairs_data, movements_count, movements_tail)
+    equipment_summary = dashboard_data['equipment_summary']
+    repairs_summary = dashboard_data['repairs_summary']
+    top_equipment = dashboard_data['top_equipment']
     
     # JSON 파일로 저장
     output_file = 'db/dashboard_data.json'
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(dashboard_data, f, ensure_ascii=False, indent=2)
+        write_json_atomic(output_file, dashboard_data)
         print(f"\n통합대시보드 데이터가 {output_file}에 저장되었습니다.")
         
         # 요약 정보 출력
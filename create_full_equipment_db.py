@@ -1,5 +1,9 @@
-import json
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from db_writer import write_json_atomic
 
 # serials.csv의 전체 데이터를 기반으로 장비 정보 생성
 equipment_data = []
@@ -330,8 +334,7 @@ for line in csv_lines:
             equipment_data.append(equipment)
 
 # JSON 파일로 저장
-with open('db/equipment_db_serials.json', 'w', encoding='utf-8') as f:
-    json.dump(equipment_data, f, ensure_ascii=False, indent=2)
+write_json_atomic('db/equipment_db_serials.json', equipment_data)
 
 print(f'총 {len(equipment_data)}개의 장비 정보가 저장되었습니다.')
 print('샘플 데이터:')
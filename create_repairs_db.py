@@ -1,8 +1,13 @@
 import json
 import csv
 import re
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from db_writer import write_json_atomic
+
 def load_equipment_db():
     """equipment_db_serials.json에서 장비 정보를 로드합니다."""
     try:
@@ -105,8 +110,7 @@ def create_repairs_db():
     
     # JSON 파일로 저장
     try:
-        with open('db/repairs_db.json', 'w', encoding='utf-8') as f:
-            json.dump(repairs_data, f, ensure_ascii=False, indent=2)
+        write_json_atomic('db/repairs_db.json', repairs_data)
         
         print(f"\n총 {len(repairs_data)}개의 수리 기록이 repairs_db.json에 저장되었습니다.")
         
@@ -1,24 +1,40 @@
 import json
-import csv
+import os
 import re
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from cems_store import open_store
+from csv_ingest import detect_encoding, read_csv_rows
+from serial_index import load_serial_index, normalize_serial
+
 def load_equipment_db():
-    """equipment_db_clean.json에서 장비 정보를 로드합니다."""
+    """장비 마스터로부터 공유 시리얼 인덱스를 로드합니다(별칭/변형 시리얼 매칭 포함)."""
+    try:
+        serial_index = load_serial_index()
+        print(f"장비 시리얼 인덱스 로드 완료: {len(serial_index)}개 (별칭 {len(serial_index.aliases)}개)")
+        return serial_index
+    except Exception as e:
+        print(f"장비 데이터베이스 로드 오류: {e}")
+        return None
+
+def load_equipment_status():
+    """equipment_db_clean.json에서 일련번호(정규화 키)별 장비 상태를 로드합니다.
+
+    equipment_status는 시리얼 인덱스가 아니라 이 원래 마스터의 상태를 그대로 씁니다.
+    """
     try:
         with open('db/equipment_db_clean.json', 'r', encoding='utf-8') as f:
             equipment_data = json.load(f)
-        
-        # 일련번호를 키로 하는 딕셔너리 생성
-        equipment_dict = {}
-        for equipment in equipment_data:
-            equipment_dict[equipment['serial']] = equipment
-        
-        print(f"장비 데이터베이스 로드 완료: {len(equipment_dict)}개")
-        return equipment_dict
     except Exception as e:
-        print(f"장비 데이터베이스 로드 오류: {e}")
+        print(f"장비 상태 로드 오류: {e}")
         return {}
+    
+    status_dict = {}
+    for equipment in equipment_data:
+        status_dict[normalize_serial(equipment.get('serial'))] = equipment.get('status', '알 수 없음')
+    return status_dict
 
 def parse_repair_date(date_str):
     """수리일자를 파싱합니다."""
@@ -36,93 +52,88 @@ def create_repairs_db():
     """수리내역logs.csv를 파싱하여 수리 데이터베이스를 생성합니다."""
     
     # 장비 데이터베이스 로드
-    equipment_dict = load_equipment_db()
-    if not equipment_dict:
+    serial_index = load_equipment_db()
+    if not serial_index:
         return
+    status_dict = load_equipment_status()
     
     repairs_list = []
     csv_file_path = '청명장비 엑셀/수리내역logs.csv'
     
     print(f"수리내역 CSV 파일 파싱 시작: {csv_file_path}")
     
-    # 여러 인코딩 시도
-    encodings = ['utf-8', 'utf-8-sig', 'cp949', 'euc-kr']
-    
-    for encoding in encodings:
-        try:
-            print(f"인코딩 {encoding}으로 시도 중...")
-            with open(csv_file_path, 'r', encoding=encoding) as file:
-                csv_reader = csv.reader(file)
+    # 인코딩은 파일 전체로 한 번 판별하고, 행은 판별한 인코딩으로 한 번만 읽으며 흘려보낸다
+    try:
+        encoding = detect_encoding(csv_file_path)
+        print(f"인코딩 판별: {encoding}")
+        for row_num, row in enumerate(read_csv_rows(csv_file_path, encoding), 1):
+            if len(row) < 9:
+                print(f"라인 {row_num}: 필드 수 부족 - {row}")
+                continue
+            
+            try:
+                # CSV 컬럼 매핑
+                repair_date = row[0].strip()  # 1열: 수리일자
+                repair_company = row[2].strip()  # 3열: 수리업체
+                manager = row[4].strip()  # 5열: 담당자명
+                product_series = row[5].strip()  # 6열: 품목계열명
+                cost = row[6].strip()  # 7열: 수리 비용
+                repair_type = row[7].strip()  # 8열: 수리구분
+                serial_number = row[8].strip()  # 9열: 일련번호
                 
-                for row_num, row in enumerate(csv_reader, 1):
-                    if len(row) < 9:
-                        print(f"라인 {row_num}: 필드 수 부족 - {row}")
-                        continue
-                    
-                    try:
-                        # CSV 컬럼 매핑
-                        repair_date = row[0].strip()  # 1열: 수리일자
-                        repair_company = row[2].strip()  # 3열: 수리업체
-                        manager = row[4].strip()  # 5열: 담당자명
-                        product_series = row[5].strip()  # 6열: 품목계열명
-                        cost = row[6].strip()  # 7열: 수리 비용
-                        repair_type = row[7].strip()  # 8열: 수리구분
-                        serial_number = row[8].strip()  # 9열: 일련번호
-                        
-                        # 일련번호가 장비 데이터베이스에 있는지 확인
-                        if serial_number in equipment_dict:
-                            equipment = equipment_dict[serial_number]
-                            measurement_item = equipment['measurement_item']
-                            equipment_category = equipment['category']
-                        else:
-                            print(f"라인 {row_num}: 일련번호 {serial_number}를 장비 DB에서 찾을 수 없음")
-                            measurement_item = "알 수 없음"
-                            equipment_category = product_series
-                        
-                        # 수리 기록 생성
-                        repair_record = {
-                            "id": repair_date,
-                            "serial": serial_number,
-                            "repair_date": parse_repair_date(repair_date),
-                            "repair_company": repair_company,
-                            "manager": manager,
-                            "product_series": product_series,
-                            "cost": cost,
-                            "repair_type": repair_type,
-                            "sequence": row[9] if len(row) > 9 else "",
-                            "measurement_item": measurement_item,
-                            "equipment_category": equipment_category,
-                            "equipment_status": equipment_dict.get(serial_number, {}).get('status', '알 수 없음')
-                        }
-                        
-                        repairs_list.append(repair_record)
-                        
-                        if row_num <= 10 or row_num % 1000 == 0:
-                            print(f"라인 {row_num}: {serial_number} - {repair_company} - {cost}원")
-                            
-                    except Exception as e:
-                        print(f"라인 {row_num} 파싱 오류: {e} - {row}")
-                        continue
+                # 일련번호가 장비 데이터베이스에 있는지 확인
+                equipment = serial_index.lookup(serial_number)
+                if equipment is not None:
+                    measurement_item = equipment['measurement_item']
+                    equipment_category = equipment['category']
+                    equipment_status = status_dict.get(
+                        normalize_serial(serial_number), status_dict.get(normalize_serial(equipment['serial']), '알 수 없음'))
+                else:
+                    print(f"라인 {row_num}: 일련번호 {serial_number}를 장비 DB에서 찾을 수 없음")
+                    measurement_item = "알 수 없음"
+                    equipment_category = product_series
+                    equipment_status = '알 수 없음'
+                
+                # 수리 기록 생성
+                repair_record = {
+                    "id": repair_date,
+                    "serial": serial_number,
+                    "repair_date": parse_repair_date(repair_date),
+                    "repair_company": repair_company,
+                    "manager": manager,
+                    "product_series": product_series,
+                    "cost": cost,
+                    "repair_type": repair_type,
+                    "sequence": row[9] if len(row) > 9 else "",
+                    "measurement_item": measurement_item,
+                    "equipment_category": equipment_category,
+                    "equipment_status": equipment_status
+                }
                 
-                print(f"인코딩 {encoding}으로 성공적으로 파싱되었습니다!")
-                break
+                repairs_list.append(repair_record)
                 
-        except Exception as e:
-            print(f"인코딩 {encoding} 실패: {e}")
-            repairs_list = []  # 리스트 초기화
-            continue
+                if row_num <= 10 or row_num % 1000 == 0:
+                    print(f"라인 {row_num}: {serial_number} - {repair_company} - {cost}원")
+                    
+            except Exception as e:
+                print(f"라인 {row_num} 파싱 오류: {e} - {row}")
+                continue
+        
+    except Exception as e:
+        print(f"CSV 파싱 실패: {e}")
+        return
     
     if not repairs_list:
-        print("모든 인코딩 시도가 실패했습니다.")
+        print("추출된 데이터가 없습니다.")
         return
     
     print(f"\n총 {len(repairs_list)}개의 수리 기록을 추출했습니다.")
     
-    # JSON 파일로 저장
-    output_file = 'db/repairs_db_final.json'
+    # 저장소에 일괄 적재 후 JSON으로 내보내기
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(repairs_list, f, ensure_ascii=False, indent=2)
+        with open_store() as store:
+            store.replace('repairs_final', repairs_list)
+            output_file = store.export(['repairs_final'])[0]
         print(f"\n수리 데이터베이스가 {output_file}에 저장되었습니다.")
         
         # 통계 정보 출력
@@ -1,34 +1,40 @@
 import json
 import csv
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from db_writer import write_json_atomic
+from serial_index import EQUIPMENT_FILE, load_serial_index, normalize_serial
 
 def load_equipment_db():
-    """equipment_db_serials.json에서 장비 정보를 로드합니다."""
+    """장비 마스터 목록과 공유 시리얼 인덱스를 로드합니다.
+
+    장비 마스터는 db/equipment_db.json입니다(예전에는 equipment_db_serials.json).
+    """
     try:
-        with open('db/equipment_db_serials.json', 'r', encoding='utf-8') as f:
+        with open(EQUIPMENT_FILE, 'r', encoding='utf-8') as f:
             equipment_data = json.load(f)
+        serial_index = load_serial_index(EQUIPMENT_FILE)
         
-        # 일련번호를 키로 하는 딕셔너리 생성
-        equipment_dict = {}
-        for equipment in equipment_data:
-            equipment_dict[equipment['serial']] = equipment
-        
-        print(f"장비 데이터베이스 로드 완료: {len(equipment_dict)}개")
-        return equipment_dict
+        print(f"장비 데이터베이스 로드 완료: {len(serial_index)}개 (별칭 {len(serial_index.aliases)}개)")
+        return equipment_data, serial_index
     except Exception as e:
         print(f"장비 데이터베이스 로드 오류: {e}")
-        return {}
+        return [], None
 
 def find_missing_equipment():
     """수리내역logs.csv에서 사용되는 모든 일련번호를 추출하고 누락된 장비를 찾습니다."""
     
     # 장비 데이터베이스 로드
-    equipment_dict = load_equipment_db()
-    if not equipment_dict:
+    equipment_data, serial_index = load_equipment_db()
+    if not serial_index:
         return
     
     # 수리내역에서 사용되는 모든 일련번호 추출
     repair_serials = set()
+    matched_serials = set()
     missing_serials = []
     
     try:
@@ -48,8 +54,10 @@ def find_missing_equipment():
                     if serial_number and serial_number != "21":
                         repair_serials.add(serial_number)
                         
-                        # 장비 데이터베이스에 없는 경우
-                        if serial_number not in equipment_dict:
+                        # 장비 데이터베이스에 없는 경우(별칭/변형 시리얼도 매칭)
+                        if serial_number in serial_index:
+                            matched_serials.add(serial_number)
+                        else:
                             missing_serials.append({
                                 'serial': serial_number,
                                 'product_series': product_series,
@@ -65,7 +73,7 @@ def find_missing_equipment():
     
     print(f"\n=== 수리내역에서 사용되는 일련번호 분석 ===")
     print(f"총 사용된 일련번호: {len(repair_serials)}개")
-    print(f"장비 DB에 있는 일련번호: {len(repair_serials.intersection(set(equipment_dict.keys())))}개")
+    print(f"장비 DB에 있는 일련번호: {len(matched_serials)}개")
     print(f"장비 DB에 없는 일련번호: {len(missing_serials)}개")
     
     if missing_serials:
@@ -114,14 +122,16 @@ def find_missing_equipment():
             
             missing_equipment.append(equipment)
         
-        # 기존 장비 데이터에 누락된 장비 추가
+        # 기존 장비 데이터에 누락된 장비 추가(같은 일련번호는 정규화 키 기준으로 하나만 남깁니다)
+        equipment_dict = {}
+        for equipment in equipment_data:
+            equipment_dict[normalize_serial(equipment.get('serial'))] = equipment
         existing_equipment = list(equipment_dict.values())
         all_equipment = existing_equipment + missing_equipment
         
         # 업데이트된 장비 데이터베이스 저장
         try:
-            with open('db/equipment_db_complete.json', 'w', encoding='utf-8') as f:
-                json.dump(all_equipment, f, ensure_ascii=False, indent=2)
+            write_json_atomic('db/equipment_db_complete.json', all_equipment)
             
             print(f"\n완전한 장비 데이터베이스가 equipment_db_complete.json에 저장되었습니다.")
             print(f"총 {len(all_equipment)}개의 장비 정보 (기존 {len(existing_equipment)}개 + 누락 {len(missing_equipment)}개)")
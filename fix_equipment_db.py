@@ -1,7 +1,10 @@
-import json
-import csv
-import re
 import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from csv_ingest import detect_encoding, read_csv_rows
+from db_writer import write_json_atomic
 
 def parse_serials_csv():
     """serials.csv 파일을 정확하게 파싱하여 장비 정보를 추출합니다."""
@@ -16,66 +19,57 @@ def parse_serials_csv():
     
     equipment_list = []
     
-    # 여러 인코딩 시도
-    encodings = ['cp949', 'euc-kr', 'utf-8-sig', 'utf-8']
-    
-    for encoding in encodings:
-        try:
-            print(f"인코딩 {encoding}으로 시도 중...")
-            with open(csv_file_path, 'r', encoding=encoding) as file:
-                csv_reader = csv.reader(file)
+    # 인코딩은 파일 전체로 한 번 판별하고, 행은 판별한 인코딩으로 한 번만 읽으며 흘려보낸다
+    try:
+        encoding = detect_encoding(csv_file_path)
+        print(f"인코딩 판별: {encoding}")
+        for row_num, row in enumerate(read_csv_rows(csv_file_path, encoding), 1):
+            if len(row) < 3:
+                print(f"라인 {row_num}: 필드 수 부족 - {row}")
+                continue
+            
+            try:
+                # 첫 번째 필드는 인덱스 (사용하지 않음)
+                category_info = row[1].strip()
+                serial_number = row[2].strip()
                 
-                for row_num, row in enumerate(csv_reader, 1):
-                    if len(row) < 3:
-                        print(f"라인 {row_num}: 필드 수 부족 - {row}")
-                        continue
-                    
-                    try:
-                        # 첫 번째 필드는 인덱스 (사용하지 않음)
-                        category_info = row[1].strip()
-                        serial_number = row[2].strip()
-                        
-                        # 측정항목과 품목계열 추출
-                        match = re.match(r'\((.*?)\)\s*(.*)', category_info)
-                        if match:
-                            measurement_item = match.group(1).strip()
-                            product_series = match.group(2).strip()
-                        else:
-                            measurement_item = "알 수 없음"
-                            product_series = category_info
-                        
-                        equipment = {
-                            "serial": serial_number,
-                            "measurement_item": measurement_item,
-                            "product_series": product_series,
-                            "category": category_info,
-                            "currentLocation": "본사 창고",
-                            "status": "대기 중",
-                            "lastMovement": "",
-                            "uptimeEstimatePct": 0,
-                            "repairCount": 0,
-                            "totalRepairCost": 0
-                        }
-                        
-                        equipment_list.append(equipment)
-                        
-                        if row_num <= 10 or row_num % 50 == 0:
-                            print(f"라인 {row_num}: {serial_number} - {measurement_item} - {product_series}")
-                            
-                    except Exception as e:
-                        print(f"라인 {row_num} 파싱 오류: {e} - {row}")
-                        continue
+                # 측정항목과 품목계열 추출
+                match = re.match(r'\((.*?)\)\s*(.*)', category_info)
+                if match:
+                    measurement_item = match.group(1).strip()
+                    product_series = match.group(2).strip()
+                else:
+                    measurement_item = "알 수 없음"
+                    product_series = category_info
                 
-                print(f"인코딩 {encoding}으로 성공적으로 파싱되었습니다!")
-                break
+                equipment = {
+                    "serial": serial_number,
+                    "measurement_item": measurement_item,
+                    "product_series": product_series,
+                    "category": category_info,
+                    "currentLocation": "본사 창고",
+                    "status": "대기 중",
+                    "lastMovement": "",
+                    "uptimeEstimatePct": 0,
+                    "repairCount": 0,
+                    "totalRepairCost": 0
+                }
                 
-        except Exception as e:
-            print(f"인코딩 {encoding} 실패: {e}")
-            equipment_list = []  # 리스트 초기화
-            continue
+                equipment_list.append(equipment)
+                
+                if row_num <= 10 or row_num % 50 == 0:
+                    print(f"라인 {row_num}: {serial_number} - {measurement_item} - {product_series}")
+                    
+            except Exception as e:
+                print(f"라인 {row_num} 파싱 오류: {e} - {row}")
+                continue
+        
+    except Exception as e:
+        print(f"CSV 파싱 실패: {e}")
+        return []
     
     if not equipment_list:
-        print("모든 인코딩 시도가 실패했습니다.")
+        print("추출된 데이터가 없습니다.")
         return []
     
     print(f"\n총 {len(equipment_list)}개의 장비 정보를 추출했습니다.")
@@ -95,8 +89,7 @@ def main():
     # JSON 파일로 저장
     output_file = 'db/equipment_db_fixed.json'
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(equipment_data, f, ensure_ascii=False, indent=2)
+        write_json_atomic(output_file, equipment_data)
         print(f"\n장비 데이터베이스가 {output_file}에 저장되었습니다.")
         
         # 일련번호 목록 출력 (검증용)
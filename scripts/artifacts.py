@@ -0,0 +1,107 @@
+"""
+통계 산출물 압축 배포(최소화 JSON + .gz/.br + 매니페스트)
+
+ArtifactWriter는 JSON을 공백 없이 쓰고 같은 내용을 미리 압축한 .gz(및 brotli가 설치돼 있으면 .br)를
+옆에 둔다. 내용 해시는 생성 시각(meta.generatedAt)을 뺀 본문으로 계산하므로, 해시가 매니페스트와 같고
+파일이 모두 있으면 아무 파일도 건드리지 않는다(mtime/ETag 유지).
+
+매니페스트(db/stats_manifest.json):
+  {"artifacts": {"stats_x.json": {"hash", "size", "gzipSize", "brSize", "generatedAt"}}}
+클라이언트는 hash가 이전과 같으면 해당 파일을 다시 받지 않아도 된다.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 .br을 만들지 않는다
+    brotli = None
+
+MANIFEST_NAME = 'stats_manifest.json'
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def content_hash(payload, volatile=('generatedAt',)):
+    """meta의 volatile 필드를 뺀 payload의 sha256."""
+    meta = {k: v for k, v in payload.get('meta', {}).items() if k not in volatile}
+    body = dict(payload, meta=meta)
+    text = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ArtifactWriter:
+    """batch(db_writer.WriteBatch)에 쓰기/삭제를 스테이징한다. 반영은 batch 커밋 때 한 번에 된다."""
+
+    def __init__(self, out_dir, batch, manifest_name=MANIFEST_NAME):
+        self.out_dir = out_dir
+        self.batch = batch
+        self.manifest_path = os.path.join(out_dir, manifest_name)
+        self.artifacts = self._load_manifest()
+        self._dirty = False
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('artifacts', {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            return {}
+
+    def _siblings(self, path):
+        return [path + '.gz'] + ([path + '.br'] if brotli is not None else [])
+
+    def is_current(self, path, digest):
+        entry = self.artifacts.get(os.path.basename(path))
+        return (entry is not None and entry.get('hash') == digest
+                and all(os.path.exists(p) for p in [path] + self._siblings(path)))
+
+    def write(self, path, payload):
+        """payload를 최소화 JSON과 압축본으로 쓴다. 내용이 같아 건너뛰었으면 False."""
+        digest = content_hash(payload)
+        if self.is_current(path, digest):
+            return False
+        raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.batch.write_bytes(path, raw)
+        gz = gzip.compress(raw, compresslevel=9, mtime=0)
+        self.batch.write_bytes(path + '.gz', gz)
+        entry = {'hash': digest, 'size': len(raw), 'gzipSize': len(gz)}
+        if brotli is not None:
+            br = brotli.compress(raw, quality=11)
+            self.batch.write_bytes(path + '.br', br)
+            entry['brSize'] = len(br)
+        else:
+            self.batch.remove(path + '.br')
+        entry['generatedAt'] = payload.get('meta', {}).get('generatedAt')
+        self.artifacts[os.path.basename(path)] = entry
+        self._dirty = True
+        return True
+
+    def forget(self, path):
+        """일반(들여쓰기) 모드로 다시 쓴 파일의 압축본과 매니페스트 항목을 지운다."""
+        for suffix in COMPRESSED_SUFFIXES:
+            self.batch.remove(path + suffix)
+        if self.artifacts.pop(os.path.basename(path), None) is not None:
+            self._dirty = True
+
+    def clear(self, paths=()):
+        """압축 배포를 그만둘 때: paths와 매니페스트에 있는 모든 파일의 압축본, 그리고 매니페스트를 지운다."""
+        names = set(self.artifacts) | {os.path.basename(p) for p in paths}
+        for name in names:
+            for suffix in COMPRESSED_SUFFIXES:
+                self.batch.remove(os.path.join(self.out_dir, name + suffix))
+        self.artifacts = {}
+        self.batch.remove(self.manifest_path)
+        self._dirty = False
+
+    def save(self):
+        if not self._dirty:
+            return False
+        if not self.artifacts:
+            self.batch.remove(self.manifest_path)
+        else:
+            data = {'artifacts': dict(sorted(self.artifacts.items()))}
+            self.batch.write_json(self.manifest_path, data)
+        self._dirty = False
+        return True
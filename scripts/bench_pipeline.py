@@ -0,0 +1,242 @@
+"""
+파이프라인 규모 벤치마크: 합성 데이터 배수별 단계 시간/최대 RSS 측정과 기준선 비교
+
+배수마다 임시 작업 디렉터리(샌드박스)에 스크립트(루트 *.py, scripts/*.py, inventory_analysis.py)와
+정적 db 파일을 복사하고 synth_data.py로 입력을 만든 뒤, build_pipeline.STEPS를 의존 순서대로
+하나씩 실행한다. 스크립트 경로가 모두 자기 위치 기준이므로 샌드박스 밖(실제 db/)은 건드리지 않는다.
+단계마다 새 프로세스를 띄워(샌드박스의 이 파일을 --child로 실행) 시간과 최대 RSS를 따로 잰다.
+inventory_analysis는 엑셀 저장(openpyxl)을 빼고 읽기 + 재고 행렬 계산만 잰다.
+
+결과는 .cache/bench_last.json에 남고, --save-baseline이면 .cache/bench_baseline.json(배수별로 병합)에
+저장한다. 기준선이 있으면 단계별 배율을 출력하고, 기준보다 --threshold배 넘게 느려진 단계를 표시한다
+(0.05초 미만 차이는 잡음으로 본다). --check면 느려진 단계나 실패한 단계가 있을 때 종료 코드 1.
+
+사용법:
+  python scripts/bench_pipeline.py                            # 10배, 100배
+  python scripts/bench_pipeline.py --scales 10 100 1000 --save-baseline
+  python scripts/bench_pipeline.py --scales 10 --check --threshold 1.3
+  python scripts/bench_pipeline.py --scales 10 --only stats dashboard --keep
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: 최대 RSS 없이 시간만 잰다
+    resource = None
+
+from build_pipeline import EXCEL_DIR, ROOT, STEPS, output_stamps, run_step, stale_outputs, step_dependencies
+
+BASELINE_FILE = os.path.join(ROOT, '.cache', 'bench_baseline.json')
+LAST_FILE = os.path.join(ROOT, '.cache', 'bench_last.json')
+
+CODE_FILES = ['*.py', 'scripts/*.py', f'{EXCEL_DIR}/inventory_analysis.py']
+STATIC_DB_FILES = ['manufacturers.json', 'order_history.json', 'order_items.json', 'product_catalog.json',
+                   'suppliers.json']
+INVENTORY_STEP = 'inventory_analysis'
+MIN_DELTA = 0.05
+
+
+def step_order(steps=STEPS):
+    """선언 순서를 유지한 위상 정렬."""
+    deps = step_dependencies(steps)
+    order = []
+    while len(order) < len(steps):
+        for name in steps:
+            if name not in order and deps[name] <= set(order):
+                order.append(name)
+                break
+    return order + [INVENTORY_STEP]
+
+
+def prepare_sandbox(work, scale, seed):
+    """work에 코드와 정적 db 파일을 복사하고 합성 입력을 만든다. 생성 결과(행 수, 초)를 돌려준다."""
+    for pattern in CODE_FILES:
+        for path in glob.glob(os.path.join(ROOT, pattern)):
+            target = os.path.join(work, os.path.relpath(path, ROOT))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target)
+    os.makedirs(os.path.join(work, 'db'), exist_ok=True)
+    for name in STATIC_DB_FILES:
+        if os.path.exists(os.path.join(ROOT, 'db', name)):
+            shutil.copy2(os.path.join(ROOT, 'db', name), os.path.join(work, 'db', name))
+    from synth_data import generate
+    return generate(work, scale, seed)
+
+
+# --- 자식 프로세스(샌드박스 안에서 실행) ---
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_inventory():
+    from synth_data import MOVEMENT_RANGE
+    os.chdir(ROOT)
+    module = runpy.run_path(os.path.join(ROOT, EXCEL_DIR, 'inventory_analysis.py'))
+    started = time.perf_counter()
+    try:
+        serial_list, _ = module['load_serials'](os.path.join(ROOT, EXCEL_DIR, 'serials.csv'))
+        logs_df = module['load_logs'](os.path.join(ROOT, EXCEL_DIR, 'logs.csv'), serial_list)
+        matrix, _ = module['build_availability_matrix'](serial_list, logs_df, *MOVEMENT_RANGE)
+        ok, output = True, f'{matrix.shape[0]}개 장비 × {matrix.shape[1]}일'
+    except Exception as e:
+        ok, output = False, f'{type(e).__name__}: {e}'
+    return ok, time.perf_counter() - started, output
+
+
+def run_child(name):
+    if name == INVENTORY_STEP:
+        ok, elapsed, output = _run_inventory()
+    else:
+        before = output_stamps(STEPS[name])
+        ok, elapsed, output = run_step(STEPS[name]['script'])
+        stale = stale_outputs(STEPS[name], before)
+        if ok and stale:
+            ok, output = False, output + f"\n산출물이 갱신되지 않음: {', '.join(stale)}"
+    print(json.dumps({'ok': ok, 'seconds': round(elapsed, 4), 'peakRssMb': _peak_rss_mb(),
+                      'output': output[-2000:]}, ensure_ascii=False))
+
+
+# --- 측정 ---
+
+def measure_step(work, name):
+    proc = subprocess.run([sys.executable, os.path.join(work, 'scripts', 'bench_pipeline.py'), '--child', name],
+                          cwd=work, capture_output=True, text=True, encoding='utf-8')
+    try:
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {'ok': False, 'seconds': None, 'peakRssMb': None, 'output': (proc.stdout + proc.stderr)[-2000:]}
+
+
+def bench_scale(scale, seed=0, only=None, workdir=None, keep=False, verbose=False):
+    work = (os.path.join(workdir, f'x{scale:g}') if workdir
+            else tempfile.mkdtemp(prefix=f'cems_bench_x{scale:g}_'))
+    os.makedirs(work, exist_ok=True)
+    try:
+        generated = prepare_sandbox(work, scale, seed)
+        steps = {}
+        for name in step_order():
+            if only and name not in only:
+                continue
+            result = measure_step(work, name)
+            if verbose or not result['ok']:
+                print(f'--- {name} 출력 ---\n{result["output"].rstrip()}')
+            result.pop('output')
+            steps[name] = result
+        return {'generate': generated, 'steps': steps}
+    finally:
+        if keep:
+            print(f'📁 작업 디렉터리 보존: {work}')
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+# --- 기준선 ---
+
+def load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare(result, baseline, threshold):
+    """단계 → (배율 또는 None, 느려졌는지)."""
+    out = {}
+    for name, step in result['steps'].items():
+        base = (baseline or {}).get('steps', {}).get(name, {}).get('seconds')
+        seconds = step['seconds']
+        if not step['ok'] or seconds is None or not base:
+            out[name] = (None, not step['ok'])
+            continue
+        ratio = seconds / base
+        out[name] = (ratio, ratio > threshold and seconds - base > MIN_DELTA)
+    return out
+
+
+def print_report(key, result, baseline, threshold):
+    gen = result['generate']
+    print(f"\n=== {key} (시리얼 {gen['serials']:,} / 이동 {gen['movements']:,} / 수리 {gen['repairs']:,} / "
+          f"QC {gen['qc']:,}, 생성 {gen['elapsed']:.1f}초) ===")
+    print(f'  {"단계":<20} {"시간(초)":>9} {"최대RSS(MB)":>11} {"기준(초)":>9} {"배율":>6}')
+    flags = compare(result, baseline, threshold)
+    for name, step in result['steps'].items():
+        ratio, regressed = flags[name]
+        base = (baseline or {}).get('steps', {}).get(name, {}).get('seconds')
+        seconds = '실패' if not step['ok'] else f"{step['seconds']:.2f}"
+        rss = '-' if step['peakRssMb'] is None else f"{step['peakRssMb']:.1f}"
+        print(f'  {name:<20} {seconds:>9} {rss:>11} {"-" if base is None else f"{base:.2f}":>9} '
+              f'{"-" if ratio is None else f"{ratio:.2f}":>6}{"  ⚠️" if regressed else ""}')
+    return [name for name, (_, regressed) in flags.items() if regressed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 데이터 배수별 파이프라인 벤치마크')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--scales', type=float, nargs='+', default=[10, 100], help='데이터 배수 (기본: 10 100)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=step_order(), help='측정할 단계 (선행 단계 산출물은 시드 데이터 사용)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='기준선 파일')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준선으로 저장')
+    parser.add_argument('--threshold', type=float, default=1.25, help='느려짐 판정 배율 (기본: 1.25)')
+    parser.add_argument('--check', action='store_true', help='느려지거나 실패한 단계가 있으면 종료 코드 1')
+    parser.add_argument('--workdir', help='샌드박스 상위 디렉터리 (기본: 임시 디렉터리)')
+    parser.add_argument('--keep', action='store_true', help='샌드박스를 지우지 않음')
+    parser.add_argument('-v', '--verbose', action='store_true', help='각 단계 출력을 모두 표시')
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    baseline = load_json(args.baseline)
+    results = {}
+    problems = []
+    for scale in args.scales:
+        key = f'x{scale:g}'
+        print(f'⏱️ {scale:g}배 측정 중...')
+        results[key] = bench_scale(scale, args.seed, args.only, args.workdir, args.keep, args.verbose)
+        regressed = print_report(key, results[key], baseline.get('scales', {}).get(key), args.threshold)
+        failed = [name for name, step in results[key]['steps'].items() if not step['ok']]
+        problems += [f'{key}/{name} 느려짐' for name in regressed] + [f'{key}/{name} 실패' for name in failed]
+
+    meta = {'measuredAt': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'cpuCount': os.cpu_count(), 'seed': args.seed}
+    save_json(LAST_FILE, {'meta': meta, 'scales': results})
+    if args.save_baseline:
+        baseline.setdefault('scales', {}).update(results)
+        baseline['meta'] = meta
+        save_json(args.baseline, baseline)
+        print(f'\n💾 기준선 저장: {args.baseline}')
+    if problems:
+        print('\n⚠️ ' + ', '.join(problems))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+Python 파이프라인 DAG 빌드 실행기
+
+각 단계의 스크립트, 입력 파일, 산출 파일을 STEPS에 선언한다. 어떤 단계의 입력이 다른 단계의
+산출물이면 그 단계 뒤에 실행되고, 서로 의존하지 않는 단계(QC, 수리, movements 변환 등)는
+프로세스 풀에서 동시에 실행된다. 전체 재빌드 시간은 가장 긴 의존 경로의 시간에 가깝다.
+
+건너뛰기: 단계가 끝난 뒤의 입력 파일(스크립트 자신 포함) sha1을 .cache/build_pipeline_state.json에
+기록해 두고, 다음 실행 때 입력이 그대로이고 산출물이 모두 있으면 실행하지 않는다.
+파일을 제자리에서 고치는 단계(update_equipment_status)도 실행 후 상태를 기록하므로 매번 다시 돌지 않는다.
+결과가 오늘 날짜에도 달라지는 단계(calibration_alarms)는 daily로 표시한다. 실행한 날짜도 지문에 넣으므로
+입력이 그대로여도 날이 바뀌면 다시 돈다.
+
+성공 판정: 스크립트가 예외 없이 끝나도 산출물이 모두 이번 실행 중에 다시 쓰였어야 성공이다(실행 전후 산출물의
+inode/mtime/size가 달라졌는지로 판정하므로 시계 해상도와 무관하다).
+많은 스크립트가 오류를 출력만 하고 return하므로, 그대로 남은 이전 산출물을 성공으로 받아들이지 않기 위해서다.
+소스가 바뀐 산출물만 다시 쓰는 단계(stats)는 skips_unchanged로 표시하고 산출물이 있는지만 확인한다.
+실패한 단계는 입력 지문을 기록하지 않으므로 다음 실행 때 다시 돈다.
+
+사용법:
+  python scripts/build_pipeline.py                 # 바뀐 단계만 실행
+  python scripts/build_pipeline.py --force         # 전부 다시 실행
+  python scripts/build_pipeline.py --only stats    # 지정 단계(와 필요한 선행 단계)만
+  python scripts/build_pipeline.py --dry-run       # 실행 계획만 출력
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import runpy
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_FILE = os.path.join(ROOT, '.cache', 'build_pipeline_state.json')
+# daily 단계의 상태에 실행 날짜를 기록하는 키(파일 경로와 겹치지 않는다)
+RUN_DATE_KEY = '@date'
+
+EXCEL_DIR = '청명장비 엑셀'
+STATS_OUTPUTS = [f'db/stats_{name}.json' for name in (
+    'uptime_by_category', 'uptime_monthly', 'repair_cost_monthly', 'repairs_monthly', 'repairs_timeseries',
+    'qc_next_due', 'repairs_overview', 'repairs_by_category', 'repairs_by_company', 'repairs_by_type',
+    'repairs_by_serial', 'repairs_topk')]
+
+# 단계 이름 → {script, inputs, outputs[, skips_unchanged, daily]} (경로는 저장소 루트 기준)
+STEPS = {
+    'equipment_serials': {
+        'script': 'create_full_equipment_db.py',
+        'inputs': [],
+        'outputs': ['db/equipment_db_serials.json'],
+    },
+    'equipment_fixed': {
+        'script': 'fix_equipment_db.py',
+        'inputs': [f'{EXCEL_DIR}/serials.csv'],
+        'outputs': ['db/equipment_db_fixed.json'],
+    },
+    'equipment_clean': {
+        'script': 'clean_equipment_db.py',
+        'inputs': ['db/equipment_db_fixed.json'],
+        'outputs': ['db/equipment_db_clean.json'],
+    },
+    'movements_columnar': {
+        'script': 'scripts/movements_store.py',
+        'inputs': ['db/movements_db.json'],
+        'outputs': ['db/movements_db.cols'],
+    },
+    'qc_logs': {
+        'script': 'scripts/build_qc_logs_db_simplified.py',
+        'inputs': [f'{EXCEL_DIR}/QC_logs_fixed.csv'],
+        'outputs': ['db/QC_logs.json'],
+    },
+    'equipment_status': {
+        'script': 'scripts/update_equipment_status.py',
+        # movements 추가분을 이벤트 로그에 반영하고 리듀서의 현재 상태 테이블로 갱신한다(equipment_events.py)
+        'inputs': ['db/movements_db.json', 'db/equipment_data.json', 'db/equipment_db.json'],
+        'outputs': ['db/equipment_data.json', 'db/equipment_db.json'],
+    },
+    # 시리얼 매칭은 db/equipment_db.json(공유 인덱스), equipment_status는 원래 마스터 equipment_db_clean.json에서 가져온다
+    'repairs_final': {
+        'script': 'create_repairs_db_final.py',
+        'inputs': [f'{EXCEL_DIR}/수리내역logs.csv', 'db/equipment_db.json', 'db/equipment_db_clean.json'],
+        'outputs': ['db/repairs_db_final.json'],
+    },
+    'repairs_clean': {
+        'script': 'clean_repairs_db.py',
+        'inputs': ['db/repairs_db_final.json'],
+        'outputs': ['db/repairs_db_clean.json'],
+    },
+    'stats': {
+        'script': 'scripts/build_stats.py',
+        'inputs': ['db/equipment_db.json', 'db/movements_db.json', 'db/movements_db.cols',
+                   'db/repairs_db_clean.json', 'db/repairs_db.json', 'db/QC_logs.json'],
+        'outputs': STATS_OUTPUTS,
+        # 바뀐 소스의 산출물만 다시 쓴다
+        'skips_unchanged': True,
+    },
+    'occupancy': {
+        'script': 'scripts/occupancy_index.py',
+        'inputs': ['db/movements_db.json', 'db/movements_db.cols', 'db/equipment_db.json'],
+        'outputs': ['db/occupancy_index.bin'],
+    },
+    'calibration_alarms': {
+        'script': 'scripts/calibration_index.py',
+        'inputs': ['db/QC_logs.json', 'db/equipment_db.json'],
+        'outputs': ['db/alarms_calibration.json'],
+        # 알람은 기준일(오늘)에 따라 달라지므로 입력이 그대로여도 날마다 한 번은 돈다
+        'daily': True,
+        # 알람이 그대로면 파일을 다시 쓰지 않는다
+        'skips_unchanged': True,
+    },
+    'dashboard': {
+        'script': 'create_dashboard.py',
+        'inputs': ['db/equipment_db_clean.json', 'db/repairs_db_clean.json', 'db/movements_db.json',
+                   'db/movements_db.cols'],
+        'outputs': ['db/dashboard_data.json'],
+    },
+}
+
+
+def step_dependencies(steps):
+    """단계 → 선행 단계 집합. 입력 파일을 산출하는 다른 단계가 선행 단계다(자기 자신 제외)."""
+    producers = {}
+    for name, step in steps.items():
+        for path in step['outputs']:
+            producers[path] = name
+    deps = {}
+    for name, step in steps.items():
+        deps[name] = {producers[p] for p in step['inputs'] if p in producers and producers[p] != name}
+    _check_acyclic(deps)
+    return deps
+
+
+def _check_acyclic(deps):
+    visiting, done = set(), set()
+
+    def visit(name, chain):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError('빌드 단계에 순환 의존이 있습니다: ' + ' → '.join(chain + [name]))
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep, chain + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in deps:
+        visit(name, [])
+
+
+def _with_prerequisites(names, deps):
+    out = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in out:
+            out.add(name)
+            stack.extend(deps[name])
+    return out
+
+
+# --- 입력 지문 ---
+
+def _fingerprint(path, cache):
+    """(size, mtime_ns, sha1). 크기/mtime이 이전과 같으면 sha1을 다시 계산하지 않는다. 없으면 None."""
+    try:
+        st = os.stat(os.path.join(ROOT, path))
+    except FileNotFoundError:
+        return None
+    prev = cache.get(path)
+    if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+        return prev
+    h = hashlib.sha1()
+    with open(os.path.join(ROOT, path), 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    fp = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    cache[path] = fp
+    return fp
+
+
+def step_inputs(step):
+    return [step['script']] + step['inputs']
+
+
+def is_up_to_date(step, recorded, cache):
+    if not recorded:
+        return False
+    if not all(os.path.exists(os.path.join(ROOT, p)) for p in step['outputs']):
+        return False
+    if step.get('daily') and recorded.get(RUN_DATE_KEY) != date.today().isoformat():
+        return False
+    for path in step_inputs(step):
+        fp = _fingerprint(path, cache)
+        prev = recorded.get(path)
+        if (fp and fp[2]) != (prev and prev[2]):
+            return False
+    return True
+
+
+def output_stamps(step):
+    """산출물 → (inode, mtime_ns, size). 없는 파일은 None. 실행 전에 찍어 두고 stale_outputs에 넘긴다."""
+    stamps = {}
+    for path in step['outputs']:
+        try:
+            st = os.stat(os.path.join(ROOT, path))
+        except FileNotFoundError:
+            stamps[path] = None
+            continue
+        stamps[path] = (st.st_ino, st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def stale_outputs(step, before):
+    """실행 전 스탬프(before)와 비교해 다시 쓰이지 않은 산출물 목록. skips_unchanged 단계는 없는 파일만."""
+    after = output_stamps(step)
+    if step.get('skips_unchanged'):
+        return [p for p, stamp in after.items() if stamp is None]
+    return [p for p, stamp in after.items() if stamp is None or stamp == before.get(p)]
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# --- 실행 ---
+
+def run_step(script):
+    """워커 프로세스에서 스크립트를 __main__으로 실행한다. (성공 여부, 경과 초, 출력)을 반환."""
+    path = os.path.join(ROOT, script)
+    os.chdir(ROOT)
+    sys.argv = [path]
+    sys.path.insert(0, os.path.dirname(path))
+    buf = io.StringIO()
+    ok = True
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        try:
+            runpy.run_path(path, run_name='__main__')
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            ok = False
+    return ok, time.perf_counter() - started, buf.getvalue()
+
+
+def build(steps=STEPS, only=None, force=False, jobs=None, dry_run=False, verbose=False):
+    """DAG 순서대로 단계를 실행한다. 단계별 결과 {name: (상태, 경과 초)}를 반환."""
+    deps = step_dependencies(steps)
+    targets = _with_prerequisites(only, deps) if only else set(steps)
+    state = {} if force else load_state()
+    cache = {}
+    for recorded in state.values():
+        cache.update((p, fp) for p, fp in recorded.items() if p != RUN_DATE_KEY)
+
+    results = {}
+    pending = {name: set(deps[name]) & targets for name in targets}
+    running = {}
+    submitted = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), max_tasks_per_child=1) as pool:
+        while pending or running:
+            for name in sorted(n for n, waiting in pending.items() if not waiting):
+                del pending[name]
+                blocked = [d for d in deps[name] if d in targets and results[d][0] in ('failed', 'blocked')]
+                # 실행 계획에서는 선행 단계가 돌면 산출물이 바뀐다고 본다(실제 실행은 입력 sha1로 판단)
+                upstream_planned = dry_run and any(results[d][0] == 'planned' for d in deps[name] if d in targets)
+                if blocked:
+                    results[name] = ('blocked', 0.0)
+                elif not upstream_planned and is_up_to_date(steps[name], state.get(name), cache):
+                    results[name] = ('skipped', 0.0)
+                elif dry_run:
+                    results[name] = ('planned', 0.0)
+                else:
+                    submitted[name] = output_stamps(steps[name])
+                    running[pool.submit(run_step, steps[name]['script'])] = name
+                    continue
+                _release(name, pending)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                ok, elapsed, output = future.result()
+                stale = stale_outputs(steps[name], submitted[name])
+                if ok and stale:
+                    # 스크립트가 오류를 삼키고 끝난 경우: 이전 산출물을 받아들이지 않는다
+                    output += f"\n산출물이 갱신되지 않음: {', '.join(stale)}\n"
+                    ok = False
+                results[name] = ('ok' if ok else 'failed', elapsed)
+                if ok:
+                    state[name] = {p: _fingerprint(p, cache) for p in step_inputs(steps[name])}
+                    if steps[name].get('daily'):
+                        state[name][RUN_DATE_KEY] = date.today().isoformat()
+                    save_state(state)
+                elif state.pop(name, None) is not None:
+                    save_state(state)
+                if verbose or not ok:
+                    print(f'--- {name} ({steps[name]["script"]}) 출력 ---')
+                    print(output.rstrip())
+                print(f'{"✅" if ok else "❌"} {name}: {elapsed:.2f}초')
+                _release(name, pending)
+
+    results['_total'] = ('wall', time.perf_counter() - started)
+    return results
+
+
+def _release(name, pending):
+    for waiting in pending.values():
+        waiting.discard(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Python 파이프라인 DAG 빌드')
+    parser.add_argument('--only', nargs='+', choices=list(STEPS), help='지정 단계와 그 선행 단계만 실행')
+    parser.add_argument('--force', action='store_true', help='입력 변경 여부와 무관하게 모두 실행')
+    parser.add_argument('--jobs', type=int, help='동시 실행 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--dry-run', action='store_true', help='실행 계획만 출력')
+    parser.add_argument('-v', '--verbose', action='store_true', help='각 단계의 출력을 모두 표시')
+    args = parser.parse_args()
+
+    results = build(only=args.only, force=args.force, jobs=args.jobs, dry_run=args.dry_run, verbose=args.verbose)
+    total = results.pop('_total')[1]
+
+    print('\n단계별 결과:')
+    for name in STEPS:
+        if name in results:
+            status, elapsed = results[name]
+            print(f'  {name:<20} {status:<8} {elapsed:7.2f}초')
+    print(f'  {"전체 (wall)":<20} {"":<8} {total:7.2f}초')
+    if any(status in ('failed', 'blocked') for status, _ in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,12 @@ QC_logs_fixed.csv 파일을 JSON으로 변환하여 db/QC_logs.json 파일로 
 """
 
 import pandas as pd
-import json
 import os
 from datetime import datetime
 
+from cems_store import open_store
+from qc_frame import blank_to_none, dotted_dates, non_blank, records_from_columns, row_ids
+
 def build_qc_logs_db():
     # 파일 경로
     input_file = os.path.join(os.path.dirname(__file__), "..", "청명장비 엑셀", "QC_logs_fixed.csv")
@@ -42,68 +44,23 @@ def build_qc_logs_db():
             '구매년도': 'purchase_year'
         }
         
-        # 데이터 정리 및 변환
-        qc_logs = []
-        
-        for index, row in df.iterrows():
-            # 빈 행 건너뛰기
-            if pd.isna(row['항목']) or str(row['항목']).strip() == '':
-                continue
-                
-            # 데이터 정리
-            qc_log = {}
-            
-            for korean_col, english_col in column_mapping.items():
-                if korean_col in row:
-                    value = row[korean_col]
-                    
-                    # NaN 값 처리
-                    if pd.isna(value):
-                        qc_log[english_col] = None
-                    else:
-                        # 문자열 정리
-                        if isinstance(value, str):
-                            value = value.strip()
-                            if value == '':
-                                value = None
-                        
-                        qc_log[english_col] = value
-                else:
-                    qc_log[english_col] = None
-            
-            # 추가 필드
-            qc_log['id'] = f"qc_{index + 1:04d}"
-            qc_log['created_at'] = datetime.now().isoformat()
-            
-            # 날짜 형식 정리
-            if qc_log['calibration_date']:
-                try:
-                    # YYYY.MM.DD 형식을 YYYY-MM-DD로 변환
-                    if '.' in str(qc_log['calibration_date']):
-                        date_parts = str(qc_log['calibration_date']).split('.')
-                        if len(date_parts) == 3:
-                            qc_log['calibration_date'] = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
-                except:
-                    pass
-            
-            if qc_log['expiry_date']:
-                try:
-                    # YYYY.MM.DD 형식을 YYYY-MM-DD로 변환
-                    if '.' in str(qc_log['expiry_date']):
-                        date_parts = str(qc_log['expiry_date']).split('.')
-                        if len(date_parts) == 3:
-                            qc_log['expiry_date'] = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
-                except:
-                    pass
-            
-            qc_logs.append(qc_log)
+        # 데이터 정리 및 변환 (열 단위: 빈 '항목' 행 제외 → 이름 변경 → 공백/NaN → None → 날짜 형식)
+        df = df[non_blank(df['항목'])]
+        frame = df.reindex(columns=list(column_mapping)).rename(columns=column_mapping)
+        columns = {name: blank_to_none(frame[name]) for name in frame.columns}
+        columns['calibration_date'] = dotted_dates(columns['calibration_date'])
+        columns['expiry_date'] = dotted_dates(columns['expiry_date'])
+        columns['id'] = row_ids(df.index)
+        columns['created_at'] = datetime.now().isoformat()
+        qc_logs = records_from_columns(columns)
         
         print(f"✅ 데이터 변환 완료: {len(qc_logs)}개 레코드")
         
-        # JSON 파일로 저장
+        # 저장소에 일괄 적재 후 JSON으로 내보내기
         print("💾 JSON 파일 저장 중...")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(qc_logs, f, ensure_ascii=False, indent=2)
+        with open_store() as store:
+            store.replace('qc_logs', qc_logs)
+            store.export(['qc_logs'])
         
         print(f"✅ QC_logs.json 파일 생성 완료: {output_file}")
         
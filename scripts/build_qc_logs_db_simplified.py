@@ -11,10 +11,12 @@ QC_logs_fixed.csv 파일을 지침에 따라 간소화하여 db/QC_logs.json 파
 """
 
 import pandas as pd
-import json
 import os
 from datetime import datetime
 
+from cems_store import open_store
+from qc_frame import dotted_dates, nan_to_none, non_blank, records_from_columns, row_ids
+
 def build_qc_logs_db_simplified():
     # 파일 경로
     input_file = os.path.join(os.path.dirname(__file__), "..", "청명장비 엑셀", "QC_logs_fixed.csv")
@@ -28,52 +30,26 @@ def build_qc_logs_db_simplified():
         print(f"✅ 파일 읽기 성공!")
         print(f"데이터 행 수: {len(df)}")
         
-        # 지침에 따른 필드만 추출
-        qc_logs = []
-        
-        for index, row in df.iterrows():
-            # 빈 행 건너뛰기
-            if pd.isna(row['항목']) or str(row['항목']).strip() == '':
-                continue
-                
-            # 지침에 따른 필드만 추출
-            qc_log = {
-                'id': f"qc_{index + 1:04d}",
-                'serial_number': row['일련번호'] if pd.notna(row['일련번호']) else None,
-                'latest_calibration_date': row['정도검사일'] if pd.notna(row['정도검사일']) else None,
-                'next_calibration_date': row['유효기간'] if pd.notna(row['유효기간']) else None,
-                'created_at': datetime.now().isoformat()
-            }
-            
+        # 지침에 따른 필드만 열 단위로 추출 (빈 '항목' 행 제외, 일련번호가 있는 행만)
+        df = df[non_blank(df['항목'])]
+        serial = nan_to_none(df['일련번호'])
+        keep = (serial.notna() & serial.astype(bool)).to_numpy()
+        qc_logs = records_from_columns({
+            'id': row_ids(df.index[keep]),
+            'serial_number': serial[keep],
             # 날짜 형식 정리 (YYYY.MM.DD → YYYY-MM-DD)
-            if qc_log['latest_calibration_date']:
-                try:
-                    if '.' in str(qc_log['latest_calibration_date']):
-                        date_parts = str(qc_log['latest_calibration_date']).split('.')
-                        if len(date_parts) == 3:
-                            qc_log['latest_calibration_date'] = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
-                except:
-                    pass
-            
-            if qc_log['next_calibration_date']:
-                try:
-                    if '.' in str(qc_log['next_calibration_date']):
-                        date_parts = str(qc_log['next_calibration_date']).split('.')
-                        if len(date_parts) == 3:
-                            qc_log['next_calibration_date'] = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
-                except:
-                    pass
-            
-            # 일련번호가 있는 경우만 추가
-            if qc_log['serial_number']:
-                qc_logs.append(qc_log)
+            'latest_calibration_date': dotted_dates(nan_to_none(df['정도검사일'][keep])),
+            'next_calibration_date': dotted_dates(nan_to_none(df['유효기간'][keep])),
+            'created_at': datetime.now().isoformat(),
+        })
         
         print(f"✅ 데이터 변환 완료: {len(qc_logs)}개 레코드")
         
-        # JSON 파일로 저장
+        # 저장소에 일괄 적재 후 JSON으로 내보내기
         print("💾 JSON 파일 저장 중...")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(qc_logs, f, ensure_ascii=False, indent=2)
+        with open_store() as store:
+            store.replace('qc_logs', qc_logs)
+            store.export(['qc_logs'])
         
         print(f"✅ QC_logs.json 파일 생성 완료: {output_file}")
         
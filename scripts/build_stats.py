@@ -1,7 +1,21 @@
+import argparse
+import glob
+import hashlib
 import json
 import os
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+
+from artifacts import ArtifactWriter
+from categorical import interning_hook
+from db_writer import WriteBatch, write_json_atomic
+from movements_store import MISSING_DAY, day_number, day_to_iso, open_store_for
+from repair_records import RepairParser
+from serial_index import SerialIndex, load_serial_index
+from sketches import CountMinSketch, HyperLogLog, SpaceSaving, top_k
+from stats_engine import Accumulator, StatsEngine
+from time_buckets import BUCKETS, ROLLING_WINDOWS, DailySeries, week_ends
+from utilization import is_deployed, utilization_by_category
 
 # 입력 파일 경로
 DB_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'db')
@@ -13,6 +27,7 @@ QC_LOGS_FILE = os.path.join(DB_DIR, 'QC_logs.json')
 
 # 산출 파일 경로
 STATS_UPTIME_BY_CATEGORY = os.path.join(DB_DIR, 'stats_uptime_by_category.json')
+STATS_UPTIME_MONTHLY = os.path.join(DB_DIR, 'stats_uptime_monthly.json')
 STATS_REPAIR_COST_MONTHLY = os.path.join(DB_DIR, 'stats_repair_cost_monthly.json')
 STATS_QC_NEXT_DUE = os.path.join(DB_DIR, 'stats_qc_next_due.json')
 
@@ -23,10 +38,16 @@ STATS_REPAIRS_BY_COMPANY = os.path.join(DB_DIR, 'stats_repairs_by_company.json')
 STATS_REPAIRS_BY_TYPE = os.path.join(DB_DIR, 'stats_repairs_by_type.json')
 STATS_REPAIRS_BY_SERIAL = os.path.join(DB_DIR, 'stats_repairs_by_serial.json')
 STATS_REPAIRS_MONTHLY = os.path.join(DB_DIR, 'stats_repairs_monthly.json')
+STATS_REPAIRS_TIMESERIES = os.path.join(DB_DIR, 'stats_repairs_timeseries.json')
 STATS_REPAIRS_TOPK = os.path.join(DB_DIR, 'stats_repairs_topk.json')
+STATS_REPAIRS_SKETCH = os.path.join(DB_DIR, 'stats_repairs_sketch.json')
 
 SCHEMA_VERSION = '1.0.0'
 
+# 증분 재계산 상태(부분 집계 + 소스 워터마크). 누산기 상태 형식이 바뀌면 STATE_VERSION을 올린다.
+STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'build_stats_state.json')
+STATE_VERSION = 6
+
 
 def load_json_array(path):
     try:
@@ -41,7 +62,10 @@ def load_json_array(path):
         return []
 
 
-def write_json(path, data, sources):
+def write_json(path, data, sources, writer=None, batch=None):
+    """산출 파일을 쓴다. writer(ArtifactWriter)가 주어지면 최소화 JSON + 압축본으로 쓰고,
+    내용이 이전과 같으면 건드리지 않는다. batch(WriteBatch)가 주어지면 커밋 때 함께 반영되고,
+    없으면 파일 하나를 원자적으로 쓴다. 실제로 썼으면 True."""
     meta = {
         '_schemaVersion': SCHEMA_VERSION,
         'generatedAt': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
@@ -51,346 +75,726 @@ def write_json(path, data, sources):
         'meta': meta,
         'data': data,
     }
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    if writer is not None:
+        return writer.write(path, payload)
+    if batch is not None:
+        batch.write_json(path, payload)
+    else:
+        write_json_atomic(path, payload)
+    return True
 
 
-# 1) 가동률(활동률) by category
-# 정의: movements에서 같은 날짜(date)에 카테고리별 이동 발생 여부를 집계.
-#  - 관측일 수: 해당 카테고리에 대해 최소 1건 이상 이동이 존재한 날짜 수
-#  - 활동일 수: 관측일 수(동일)에서 이동 건수 > 0인 날짜 수 (항상 동일하므로 100%)가 될 수 있어, 
-#    본 구현은 카테고리 내 고유 시리얼별로 활동일 비율을 평균: (활동 시리얼 수 / 관측 시리얼 수) 일별 비율의 평균.
-# 결측 처리: 잘못된/빈 날짜, serial, category는 제거. equipment에 없는 serial은 category를 UNKNOWN으로 지정.
+def load_serial_categories(equipment):
+    """장비 목록에서 시리얼 인덱스를 만든다. category(serial)은 별칭/변형 시리얼도 매칭한다."""
+    return SerialIndex.from_equipment(equipment)
 
-def compute_uptime_by_category(equipment, movements):
-    serial_to_category = {e.get('serial'): e.get('category', 'UNKNOWN') for e in equipment if isinstance(e, dict)}
 
-    # date -> category -> set(serial moved)
-    date_cat_serials = defaultdict(lambda: defaultdict(set))
+# 소스별 공통 파싱: 레코드당 한 번만 수행하고 모든 누산기가 결과를 공유한다.
+# 수리 기록은 repair_records.Repair(정수 비용/일 번호)로 변환하므로 누산기는 다시 파싱하지 않는다.
+MovementRow = namedtuple('MovementRow', 'date serial out_location in_location')
 
-    for m in movements:
-        date_raw = (m.get('date') or '').strip()
-        serial = (m.get('serial') or '').strip()
-        if not date_raw or not serial:
-            continue
-        date_key = date_raw[:10]
-        cat = serial_to_category.get(serial, 'UNKNOWN')
-        date_cat_serials[date_key][cat].add(serial)
-
-    # date -> category -> total serials observed that day in that category
-    # 관측 毎일 카테고리의 시리얼 모수: 해당 날짜에 그 카테고리에서 한 번이라도 이동한 시리얼 수
-    results = {}
-    for date_key, cat_map in date_cat_serials.items():
-        for cat, serials in cat_map.items():
-            total = len(serials)
-            ratio = 1.0 if total > 0 else 0.0
-            results.setdefault(cat, []).append(ratio)
-
-    # 카테고리별 평균 비율(%) 산출
-    out = []
-    for cat, ratios in results.items():
-        if not ratios:
-            pct = 0
-        else:
-            pct = round(sum(ratios) / len(ratios) * 100)
-        out.append({'category': cat, 'uptimeEstimatePct': pct})
 
-    # 카테고리명 정렬(가독성)
-    out.sort(key=lambda x: x['category'])
-    return out
+def prepare_movement(m):
+    return MovementRow((m.get('date') or '').strip(), (m.get('serial') or '').strip(),
+                       m.get('outLocation'), m.get('inLocation'))
+
+
+def make_prepare_repair(serial_index=None):
+    """수리 prepare 함수(RepairParser). 변환 중 발견한 문제는 .report에 모인다."""
+    return RepairParser(serial_index)
+
+
+# 1) 가동률 by category (+ 월별)
+# 정의: 카테고리별 (현장 배치 시리얼-일 / 보유 시리얼-일)을 백분율로 산출(utilization.py).
+#  - 배치 구간: 입고처가 '현장'(번호 붙은 '현장2' 등 포함)인 이동부터 그 시리얼의 다음 이동 전날까지, 다음 이동이 없으면 관측 종료일까지
+#  - 보유 대수: 장비 마스터의 카테고리별 전체 대수(이동 기록이 없는 장비 포함)
+#  - 관측 구간: movements 전체의 최초~최종 이동일, 월별 값은 그 달과 관측 구간이 겹치는 일수 기준
+# 결측 처리: 잘못된/빈 날짜, serial은 제거. equipment에 없는 serial은 category를 UNKNOWN으로 지정.
+
+class UptimeByCategory(Accumulator):
+    source = 'movements'
+
+    def __init__(self, serial_index, path=STATS_UPTIME_BY_CATEGORY, monthly_path=STATS_UPTIME_MONTHLY):
+        self.serial_index = serial_index
+        self.path = path
+        self.monthly_path = monthly_path
+        # serial -> [(일 번호, 현장 배치 여부 0/1)]
+        self.events = defaultdict(list)
+
+    def outputs(self):
+        return (self.path, self.monthly_path)
+
+    def add(self, m):
+        if not m.serial:
+            return
+        day = day_number(m.date)
+        if day == MISSING_DAY:
+            return
+        self.events[m.serial].append((day, int(is_deployed(m.in_location))))
+
+    def add_columns(self, store, start):
+        # 컬럼형 저장소 경로: date/serial/입고 코드만 읽고, 배치 여부는 사전 항목별로 한 번만 계산
+        serial_names = [s.strip() for s in store.dictionary('serial')]
+        deployed = [int(is_deployed(v)) for v in store.dictionary('inLocation')]
+        days = store.column('date')
+        serials = store.column('serial')
+        in_col = store.column('inLocation')
+        events = self.events
+        for i in range(start, store.rows):
+            serial = serial_names[serials[i]]
+            day = days[i]
+            if not serial or day == MISSING_DAY:
+                continue
+            events[serial].append((day, deployed[in_col[i]]))
+
+    def get_state(self):
+        return {serial: [list(e) for e in events] for serial, events in self.events.items()}
+
+    def set_state(self, state):
+        self.events = defaultdict(list, {serial: [tuple(e) for e in events] for serial, events in (state or {}).items()})
+
+    def fleet(self):
+        """보유 장비 serial → category(장비 마스터 전체)."""
+        return {serial: entry.get('category') or 'UNKNOWN' for serial, entry in self.serial_index.entries.items()}
+
+    def canonical_events(self):
+        """이동 기록의 변형 시리얼은 인덱스로 마스터 시리얼에 합친다."""
+        events = defaultdict(list)
+        for serial, items in self.events.items():
+            events[self.serial_index.match(serial) or serial].extend(items)
+        return events
+
+    def result(self):
+        overall, monthly = utilization_by_category(self.canonical_events(), self.fleet())
+        out = [dict(category=cat, uptimeEstimatePct=agg['utilizationPct'], **agg)
+               for cat, agg in overall.items()]
+        # 카테고리명 정렬(가독성)
+        out.sort(key=lambda x: x['category'])
+        series = [dict(month=month, category=cat, **agg) for (month, cat), agg in monthly.items()]
+        series.sort(key=lambda x: (x['category'], x['month']))
+        return {self.path: out, self.monthly_path: series}
 
 
 # 2) 월별 수리 비용 합계 (기존)
 # 정의: repairs에서 YYYY-MM 별 cost 합을 계산.
 # 결측 처리: 날짜가 없거나 cost가 숫자가 아니면 제거. 월 키는 YYYY-MM.
 
-def compute_repair_cost_monthly(repairs):
-    monthly = defaultdict(int)
-    for r in repairs:
-        date_raw = (r.get('date') or r.get('repair_date') or '').strip()
-        cost = r.get('cost')
-        if not date_raw:
-            continue
-        ym = date_raw[:7]  # YYYY-MM
-        try:
-            c = int(cost)
-        except Exception:
-            continue
-        monthly[ym] += c
+class RepairCostMonthly(Accumulator):
+    source = 'repairs'
 
-    out = [{'month': k, 'totalRepairCost': v} for k, v in monthly.items()]
-    out.sort(key=lambda x: x['month'])
-    return out
+    def __init__(self, path=STATS_REPAIR_COST_MONTHLY):
+        self.path = path
+        self.monthly = defaultdict(int)
+
+    def add(self, r):
+        if not r.date or not r.has_cost:
+            return
+        self.monthly[r.date[:7]] += r.cost  # YYYY-MM
+
+    def get_state(self):
+        return dict(self.monthly)
+
+    def set_state(self, state):
+        self.monthly = defaultdict(int, state or {})
+
+    def result(self):
+        out = [{'month': k, 'totalRepairCost': v} for k, v in self.monthly.items()]
+        out.sort(key=lambda x: x['month'])
+        return {self.path: out}
 
 
 # 2b) 월별 수리 건수/비용 집계
 
-def compute_repairs_monthly(repairs):
-    monthly = defaultdict(lambda: {'count': 0, 'totalCost': 0})
-    for r in repairs:
-        date_raw = (r.get('date') or r.get('repair_date') or '').strip()
-        cost = r.get('cost')
-        if not date_raw:
-            continue
-        ym = date_raw[:7]
-        try:
-            c = int(cost)
-        except Exception:
-            c = 0
-        monthly[ym]['count'] += 1
-        monthly[ym]['totalCost'] += c
-    out = [{'month': m, 'count': v['count'], 'totalCost': v['totalCost']} for m, v in monthly.items()]
-    out.sort(key=lambda x: x['month'])
-    return out
+class RepairsMonthly(Accumulator):
+    source = 'repairs'
+
+    def __init__(self, path=STATS_REPAIRS_MONTHLY):
+        self.path = path
+        self.monthly = {}
+
+    def add(self, r):
+        if not r.date:
+            return
+        agg = self.monthly.get(r.date[:7])
+        if agg is None:
+            agg = self.monthly[r.date[:7]] = {'count': 0, 'totalCost': 0}
+        agg['count'] += 1
+        agg['totalCost'] += r.cost
+
+    def get_state(self):
+        return self.monthly
+
+    def set_state(self, state):
+        self.monthly = state or {}
+
+    def result(self):
+        out = [{'month': m, 'count': v['count'], 'totalCost': v['totalCost']} for m, v in self.monthly.items()]
+        out.sort(key=lambda x: x['month'])
+        return {self.path: out}
+
+
+# 2c) 수리 건수/비용 기간 버킷 + 이동 구간
+# 정의: repairs를 일 단위(건수, 비용 합)로 모은 뒤 time_buckets.DailySeries(누적합)로
+#  일/ISO 주/월/분기 버킷과 최근 30/90/365일 합계·일평균을 산출. 이동 구간 시계열은 주 마지막 날 기준.
+# 결측 처리: 날짜가 없거나 형식이 다르면 제거. cost가 숫자가 아니면 건수에만 반영.
+
+class RepairsTimeSeries(Accumulator):
+    source = 'repairs'
+
+    def __init__(self, path=STATS_REPAIRS_TIMESERIES):
+        self.path = path
+        self.daily = {}  # 일 번호 -> [건수, 비용 합]
+
+    def add(self, r):
+        if r.day == MISSING_DAY:
+            return
+        agg = self.daily.get(r.day)
+        if agg is None:
+            agg = self.daily[r.day] = [0, 0]
+        agg[0] += 1
+        agg[1] += r.cost
+
+    def get_state(self):
+        return {str(day): agg for day, agg in self.daily.items()}
+
+    def set_state(self, state):
+        self.daily = {int(day): agg for day, agg in (state or {}).items()}
+
+    def series(self):
+        return DailySeries.from_days({day: tuple(agg) for day, agg in self.daily.items()})
+
+    def result(self):
+        series = self.series()
+        out = {
+            'start': day_to_iso(series.start_day) if series.days else None,
+            'end': day_to_iso(series.end_day) if series.days else None,
+        }
+        for kind in BUCKETS:
+            out[kind] = [{'period': label, 'count': count, 'totalCost': total}
+                         for label, _, _, count, total in series.buckets(kind)]
+        at_days = week_ends(series)
+        out['rolling'] = {
+            str(n): [{'date': day_to_iso(day), 'count': count, 'totalCost': total,
+                      'countPerDay': round(count_mean, 3), 'costPerDay': round(cost_mean)}
+                     for day, count, total, count_mean, cost_mean in series.rolling(n, at_days)]
+            for n in ROLLING_WINDOWS
+        }
+        return {self.path: out}
 
 
 # 3) QC 차기 교정 예정 현황
 # 정의: QC_logs의 next_calibration_date를 사용해 월별 예정 건수를 집계.
 # 결측 처리: 날짜가 없거나 형식이 이상하면 제거.
 
-def compute_qc_next_due(qc_logs):
-    monthly = defaultdict(int)
-    for r in qc_logs:
+class QcNextDue(Accumulator):
+    source = 'qc'
+
+    def __init__(self, path=STATS_QC_NEXT_DUE):
+        self.path = path
+        self.monthly = defaultdict(int)
+
+    def add(self, r):
         next_date = (r.get('next_calibration_date') or '').strip()
         if not next_date:
-            continue
+            return
         ym = next_date[:7]
         if len(ym) != 7 or ym[4] != '-':
-            continue
-        monthly[ym] += 1
-    out = [{'month': k, 'scheduledCalibrations': v} for k, v in monthly.items()]
-    out.sort(key=lambda x: x['month'])
-    return out
+            return
+        self.monthly[ym] += 1
+
+    def get_state(self):
+        return dict(self.monthly)
+
+    def set_state(self, state):
+        self.monthly = defaultdict(int, state or {})
+
+    def result(self):
+        out = [{'month': k, 'scheduledCalibrations': v} for k, v in self.monthly.items()]
+        out.sort(key=lambda x: x['month'])
+        return {self.path: out}
 
 
 # 4) 수리 가시성: 개요/카테고리/업체/유형/시리얼
 
-def compute_repairs_visibility(equipment, repairs):
-    serial_to_category = {e.get('serial'): e.get('category', '') for e in equipment if isinstance(e, dict)}
+def _cost_agg(**extra):
+    agg = {'count': 0, 'totalCost': 0, 'avgCost': 0, 'minCost': None, 'maxCost': None}
+    agg.update(extra)
+    return agg
 
-    total_count = 0
-    total_cost = 0
-    first_date = None
-    last_date = None
 
-    by_category = {}
-    by_company = {}
-    by_type = {}
-    by_serial = {}
+def _add_cost(agg, cost):
+    agg['count'] += 1
+    agg['totalCost'] += cost
+    agg['minCost'] = cost if agg['minCost'] is None else min(agg['minCost'], cost)
+    agg['maxCost'] = cost if agg['maxCost'] is None else max(agg['maxCost'], cost)
+
+
+def _finalize_avg(v):
+    v['avgCost'] = round(v['totalCost'] / v['count']) if v['count'] else 0
+    return v
 
-    def upd_date_bounds(d):
-        nonlocal first_date, last_date
-        if not d:
-            return
-        if first_date is None or d < first_date:
-            first_date = d
-        if last_date is None or d > last_date:
-            last_date = d
-
-    for r in repairs:
-        date_raw = (r.get('date') or r.get('repair_date') or '').strip()
-        d = date_raw[:10] if date_raw else ''
-        try:
-            cost = int(r.get('cost'))
-        except Exception:
-            cost = 0
-        serial = (r.get('serial') or '').strip()
-        company = (r.get('repair_company') or r.get('company') or '').strip() or '알 수 없음'
-        rtype = (r.get('repair_type') or r.get('type') or '').strip() or '알 수 없음'
-        category = (r.get('equipment_category') or serial_to_category.get(serial) or '').strip() or 'UNKNOWN'
-
-        total_count += 1
-        total_cost += cost
-        if d:
-            upd_date_bounds(d)
-
-        # by_category
-        cat_agg = by_category.setdefault(category, {
-            'category': category,
-            'count': 0,
-            'totalCost': 0,
-            'avgCost': 0,
-            'minCost': None,
-            'maxCost': None,
-            'uniqueSerials': set(),
-            'companies': defaultdict(int)
-        })
-        cat_agg['count'] += 1
-        cat_agg['totalCost'] += cost
-        cat_agg['minCost'] = cost if cat_agg['minCost'] is None else min(cat_agg['minCost'], cost)
-        cat_agg['maxCost'] = cost if cat_agg['maxCost'] is None else max(cat_agg['maxCost'], cost)
-        if serial:
-            cat_agg['uniqueSerials'].add(serial)
-        if company:
-            cat_agg['companies'][company] += 1
-
-        # by_company
-        com_agg = by_company.setdefault(company, {
-            'company': company,
-            'count': 0,
-            'totalCost': 0,
-            'avgCost': 0,
-            'minCost': None,
-            'maxCost': None,
-            'categories': defaultdict(int),
-            'uniqueSerials': set(),
-        })
-        com_agg['count'] += 1
-        com_agg['totalCost'] += cost
-        com_agg['minCost'] = cost if com_agg['minCost'] is None else min(com_agg['minCost'], cost)
-        com_agg['maxCost'] = cost if com_agg['maxCost'] is None else max(com_agg['maxCost'], cost)
-        if category:
-            com_agg['categories'][category] += 1
-        if serial:
-            com_agg['uniqueSerials'].add(serial)
-
-        # by_type
-        typ_agg = by_type.setdefault(rtype, {
-            'repairType': rtype,
-            'count': 0,
-            'totalCost': 0,
-            'avgCost': 0,
-            'minCost': None,
-            'maxCost': None,
-        })
-        typ_agg['count'] += 1
-        typ_agg['totalCost'] += cost
-        typ_agg['minCost'] = cost if typ_agg['minCost'] is None else min(typ_agg['minCost'], cost)
-        typ_agg['maxCost'] = cost if typ_agg['maxCost'] is None else max(typ_agg['maxCost'], cost)
-
-        # by_serial
-        ser_agg = by_serial.setdefault(serial or '알 수 없음', {
-            'serial': serial or '알 수 없음',
-            'category': category,
-            'count': 0,
-            'totalCost': 0,
-            'avgCost': 0,
-            'minCost': None,
-            'maxCost': None,
-            'firstRepairDate': None,
-            'lastRepairDate': None,
-        })
-        ser_agg['count'] += 1
-        ser_agg['totalCost'] += cost
-        ser_agg['minCost'] = cost if ser_agg['minCost'] is None else min(ser_agg['minCost'], cost)
-        ser_agg['maxCost'] = cost if ser_agg['maxCost'] is None else max(ser_agg['maxCost'], cost)
-        if d:
-            ser_agg['firstRepairDate'] = d if ser_agg['firstRepairDate'] is None or d < ser_agg['firstRepairDate'] else ser_agg['firstRepairDate']
-            ser_agg['lastRepairDate'] = d if ser_agg['lastRepairDate'] is None or d > ser_agg['lastRepairDate'] else ser_agg['lastRepairDate']
-
-    # 파생 값 계산 및 직렬화-friendly 정리
-    overview = {
-        'totalRepairs': total_count,
-        'totalRepairCost': total_cost,
-        'avgRepairCost': round(total_cost / total_count) if total_count else 0,
-        'period': {'from': first_date or '', 'to': last_date or ''}
-    }
 
-    def finalize_category(v):
-        v['avgCost'] = round(v['totalCost'] / v['count']) if v['count'] else 0
-        v['uniqueSerials'] = sorted(list(v['uniqueSerials']))
+class RepairsOverview(Accumulator):
+    source = 'repairs'
+
+    def __init__(self, path=STATS_REPAIRS_OVERVIEW):
+        self.path = path
+        self.total_count = 0
+        self.total_cost = 0
+        self.first_date = None
+        self.last_date = None
+
+    def add(self, r):
+        d = r.date[:10]
+        self.total_count += 1
+        self.total_cost += r.cost
+        if d:
+            if self.first_date is None or d < self.first_date:
+                self.first_date = d
+            if self.last_date is None or d > self.last_date:
+                self.last_date = d
+
+    def get_state(self):
+        return [self.total_count, self.total_cost, self.first_date, self.last_date]
+
+    def set_state(self, state):
+        self.total_count, self.total_cost, self.first_date, self.last_date = state or [0, 0, None, None]
+
+    def result(self):
+        overview = {
+            'totalRepairs': self.total_count,
+            'totalRepairCost': self.total_cost,
+            'avgRepairCost': round(self.total_cost / self.total_count) if self.total_count else 0,
+            'period': {'from': self.first_date or '', 'to': self.last_date or ''}
+        }
+        return {self.path: overview}
+
+
+# 그룹별 고유 시리얼 수는 시리얼 집합 대신 HyperLogLog로 센다. 그룹당 메모리/상태는 2^p 바이트 안팎으로
+# 제한되고, 시리얼이 2^p / 8개(512) 이하인 그룹은 해시 집합(sparse)이라 정확한 값이다.
+UNIQUE_SERIALS_P = 12
+
+
+class RepairsByCategory(Accumulator):
+    source = 'repairs'
+    sort_key = 'category'
+    # 상태 직렬화 시 HyperLogLog 상태/dict로 바꿔 저장하는 필드
+    hll_fields = ('uniqueSerials',)
+    counter_fields = ('companies',)
+
+    def __init__(self, path=STATS_REPAIRS_BY_CATEGORY):
+        self.path = path
+        self.groups = {}
+
+    def add(self, r):
+        agg = self.groups.get(r.category)
+        if agg is None:
+            agg = self.groups[r.category] = {
+                'category': r.category,
+                **_cost_agg(uniqueSerials=HyperLogLog(p=UNIQUE_SERIALS_P), companies=defaultdict(int)),
+            }
+        _add_cost(agg, r.cost)
+        if r.serial:
+            agg['uniqueSerials'].add(r.serial)
+        if r.company:
+            agg['companies'][r.company] += 1
+
+    def finalize(self, v):
+        v['uniqueSerials'] = v['uniqueSerials'].count()
         v['companies'] = sorted(
             [{'company': k, 'count': c} for k, c in v['companies'].items()],
             key=lambda x: (-x['count'], x['company'])
         )
         return v
 
-    def finalize_company(v):
-        v['avgCost'] = round(v['totalCost'] / v['count']) if v['count'] else 0
-        v['uniqueSerials'] = sorted(list(v['uniqueSerials']))
+    def _order(self, v):
+        return (-v['totalCost'], v[self.sort_key])
+
+    def items(self):
+        out = [self.finalize(_finalize_avg(dict(v))) for v in self.groups.values()]
+        out.sort(key=self._order)
+        return out
+
+    def top(self, k):
+        """items()[:k]와 같은 결과. 집계 dict에서 힙으로 k개만 골라 그것만 마무리한다(호출 순서와 무관)."""
+        return [self.finalize(_finalize_avg(dict(v))) for v in top_k(self.groups.values(), k, key=self._order)]
+
+    def result(self):
+        return {self.path: self.items()}
+
+    def get_state(self):
+        state = {}
+        for key, v in self.groups.items():
+            v = dict(v)
+            for f in self.hll_fields:
+                v[f] = v[f].get_state()
+            for f in self.counter_fields:
+                v[f] = dict(v[f])
+            state[key] = v
+        return state
+
+    def set_state(self, state):
+        self.groups = {}
+        for key, v in (state or {}).items():
+            for f in self.hll_fields:
+                hll = HyperLogLog(p=UNIQUE_SERIALS_P)
+                hll.set_state(v[f])
+                v[f] = hll
+            for f in self.counter_fields:
+                v[f] = defaultdict(int, v[f])
+            self.groups[key] = v
+
+
+class RepairsByCompany(RepairsByCategory):
+    sort_key = 'company'
+    counter_fields = ('categories',)
+
+    def __init__(self, path=STATS_REPAIRS_BY_COMPANY):
+        super().__init__(path)
+
+    def add(self, r):
+        agg = self.groups.get(r.company)
+        if agg is None:
+            agg = self.groups[r.company] = {
+                'company': r.company,
+                **_cost_agg(categories=defaultdict(int), uniqueSerials=HyperLogLog(p=UNIQUE_SERIALS_P)),
+            }
+        _add_cost(agg, r.cost)
+        if r.category:
+            agg['categories'][r.category] += 1
+        if r.serial:
+            agg['uniqueSerials'].add(r.serial)
+
+    def finalize(self, v):
+        v['uniqueSerials'] = v['uniqueSerials'].count()
         v['categories'] = sorted(
             [{'category': k, 'count': c} for k, c in v['categories'].items()],
             key=lambda x: (-x['count'], x['category'])
         )
         return v
 
-    def finalize_type(v):
-        v['avgCost'] = round(v['totalCost'] / v['count']) if v['count'] else 0
+
+class RepairsByType(RepairsByCategory):
+    sort_key = 'repairType'
+    hll_fields = ()
+    counter_fields = ()
+
+    def __init__(self, path=STATS_REPAIRS_BY_TYPE):
+        super().__init__(path)
+
+    def add(self, r):
+        agg = self.groups.get(r.rtype)
+        if agg is None:
+            agg = self.groups[r.rtype] = {'repairType': r.rtype, **_cost_agg()}
+        _add_cost(agg, r.cost)
+
+    def finalize(self, v):
         return v
 
-    def finalize_serial(v):
-        v['avgCost'] = round(v['totalCost'] / v['count']) if v['count'] else 0
+
+class RepairsBySerial(RepairsByCategory):
+    sort_key = 'serial'
+    hll_fields = ()
+    counter_fields = ()
+
+    def __init__(self, path=STATS_REPAIRS_BY_SERIAL):
+        super().__init__(path)
+
+    def add(self, r):
+        serial = r.serial or '알 수 없음'
+        agg = self.groups.get(serial)
+        if agg is None:
+            agg = self.groups[serial] = {
+                'serial': serial,
+                'category': r.category,
+                **_cost_agg(firstRepairDate=None, lastRepairDate=None),
+            }
+        _add_cost(agg, r.cost)
+        d = r.date[:10]
+        if d:
+            if agg['firstRepairDate'] is None or d < agg['firstRepairDate']:
+                agg['firstRepairDate'] = d
+            if agg['lastRepairDate'] is None or d > agg['lastRepairDate']:
+                agg['lastRepairDate'] = d
+
+    def finalize(self, v):
         return v
 
-    by_category_list = [finalize_category(v) for v in by_category.values()]
-    by_company_list = [finalize_company(v) for v in by_company.values()]
-    by_type_list = [finalize_type(v) for v in by_type.values()]
-    by_serial_list = [finalize_serial(v) for v in by_serial.values()]
-
-    by_category_list.sort(key=lambda x: (-x['totalCost'], x['category']))
-    by_company_list.sort(key=lambda x: (-x['totalCost'], x['company']))
-    by_type_list.sort(key=lambda x: (-x['totalCost'], x['repairType']))
-    by_serial_list.sort(key=lambda x: (-x['totalCost'], x['serial']))
-
-    # TOP-K 파생(가시성)
-    def topk(items, key, k=10):
-        return items[:k]
-
-    topk_payload = {
-        'topCategoriesByCost': topk(by_category_list, 'totalCost'),
-        'topCompaniesByCost': topk(by_company_list, 'totalCost'),
-        'topTypesByCost': topk(by_type_list, 'totalCost'),
-        'topSerialsByCost': topk(by_serial_list, 'totalCost'),
-    }
 
-    return overview, by_category_list, by_company_list, by_type_list, by_serial_list, topk_payload
+# TOP-K 파생(가시성): 그룹 누산기 집계에서 상위 k개만 추린다.
+
+class RepairsTopK(Accumulator):
+    source = None
+    inputs = ('repairs',)
+
+    def __init__(self, by_category, by_company, by_type, by_serial, k=10, path=STATS_REPAIRS_TOPK):
+        self.path = path
+        self.k = k
+        self.groups = {
+            'topCategoriesByCost': by_category,
+            'topCompaniesByCost': by_company,
+            'topTypesByCost': by_type,
+            'topSerialsByCost': by_serial,
+        }
+
+    def result(self):
+        return {self.path: {name: acc.top(self.k) for name, acc in self.groups.items()}}
+
+
+# 스트리밍 모드(--sketches): 시리얼/업체를 모두 보관하지 않고 고정 크기 스케치로 상위 항목과
+# 고유 시리얼 수를 유지한다. 값은 근사치이며 각 항목의 error가 과대 추정 상한이다.
+
+class RepairsSketch(Accumulator):
+    source = 'repairs'
+
+    def __init__(self, path=STATS_REPAIRS_SKETCH, k=10, capacity=256):
+        self.path = path
+        self.k = k
+        self.capacity = capacity
+        self.set_state(None)
+
+    def add(self, r):
+        cost = r.cost
+        serial = r.serial or '알 수 없음'
+        self.serial_counts.add(serial)
+        self.serial_count_cms.add(serial)
+        self.serial_costs.add(serial, cost)
+        if r.company:
+            self.company_costs.add(r.company, cost)
+        self.type_costs.add(r.rtype, cost)
+        if r.serial:
+            self.distinct.add(r.serial)
+            hll = self.distinct_by_category.get(r.category)
+            if hll is None:
+                hll = self.distinct_by_category[r.category] = HyperLogLog(p=10)
+            hll.add(r.serial)
+
+    def estimate_count(self, serial):
+        """임의 시리얼의 수리 건수 추정(Count-Min, 실제 이상)."""
+        return self.serial_count_cms.estimate(serial)
+
+    def result(self):
+        def rows(ss, name, value):
+            return [{name: key, value: count, 'error': error} for key, count, error in ss.top(self.k)]
+
+        # Space-Saving과 Count-Min 모두 과대 추정이므로 둘 중 작은 값이 더 가까운 상한이다
+        by_count = [
+            {'serial': serial, 'count': min(count, self.estimate_count(serial)), 'error': error}
+            for serial, count, error in self.serial_counts.top(self.k)
+        ]
+        by_count.sort(key=lambda x: (-x['count'], x['serial']))
+        payload = {
+            'approximate': True,
+            'capacity': self.capacity,
+            'topSerialsByCount': by_count,
+            'topSerialsByCost': rows(self.serial_costs, 'serial', 'totalCost'),
+            'topCompaniesByCost': rows(self.company_costs, 'company', 'totalCost'),
+            'topTypesByCost': rows(self.type_costs, 'repairType', 'totalCost'),
+            'distinctSerials': self.distinct.count(),
+            'distinctSerialsByCategory': {
+                cat: hll.count() for cat, hll in sorted(self.distinct_by_category.items(), key=lambda x: str(x[0]))
+            },
+            'countMinErrorBound': round(self.serial_count_cms.error_bound(), 2),
+        }
+        return {self.path: payload}
+
+    def _sketches(self):
+        return {
+            'serialCounts': self.serial_counts,
+            'serialCountCms': self.serial_count_cms,
+            'serialCosts': self.serial_costs,
+            'companyCosts': self.company_costs,
+            'typeCosts': self.type_costs,
+            'distinct': self.distinct,
+        }
+
+    def get_state(self):
+        state = {name: sk.get_state() for name, sk in self._sketches().items()}
+        state['distinctByCategory'] = [[cat, hll.get_state()] for cat, hll in self.distinct_by_category.items()]
+        return state
+
+    def set_state(self, state):
+        state = state or {}
+        self.serial_counts = SpaceSaving(self.capacity)
+        self.serial_count_cms = CountMinSketch()
+        self.serial_costs = SpaceSaving(self.capacity)
+        self.company_costs = SpaceSaving(self.capacity)
+        self.type_costs = SpaceSaving(self.capacity)
+        self.distinct = HyperLogLog()
+        for name, sk in self._sketches().items():
+            if name in state:
+                sk.set_state(state[name])
+        self.distinct_by_category = {}
+        for cat, hll_state in state.get('distinctByCategory', []):
+            hll = self.distinct_by_category[cat] = HyperLogLog(p=10)
+            hll.set_state(hll_state)
+
+
+def register_stats(engine, serial_index, sketches=False):
+    """기본 통계 누산기를 엔진에 등록한다. 산출 순서는 등록 순서를 따른다.
+
+    sketches: True면 근사 스트리밍 집계(stats_repairs_sketch.json)도 함께 등록한다.
+    """
+    engine.register(UptimeByCategory(serial_index))
+    engine.register(RepairCostMonthly())
+    engine.register(RepairsMonthly())
+    engine.register(RepairsTimeSeries())
+    engine.register(QcNextDue())
+    engine.register(RepairsOverview())
+    by_cat = engine.register(RepairsByCategory())
+    by_com = engine.register(RepairsByCompany())
+    by_typ = engine.register(RepairsByType())
+    by_ser = engine.register(RepairsBySerial())
+    engine.register(RepairsTopK(by_cat, by_com, by_typ, by_ser))
+    if sketches:
+        engine.register(RepairsSketch())
+    return engine
+
+
+def _run_accumulators(accs, rows, prepare=None):
+    adds = [a.add for a in accs if a.source is not None]
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        row = prepare(row) if prepare else row
+        for add in adds:
+            add(row)
+    out = {}
+    for acc in accs:
+        out.update(acc.result())
+    return out
+
 
+# 기존 함수형 API(리스트 입력) 호환용 래퍼
+
+def compute_uptime_by_category(equipment, movements):
+    acc = UptimeByCategory(load_serial_categories(equipment))
+    return _run_accumulators([acc], movements, prepare_movement)[acc.path]
+
+
+def compute_repair_cost_monthly(repairs):
+    acc = RepairCostMonthly()
+    return _run_accumulators([acc], repairs, make_prepare_repair())[acc.path]
+
+
+def compute_repairs_monthly(repairs):
+    acc = RepairsMonthly()
+    return _run_accumulators([acc], repairs, make_prepare_repair())[acc.path]
+
+
+def compute_qc_next_due(qc_logs):
+    acc = QcNextDue()
+    return _run_accumulators([acc], qc_logs)[acc.path]
+
+
+def compute_repairs_visibility(equipment, repairs):
+    accs = [RepairsOverview(), RepairsByCategory(), RepairsByCompany(), RepairsByType(), RepairsBySerial()]
+    accs.append(RepairsTopK(*accs[1:]))
+    out = _run_accumulators(accs, repairs, make_prepare_repair(load_serial_categories(equipment)))
+    return tuple(out[a.path] for a in accs)
+
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        return {}
+    return state
+
+
+def save_state(state, path=STATE_FILE, batch=None):
+    """증분 상태를 저장한다. batch가 주어지면 산출 파일과 같은 커밋으로 반영한다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if batch is not None:
+        batch.write_json(path, state, indent=None)
+    else:
+        write_json_atomic(path, state, indent=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='db/stats_*.json 통계 산출')
+    parser.add_argument('--full', action='store_true', help='저장된 증분 상태를 무시하고 전체 재계산')
+    parser.add_argument('--compact', action='store_true',
+                        help='최소화 JSON + .gz/.br 압축본 + db/stats_manifest.json으로 산출(내용이 같으면 생략)')
+    parser.add_argument('--sketches', action='store_true',
+                        help='근사 스트리밍 집계(Space-Saving/Count-Min/HyperLogLog)도 산출')
+    args = parser.parse_args(argv)
 
-def main():
     sources = []
-    equipment = load_json_array(EQUIPMENT_FILE)
-    if equipment:
+    # 장비 마스터는 조회용으로만 쓰이므로 공유 시리얼 인덱스(db/serial_index.json)로 읽는다
+    serial_index = load_serial_index(EQUIPMENT_FILE)
+    if serial_index:
         sources.append(os.path.relpath(EQUIPMENT_FILE, start=DB_DIR))
-    movements = load_json_array(MOVEMENTS_FILE)
-    if movements:
-        sources.append(os.path.relpath(MOVEMENTS_FILE, start=DB_DIR))
+
+    # 장비 마스터가 바뀌면 카테고리 매핑이 모든 집계에 영향을 주므로 전체 재계산
+    equipment_hash = file_sha1(EQUIPMENT_FILE)
+    state = {} if args.full else load_state()
+    if state.get('equipmentHash') != equipment_hash:
+        state = {}
+    # 산출 형식(--compact 여부)이 바뀌면 소스가 그대로여도 모든 산출 파일을 새 형식으로 다시 쓴다
+    mode_changed = bool(state) and state.get('compact', False) != args.compact
+
+    engine = StatsEngine()
+    prepare_repair = make_prepare_repair(serial_index)
+    # JSON 소스는 디코딩 때 범주형 필드 값을 인터닝한다(수리 파서의 사전과 공유). 누산기의 groupby 키가
+    # 소스 전체에서 한 객체가 되어 dict 조회가 동일 객체 비교로 끝난다
+    decode_hook = interning_hook(strings=prepare_repair.strings)
+    # movements는 동기화된 컬럼형 파일(movements_db.cols)이 있으면 date/serial 컬럼만 읽는다
+    engine.add_source('movements', MOVEMENTS_FILE, prepare_movement, columnar=open_store_for,
+                      object_pairs_hook=decode_hook)
     # repairs는 두 곳 중 가용한 것을 사용(정제본 우선)
-    repairs = load_json_array(REPAIRS_CLEAN_FILE)
-    repairs_source = REPAIRS_CLEAN_FILE if repairs else REPAIRS_FILE
-    if not repairs:
-        repairs = load_json_array(REPAIRS_FILE)
-    if repairs:
-        sources.append(os.path.relpath(repairs_source, start=DB_DIR))
-    qc_logs = load_json_array(QC_LOGS_FILE)
-    if qc_logs:
-        sources.append(os.path.relpath(QC_LOGS_FILE, start=DB_DIR))
-
-    # 1) uptime by category
-    uptime_by_category = compute_uptime_by_category(equipment, movements)
-    write_json(STATS_UPTIME_BY_CATEGORY, uptime_by_category, sources)
-
-    # 2) repair cost monthly (legacy)
-    repair_cost_monthly = compute_repair_cost_monthly(repairs)
-    write_json(STATS_REPAIR_COST_MONTHLY, repair_cost_monthly, sources)
-
-    # 2b) repairs monthly (count + cost)
-    repairs_monthly = compute_repairs_monthly(repairs)
-    write_json(STATS_REPAIRS_MONTHLY, repairs_monthly, sources)
-
-    # 3) QC next due monthly
-    qc_next_due = compute_qc_next_due(qc_logs)
-    write_json(STATS_QC_NEXT_DUE, qc_next_due, sources)
-
-    # 4) Repairs visibility
-    overview, by_cat, by_com, by_typ, by_ser, topk_payload = compute_repairs_visibility(equipment, repairs)
-    write_json(STATS_REPAIRS_OVERVIEW, overview, sources)
-    write_json(STATS_REPAIRS_BY_CATEGORY, by_cat, sources)
-    write_json(STATS_REPAIRS_BY_COMPANY, by_com, sources)
-    write_json(STATS_REPAIRS_BY_TYPE, by_typ, sources)
-    write_json(STATS_REPAIRS_BY_SERIAL, by_ser, sources)
-    write_json(STATS_REPAIRS_TOPK, topk_payload, sources)
-
-    print('Generated:',
-          os.path.basename(STATS_UPTIME_BY_CATEGORY),
-          os.path.basename(STATS_REPAIR_COST_MONTHLY),
-          os.path.basename(STATS_REPAIRS_MONTHLY),
-          os.path.basename(STATS_QC_NEXT_DUE),
-          os.path.basename(STATS_REPAIRS_OVERVIEW),
-          os.path.basename(STATS_REPAIRS_BY_CATEGORY),
-          os.path.basename(STATS_REPAIRS_BY_COMPANY),
-          os.path.basename(STATS_REPAIRS_BY_TYPE),
-          os.path.basename(STATS_REPAIRS_BY_SERIAL),
-          os.path.basename(STATS_REPAIRS_TOPK))
+    engine.add_source('repairs', [REPAIRS_CLEAN_FILE, REPAIRS_FILE], prepare_repair, object_pairs_hook=decode_hook)
+    engine.add_source('qc', QC_LOGS_FILE, object_pairs_hook=decode_hook)
+    register_stats(engine, serial_index, sketches=args.sketches)
+
+    # 소스별 단일 패스(변경 없는 소스는 생략, 추가분만 있으면 이어 읽기)
+    used, changed = engine.run(state.get('engine'))
+    for name in ('movements', 'repairs', 'qc'):
+        if name in used:
+            sources.append(os.path.relpath(used[name], start=DB_DIR))
+    if not state or mode_changed:
+        changed = set(changed) | {'movements', 'repairs', 'qc'}
+
+    outputs = engine.results(changed)
+    # 산출 파일 전부와 증분 상태를 한 세대로 커밋한다(중간에 끊기면 이전 세대가 그대로 남는다)
+    with WriteBatch(DB_DIR) as batch:
+        writer = ArtifactWriter(DB_DIR, batch)
+        written = []
+        for path, data in outputs.items():
+            if write_json(path, data, sources, writer if args.compact else None, batch):
+                written.append(path)
+        if args.compact:
+            writer.save()
+        else:
+            # 들여쓰기 모드에서는 압축본/매니페스트가 더 이상 맞지 않으므로 남은 것을 모두 지운다
+            writer.clear(glob.glob(os.path.join(DB_DIR, 'stats_*.json')))
+        save_state({'version': STATE_VERSION, 'equipmentHash': equipment_hash, 'compact': args.compact,
+                    'engine': engine.get_state()}, batch=batch)
+
+    if not prepare_repair.report.ok:
+        print(*prepare_repair.report.lines(), sep='\n')
+    if written:
+        print('Generated:', *[os.path.basename(p) for p in written])
+        if len(written) < len(outputs):
+            print('Unchanged:', *[os.path.basename(p) for p in outputs if p not in written])
+    elif outputs:
+        print('No content changes;', len(outputs), 'stats files left untouched.')
+    else:
+        print('No source changes; stats are up to date.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,269 @@
+"""
+정도검사(교정) 예정일 인덱스와 임박/초과 알람
+
+QC_logs.json을 시리얼별 최신 검사 1건(정도검사일이 가장 늦은 것)으로 모으고, 시리얼은 장비 마스터
+(serial_index)로 매칭해 품목계열을 붙인다. 항목은 예정일(next_calibration_date, 일 번호) 오름차순으로
+정렬된 배열에 두므로 기간 질의는 bisect 두 번(O(log n))이다.
+  index.due_between('2025-09-01', '2025-09-30')   index.count_between(...)
+  index.overdue(today)   index.upcoming(today, 30)   index.next_due('18P353')
+품목계열별로도 예정일 배열을 따로 두어 rollup(today)이 계열마다 bisect로 초과/7일/30일 건수를 센다.
+
+알람(db/alarms_calibration.json):
+  level   overdue(예정일 지남, critical) / due7(7일 이내, warning) / due30(윈도 이내, info)
+  id      'qc-due:<시리얼>:<예정일>' — 같은 예정일의 알람은 매일 같은 id
+남은 일수는 저장하지 않는다(클라이언트가 dueDate로 계산). 그래서 파일 내용은 알람이 생기거나
+없어지거나 단계가 바뀔 때만 달라지고, 그때만 다시 쓴다. 이전 파일과 비교해 추가/해소/단계 변경된
+알람 id를 lastChange에 남기고, 계속 있던 알람은 firstSeen을 유지한다.
+
+사용법:
+  python scripts/calibration_index.py                          # 알람 갱신(바뀐 것이 있을 때만 기록)
+  python scripts/calibration_index.py --upcoming 30             # 30일 이내 예정 목록
+  python scripts/calibration_index.py --overdue --today 2025-09-01
+  python scripts/calibration_index.py --rollup
+"""
+
+import argparse
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import date, datetime
+
+from db_writer import write_json_atomic
+from movements_store import MISSING_DAY, day_number, day_to_iso
+from serial_index import load_serial_index
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+QC_LOGS_FILE = os.path.join(DB_DIR, 'QC_logs.json')
+EQUIPMENT_FILE = os.path.join(DB_DIR, 'equipment_db.json')
+ALARMS_FILE = os.path.join(DB_DIR, 'alarms_calibration.json')
+
+SCHEMA_VERSION = '1.0.0'
+ALARM_WINDOW = 30
+SOON_DAYS = 7
+LEVELS = {'overdue': ('critical', '정도검사 초과'), 'due7': ('warning', '정도검사 임박'),
+          'due30': ('info', '정도검사 예정')}
+
+Due = namedtuple('Due', 'day serial category measurement_item last_day qc_id matched')
+
+
+def as_day(value):
+    """일 번호(int) 또는 'YYYY-MM-DD'/date → 일 번호. 형식이 틀리면 ValueError."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, date):
+        value = value.isoformat()
+    day = day_number(value)
+    if day == MISSING_DAY:
+        raise ValueError(f'날짜 형식이 올바르지 않습니다: {value!r}')
+    return day
+
+
+class CalibrationIndex:
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda e: (e.day, e.serial))
+        self.days = [e.day for e in self.entries]
+        self.by_serial = {e.serial: e for e in self.entries}
+        self.category_days = defaultdict(list)
+        for e in self.entries:
+            self.category_days[e.category].append(e.day)   # entries가 정렬돼 있으므로 계열별로도 정렬됨
+
+    @classmethod
+    def from_records(cls, qc_logs, serial_index=None):
+        """QC 레코드 → 인덱스. 예정일이 없거나 형식이 틀린 레코드는 제외한다."""
+        latest = {}
+        for r in qc_logs:
+            if not isinstance(r, dict):
+                continue
+            due = day_number(r.get('next_calibration_date'))
+            raw = str(r.get('serial_number') or '').strip()
+            if due == MISSING_DAY or not raw:
+                continue
+            info = serial_index.lookup(raw) if serial_index is not None else None
+            serial = info['serial'] if info else raw
+            last = day_number(r.get('latest_calibration_date'))
+            entry = Due(due, serial, (info or {}).get('category') or 'UNKNOWN',
+                        (info or {}).get('measurement_item'), last, r.get('id'), info is not None)
+            prev = latest.get(serial)
+            if prev is None or (last, due) >= (prev.last_day, prev.day):
+                latest[serial] = entry
+        return cls(latest.values())
+
+    def __len__(self):
+        return len(self.entries)
+
+    # --- 질의 (bisect) ---
+
+    def _span(self, start, end):
+        return bisect_left(self.days, as_day(start)), bisect_right(self.days, as_day(end))
+
+    def due_between(self, start, end):
+        """예정일이 start~end(양 끝 포함)인 항목."""
+        i, j = self._span(start, end)
+        return self.entries[i:j]
+
+    def count_between(self, start, end):
+        i, j = self._span(start, end)
+        return j - i
+
+    def overdue(self, today):
+        """예정일이 today보다 이른 항목(오래된 순)."""
+        return self.entries[:bisect_left(self.days, as_day(today))]
+
+    def upcoming(self, today, within=ALARM_WINDOW):
+        today = as_day(today)
+        return self.due_between(today, today + within)
+
+    def next_due(self, serial):
+        return self.by_serial.get(str(serial).strip())
+
+    def rollup(self, today, windows=(SOON_DAYS, ALARM_WINDOW)):
+        """품목계열별 {category, total, overdue, due<N>...}. due<N>은 오늘~N일 뒤 예정 건수."""
+        today = as_day(today)
+        out = []
+        for category, days in sorted(self.category_days.items()):
+            overdue = bisect_left(days, today)
+            row = {'category': category, 'total': len(days), 'overdue': overdue}
+            for w in windows:
+                row[f'due{w}'] = bisect_right(days, today + w) - overdue
+            out.append(row)
+        return out
+
+
+def load_index(qc_path=QC_LOGS_FILE, equipment_path=EQUIPMENT_FILE):
+    with open(qc_path, 'r', encoding='utf-8') as f:
+        qc_logs = json.load(f)
+    serial_index = load_serial_index(equipment_path) if os.path.exists(equipment_path) else None
+    return CalibrationIndex.from_records(qc_logs if isinstance(qc_logs, list) else [], serial_index)
+
+
+# --- 알람 ---
+
+def _level(day, today, soon):
+    if day < today:
+        return 'overdue'
+    return 'due7' if day <= today + soon else 'due30'
+
+
+def build_alarms(index, today, within=ALARM_WINDOW, soon=SOON_DAYS):
+    """예정일이 today + within 이전인 항목의 알람 목록(예정일 순)."""
+    today = as_day(today)
+    alarms = []
+    for e in index.entries[:bisect_right(index.days, today + within)]:
+        level = _level(e.day, today, soon)
+        severity, title = LEVELS[level]
+        alarms.append({
+            'id': f'qc-due:{e.serial}:{day_to_iso(e.day)}',
+            'type': title,
+            'level': level,
+            'severity': severity,
+            'serial': e.serial,
+            'category': e.category,
+            'measurementItem': e.measurement_item,
+            'dueDate': day_to_iso(e.day),
+            'lastCalibration': day_to_iso(e.last_day) or None,
+            'qcId': e.qc_id,
+            'matched': e.matched,
+        })
+    return alarms
+
+
+def diff_alarms(previous, current):
+    """(added, resolved, changed) id 목록. changed는 단계가 바뀐 알람."""
+    prev = {a['id']: a for a in previous}
+    cur = {a['id']: a for a in current}
+    added = [i for i in cur if i not in prev]
+    resolved = [i for i in prev if i not in cur]
+    changed = [i for i in cur if i in prev and prev[i].get('level') != cur[i]['level']]
+    return added, resolved, changed
+
+
+def _read_alarms(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('data', {})
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        return {}
+
+
+def update_alarms(index, today, path=ALARMS_FILE, within=ALARM_WINDOW, soon=SOON_DAYS, sources=None):
+    """알람 파일을 갱신한다. 내용이 바뀌었으면 (added, resolved, changed), 그대로면 None."""
+    today = as_day(today)
+    previous = _read_alarms(path)
+    prev_alarms = previous.get('alarms', [])
+    first_seen = {a['id']: a.get('firstSeen') for a in prev_alarms}
+    alarms = build_alarms(index, today, within, soon)
+    for a in alarms:
+        a['firstSeen'] = first_seen.get(a['id']) or day_to_iso(today)
+
+    summary = {level: 0 for level in LEVELS}
+    for a in alarms:
+        summary[a['level']] += 1
+    summary['unmatched'] = sum(1 for a in alarms if not a['matched'])
+    data = {'windowDays': within, 'soonDays': soon, 'summary': summary,
+            'byCategory': index.rollup(today, (soon, within)), 'alarms': alarms}
+    if {k: v for k, v in previous.items() if k != 'lastChange'} == data:
+        return None
+
+    added, resolved, changed = diff_alarms(prev_alarms, alarms)
+    data['lastChange'] = {'date': day_to_iso(today), 'added': added, 'resolved': resolved, 'levelChanged': changed}
+    payload = {
+        'meta': {
+            '_schemaVersion': SCHEMA_VERSION,
+            'generatedAt': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'sourceFiles': sources or ['QC_logs.json', 'equipment_db.json'],
+        },
+        'data': data,
+    }
+    write_json_atomic(path, payload)
+    return added, resolved, changed
+
+
+def _print_entries(title, entries, today):
+    print(f'{title}: {len(entries)}건')
+    for e in entries:
+        print(f'  {day_to_iso(e.day)} ({e.day - today:+d}일)  {e.serial:<12} {e.category}'
+              + ('' if e.matched else '  [장비 마스터에 없음]'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='정도검사 예정일 인덱스/알람')
+    parser.add_argument('--today', help='기준일 YYYY-MM-DD (기본: 오늘)')
+    parser.add_argument('--upcoming', type=int, metavar='DAYS', help='오늘부터 DAYS일 이내 예정 목록 출력')
+    parser.add_argument('--overdue', action='store_true', help='예정일이 지난 목록 출력')
+    parser.add_argument('--rollup', action='store_true', help='품목계열별 건수 출력')
+    parser.add_argument('--serial', help='시리얼 하나의 다음 예정일 출력')
+    parser.add_argument('--window', type=int, default=ALARM_WINDOW, help=f'알람 윈도(일, 기본: {ALARM_WINDOW})')
+    args = parser.parse_args()
+
+    today = as_day(args.today or date.today())
+    index = load_index()
+    print(f'📅 정도검사 예정 인덱스: {len(index)}대 (기준일 {day_to_iso(today)})')
+
+    if args.overdue:
+        _print_entries('⏰ 예정일 초과', index.overdue(today), today)
+    if args.upcoming is not None:
+        _print_entries(f'🔔 {args.upcoming}일 이내 예정', index.upcoming(today, args.upcoming), today)
+    if args.rollup:
+        for row in index.rollup(today, (SOON_DAYS, args.window)):
+            print(f"  {row['category']:<24} 전체 {row['total']:>4}  초과 {row['overdue']:>4}  "
+                  f"7일 {row[f'due{SOON_DAYS}']:>4}  {args.window}일 {row[f'due{args.window}']:>4}")
+    if args.serial:
+        entry = index.next_due(args.serial)
+        if entry is None:
+            print(f'  {args.serial}: 정도검사 기록 없음')
+        else:
+            _print_entries(f'🔎 {entry.serial}', [entry], today)
+    if args.overdue or args.upcoming is not None or args.rollup or args.serial:
+        return
+
+    result = update_alarms(index, today, within=args.window)
+    if result is None:
+        print(f'변경 없음: {os.path.basename(ALARMS_FILE)}을(를) 그대로 둡니다.')
+        return
+    added, resolved, changed = result
+    print(f'✅ {os.path.basename(ALARMS_FILE)} 갱신: 추가 {len(added)}, 해소 {len(resolved)}, 단계 변경 {len(changed)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""
+CEMS SQLite 저장소(db/cems.sqlite)
+
+데이터셋마다 테이블 하나: (pos 원본 순서, serial, date, data 원본 레코드 JSON)
+serial/date에 인덱스를 두므로 시리얼 한 대의 상태 변경은 인덱스를 타는 UPDATE 한 번이다.
+레코드는 JSON 그대로 보관하고 필드 수정은 json_set으로 하므로 키 순서가 유지되고,
+export()는 지금까지와 같은 db/*.json(indent=2) 계약을 그대로 만든다.
+한 번의 export()로 쓰는 파일들은 db_writer.WriteBatch 한 세대로 함께 커밋된다.
+
+동기화 규칙:
+ - 데이터셋을 처음 읽거나 수정할 때, db/*.json의 size/mtime이 마지막 가져오기/내보내기 때와
+   다르면(다른 도구가 JSON을 고쳤으면) JSON을 다시 가져온다.
+ - replace()/insert()/update_many()는 데이터셋을 dirty로 표시하고, export()는 dirty 데이터셋만 JSON으로 쓴다.
+ - 스테이징: stage()로 만든 <데이터셋>__staging 테이블을 insert(..., staged=True)로 채우고, 다 채운 뒤
+   swap_staged()가 한 트랜잭션으로 본 테이블과 바꾼다. 중간에 실패하면 discard_staged()로 버리므로
+   본 테이블, dirty 표시, db/*.json은 그대로 남는다(ECOUNT 동기화처럼 페이지 단위로 받는 경우).
+
+사용법:
+  python scripts/cems_store.py import [데이터셋 ...]   # db/*.json → SQLite
+  python scripts/cems_store.py export [데이터셋 ...]   # SQLite → db/*.json (dirty만, --force면 전부)
+  python scripts/cems_store.py query movements --serial 1789 --from 2025-01-01 --to 2025-03-31
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+
+from db_writer import WriteBatch
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+STORE_FILE = os.path.join(DB_DIR, 'cems.sqlite')
+
+# 데이터셋 → (JSON 파일명, serial 필드, date 필드)
+DATASETS = {
+    'equipment': ('equipment_db.json', 'serial', None),
+    'equipment_data': ('equipment_data.json', '시리얼번호', '날짜'),
+    'movements': ('movements_db.json', 'serial', 'date'),
+    'repairs_final': ('repairs_db_final.json', 'serial', 'repair_date'),
+    'repairs': ('repairs_db_clean.json', 'serial', 'repair_date'),
+    'qc_logs': ('QC_logs.json', 'serial_number', 'latest_calibration_date'),
+    'ecount_products': ('backend_ecount_products.json', 'productCode', None),
+    'ecount_customers': ('backend_ecount_customers.json', 'customerCode', None),
+    'ecount_inventory': ('backend_ecount_inventory.json', 'productCode', None),
+}
+# 파일이 배열이 아니라 {메타..., count, items} 객체인 데이터셋(ECOUNT 동기화 산출물)
+ENVELOPE_DATASETS = ('ecount_products', 'ecount_customers', 'ecount_inventory')
+
+
+def _key_columns(record, serial_field, date_field):
+    serial = record.get(serial_field)
+    serial = str(serial).strip() if serial is not None else None
+    date = record.get(date_field) if date_field else None
+    date = str(date).strip()[:10] if date else None
+    return serial, date
+
+
+def _staging_table(dataset):
+    return f'{dataset}__staging'
+
+
+def _json_path(field):
+    return '$."' + field.replace('"', '\\"') + '"'
+
+
+class CemsStore:
+    def __init__(self, path=STORE_FILE, db_dir=DB_DIR):
+        self.path = path
+        self.db_dir = db_dir
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._synced = set()
+        self._create_schema()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS sources ('
+                'dataset TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, dirty INTEGER NOT NULL DEFAULT 0)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS envelopes (dataset TEXT PRIMARY KEY, meta TEXT NOT NULL)')
+            for name in DATASETS:
+                self.conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {name} ('
+                    'pos INTEGER PRIMARY KEY, serial TEXT, date TEXT, data TEXT NOT NULL)')
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS {name}_serial ON {name}(serial)')
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS {name}_date ON {name}(date)')
+
+    def json_file(self, dataset):
+        return os.path.join(self.db_dir, DATASETS[dataset][0])
+
+    # --- JSON 동기화 ---
+
+    def _source_row(self, dataset):
+        return self.conn.execute('SELECT size, mtime, dirty FROM sources WHERE dataset = ?', (dataset,)).fetchone()
+
+    def _record_source(self, dataset, dirty):
+        try:
+            st = os.stat(self.json_file(dataset))
+            size, mtime = st.st_size, st.st_mtime_ns
+        except FileNotFoundError:
+            size = mtime = None
+        self.conn.execute(
+            'INSERT INTO sources (dataset, size, mtime, dirty) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(dataset) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, dirty = excluded.dirty',
+            (dataset, size, mtime, int(dirty)))
+
+    def sync(self, dataset, force=False):
+        """JSON이 마지막 동기화 이후 바뀌었으면 다시 가져온다. 가져왔으면 True."""
+        if dataset in self._synced and not force:
+            return False
+        self._synced.add(dataset)
+        path = self.json_file(dataset)
+        row = self._source_row(dataset)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if not force and row is not None and (row[0], row[1]) == (st.st_size, st.st_mtime_ns):
+            return False
+        if row is not None and row[2] and not force:
+            print(f"⚠️ {os.path.basename(path)}가 외부에서 변경되어 내보내지 않은 SQLite 변경분을 덮어씁니다.")
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        meta = None
+        if dataset in ENVELOPE_DATASETS and isinstance(records, dict):
+            meta = {k: v for k, v in records.items() if k not in ('count', 'items')}
+            records = records.get('items', [])
+        self._load(dataset, records, meta)
+        with self.conn:
+            self._record_source(dataset, dirty=False)
+        return True
+
+    # --- 쓰기 ---
+
+    def _rows(self, dataset, records, start):
+        _, serial_field, date_field = DATASETS[dataset]
+        for pos, record in enumerate(records, start):
+            serial, date = _key_columns(record, serial_field, date_field) if isinstance(record, dict) else (None, None)
+            yield pos, serial, date, json.dumps(record, ensure_ascii=False)
+
+    def _load(self, dataset, records, meta=None):
+        with self.conn:
+            self.conn.execute(f'DELETE FROM {dataset}')
+            self.conn.executemany(f'INSERT INTO {dataset} (pos, serial, date, data) VALUES (?, ?, ?, ?)',
+                                  self._rows(dataset, records, 0))
+            if dataset in ENVELOPE_DATASETS:
+                self.conn.execute('INSERT OR REPLACE INTO envelopes (dataset, meta) VALUES (?, ?)',
+                                  (dataset, json.dumps(meta or {}, ensure_ascii=False)))
+
+    def _mark_dirty(self, dataset):
+        self.conn.execute(
+            'INSERT INTO sources (dataset, dirty) VALUES (?, 1) '
+            'ON CONFLICT(dataset) DO UPDATE SET dirty = 1', (dataset,))
+
+    def replace(self, dataset, records, meta=None):
+        """데이터셋 전체를 records로 교체한다(단일 트랜잭션 + executemany). meta는 객체형 데이터셋의 메타."""
+        self._synced.add(dataset)
+        self._load(dataset, records, meta)
+        with self.conn:
+            self._mark_dirty(dataset)
+
+    def insert(self, dataset, records, start, staged=False):
+        """records를 pos = start, start+1, ... 위치에 넣는다(이미 있으면 덮어씀).
+
+        페이지 단위로 도착 순서와 무관하게 넣어도 pos 순서가 원본 순서가 된다. staged=True면 stage()로 만든
+        스테이징 테이블에 넣고 dirty로 표시하지 않는다. 페이지마다 호출하면 전체 목록을 메모리에 모으지 않고 채울 수 있다.
+        """
+        table = _staging_table(dataset) if staged else dataset
+        with self.conn:
+            self.conn.executemany(f'INSERT OR REPLACE INTO {table} (pos, serial, date, data) VALUES (?, ?, ?, ?)',
+                                  self._rows(dataset, records, start))
+            if not staged:
+                self._mark_dirty(dataset)
+
+    # --- 스테이징 ---
+
+    def stage(self, dataset):
+        """데이터셋의 빈 스테이징 테이블을 만든다(이전에 남은 것은 버린다)."""
+        table = _staging_table(dataset)
+        with self.conn:
+            self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.execute(f'CREATE TABLE {table} (pos INTEGER PRIMARY KEY, serial TEXT, date TEXT, data TEXT NOT NULL)')
+
+    def swap_staged(self, metas):
+        """{데이터셋: meta}의 스테이징 테이블을 한 트랜잭션으로 본 테이블과 바꾸고 dirty로 표시한다."""
+        with self.conn:
+            for dataset, meta in metas.items():
+                table = _staging_table(dataset)
+                self.conn.execute(f'DELETE FROM {dataset}')
+                self.conn.execute(f'INSERT INTO {dataset} (pos, serial, date, data) '
+                                  f'SELECT pos, serial, date, data FROM {table}')
+                if dataset in ENVELOPE_DATASETS:
+                    self.conn.execute('INSERT OR REPLACE INTO envelopes (dataset, meta) VALUES (?, ?)',
+                                      (dataset, json.dumps(meta or {}, ensure_ascii=False)))
+                self._mark_dirty(dataset)
+                self.conn.execute(f'DROP TABLE {table}')
+        self._synced.update(metas)
+
+    def discard_staged(self, datasets):
+        with self.conn:
+            for dataset in datasets:
+                self.conn.execute(f'DROP TABLE IF EXISTS {_staging_table(dataset)}')
+
+    def update_many(self, dataset, updates):
+        """[(serial, {필드: 값})] 목록으로 해당 시리얼 레코드의 필드를 고친다. 바뀐 행 수를 반환.
+
+        필드 구성이 같은 갱신끼리 묶어 executemany 한 번으로 실행한다(시리얼마다 인덱스 UPDATE 한 번).
+        """
+        self.sync(dataset)
+        _, _, date_field = DATASETS[dataset]
+        groups = {}
+        for serial, fields in updates:
+            groups.setdefault(tuple(fields), []).append((serial, fields))
+
+        changed = 0
+        with self.conn:
+            for keys, items in groups.items():
+                assignments = ', '.join('?, json(?)' for _ in keys)
+                sql = f'UPDATE {dataset} SET data = json_set(data, {assignments})'
+                if date_field in keys:
+                    sql += ', date = ?'
+                sql += ' WHERE serial = ?'
+                params = []
+                for serial, fields in items:
+                    row = []
+                    for k in keys:
+                        row += [_json_path(k), json.dumps(fields[k], ensure_ascii=False)]
+                    if date_field in keys:
+                        value = fields[date_field]
+                        row.append(str(value).strip()[:10] if value else None)
+                    row.append(str(serial).strip())
+                    params.append(row)
+                before = self.conn.total_changes
+                self.conn.executemany(sql, params)
+                changed += self.conn.total_changes - before
+            if changed:
+                self.conn.execute('UPDATE sources SET dirty = 1 WHERE dataset = ?', (dataset,))
+        return changed
+
+    def update(self, dataset, serial, **fields):
+        return self.update_many(dataset, [(serial, fields)])
+
+    # --- 읽기 ---
+
+    def count(self, dataset):
+        self.sync(dataset)
+        return self.conn.execute(f'SELECT COUNT(*) FROM {dataset}').fetchone()[0]
+
+    def records(self, dataset, serial=None, date_from=None, date_to=None):
+        """원본 순서대로 레코드 dict 목록. serial/date 조건은 인덱스를 사용한다."""
+        self.sync(dataset)
+        where, params = [], []
+        if serial is not None:
+            where.append('serial = ?')
+            params.append(str(serial).strip())
+        if date_from:
+            where.append('date >= ?')
+            params.append(date_from)
+        if date_to:
+            where.append('date <= ?')
+            params.append(date_to)
+        sql = f'SELECT data FROM {dataset}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY pos'
+        return [json.loads(data) for (data,) in self.conn.execute(sql, params)]
+
+    # --- 내보내기 ---
+
+    def export(self, datasets=None, force=False):
+        """dirty 데이터셋(force면 전부)을 db/*.json으로 쓴다. 쓴 파일 경로 목록을 반환.
+
+        여러 데이터셋은 한 배치로 커밋되므로 읽는 쪽이 서로 맞지 않는 조합을 보지 않는다.
+        """
+        exported = []
+        with WriteBatch(self.db_dir) as batch:
+            for dataset in datasets or DATASETS:
+                row = self._source_row(dataset)
+                if not force and not (row and row[2]):
+                    continue
+                records = [json.loads(data) for (data,) in self.conn.execute(f'SELECT data FROM {dataset} ORDER BY pos')]
+                if dataset in ENVELOPE_DATASETS:
+                    row = self.conn.execute('SELECT meta FROM envelopes WHERE dataset = ?', (dataset,)).fetchone()
+                    records = {**(json.loads(row[0]) if row else {}), 'count': len(records), 'items': records}
+                batch.write_json(self.json_file(dataset), records)
+                exported.append(dataset)
+        # 파일이 모두 제자리에 놓인 뒤에 size/mtime을 기록한다
+        with self.conn:
+            for dataset in exported:
+                self._record_source(dataset, dirty=False)
+        return [self.json_file(dataset) for dataset in exported]
+
+
+def open_store(path=STORE_FILE):
+    return CemsStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CEMS SQLite 저장소 관리')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help='db/*.json을 SQLite로 가져오기')
+    imp.add_argument('datasets', nargs='*', help='데이터셋(기본: 전부)')
+    exp = sub.add_parser('export', help='SQLite 변경분을 db/*.json으로 내보내기')
+    exp.add_argument('datasets', nargs='*', help='데이터셋(기본: 전부)')
+    exp.add_argument('--force', action='store_true', help='변경 여부와 무관하게 모두 내보내기')
+    query = sub.add_parser('query', help='시리얼/기간으로 레코드 조회')
+    query.add_argument('dataset', choices=list(DATASETS))
+    query.add_argument('--serial')
+    query.add_argument('--from', dest='date_from')
+    query.add_argument('--to', dest='date_to')
+    args = parser.parse_args()
+    unknown = [d for d in getattr(args, 'datasets', []) if d not in DATASETS]
+    if unknown:
+        parser.error(f"알 수 없는 데이터셋: {', '.join(unknown)} (가능: {', '.join(DATASETS)})")
+
+    with open_store() as store:
+        if args.command == 'import':
+            for dataset in args.datasets or DATASETS:
+                loaded = store.sync(dataset, force=True)
+                print(f'{dataset}: {store.count(dataset)}건' + ('' if loaded else ' (원본 JSON 없음)'))
+        elif args.command == 'export':
+            for path in store.export(args.datasets or None, force=args.force):
+                print(f'내보냄: {path}')
+        else:
+            rows = store.records(args.dataset, args.serial, args.date_from, args.date_to)
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+            print(f'{len(rows)}건')
+
+
+if __name__ == '__main__':
+    main()
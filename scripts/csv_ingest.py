@@ -0,0 +1,202 @@
+"""
+CSV 수집 공통 모듈: 인코딩 판별 + 한 번 디코딩 + 행 스트리밍
+
+인코딩은 파일 전체 내용으로 판별한다.
+ 1) BOM(utf-8-sig, utf-16)
+ 2) 파일 전체가 UTF-8로 깨짐 없이 디코딩되면 utf-8
+ 3) 아니면 파일 전체가 CP949로 디코딩되고 비ASCII 바이트가 EUC-KR/CP949 2바이트 패턴으로 설명되면
+    cp949, 그것도 아니면 판별 불가(EncodingError)
+UTF-8/CP949 검사는 점진 디코더로 파일을 한 번 훑으며 함께 하므로, 판별된 인코딩으로 읽다가 뒤쪽에서
+UnicodeDecodeError가 나는 일은 없다(앞부분 표본만 보던 예전 방식의 재시도가 필요 없다).
+판별 결과는 .cache/csv_encodings.json에 파일 경로별로 (크기, mtime_ns, 내용 전체 sha1) 키와 함께 저장한다.
+내용이 한 바이트라도 바뀌면 키가 달라져 다시 판별하므로, 캐시가 맞으면 판별 당시와 같은 내용이다.
+알 수 없는 바이트를 latin-1로 읽어 글자가 깨진 채 진행하지는 않는다.
+
+기존처럼 utf-8 → utf-8-sig → cp949 → euc-kr 순으로 파일 전체를 여러 번 파싱하지 않고,
+판별된 인코딩으로 한 번만 열어 csv.reader 행을 그대로 흘려보낸다(read_csv_rows는 제너레이터).
+인코딩이 필요한 호출자는 detect_encoding으로 한 번 판별해 read_csv_rows/read_csv_df에 넘긴다.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import os
+
+SAMPLE_SIZE = 64 * 1024
+CHUNK_SIZE = 1 << 20
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'csv_encodings.json')
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_cache = None
+
+
+class EncodingError(ValueError):
+    """인코딩을 판별할 수 없는 파일."""
+
+
+def _iter_chunks(path):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b'')
+
+
+def _cache_key(path):
+    """(크기, mtime_ns, 내용 전체 sha1) 문자열."""
+    st = os.stat(path)
+    digest = hashlib.sha1()
+    for chunk in _iter_chunks(path):
+        digest.update(chunk)
+    return f'{st.st_size}:{st.st_mtime_ns}:{digest.hexdigest()}'
+
+
+def _is_utf8(sample, complete):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decoder.decode(sample, final=complete)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _korean_pair_ratio(sample):
+    """비ASCII 바이트 중 CP949 2바이트 문자로 설명되는 비율."""
+    pairs = 0
+    high = 0
+    i = 0
+    n = len(sample)
+    while i < n:
+        b = sample[i]
+        if b < 0x80:
+            i += 1
+            continue
+        high += 1
+        if i + 1 < n and 0x81 <= b <= 0xFE:
+            t = sample[i + 1]
+            if 0xA1 <= t <= 0xFE or 0x41 <= t <= 0x5A or 0x61 <= t <= 0x7A or 0x81 <= t <= 0xA0:
+                pairs += 1
+                high += 1
+                i += 2
+                continue
+        i += 1
+    return (pairs * 2) / high if high else 0.0
+
+
+def sniff_encoding(sample, complete=False):
+    """바이트 표본으로 인코딩을 판별한다. complete=True면 표본이 파일 전체. 판별할 수 없으면 None."""
+    for bom, name in _BOMS:
+        if sample.startswith(bom):
+            return name
+    if _is_utf8(sample, complete):
+        return 'utf-8'
+    if _korean_pair_ratio(sample) >= 0.9:
+        return 'cp949'
+    return None
+
+
+def sniff_file(path):
+    """파일 전체를 한 번 읽으며 인코딩을 판별한다. 판별할 수 없으면 None.
+
+    UTF-8/CP949 점진 디코더를 함께 돌려 끝까지 디코딩되는 쪽만 남긴다. CP949 패턴 비율은 처음 나온
+    비ASCII 청크(최대 SAMPLE_SIZE 바이트)로 본다.
+    """
+    decoders = {name: codecs.getincrementaldecoder(name)() for name in ('utf-8', 'cp949')}
+    head = None
+    probe = None
+    for chunk in _iter_chunks(path):
+        if head is None:
+            head = chunk[:SAMPLE_SIZE]
+            for bom, name in _BOMS:
+                if head.startswith(bom):
+                    return name
+        if probe is None and not chunk.isascii():
+            probe = chunk[:SAMPLE_SIZE]
+        for name, decoder in list(decoders.items()):
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError:
+                del decoders[name]
+        if not decoders:
+            return None
+    for name, decoder in list(decoders.items()):
+        try:
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            del decoders[name]
+    if 'utf-8' in decoders:
+        return 'utf-8'
+    if 'cp949' in decoders and probe is not None and _korean_pair_ratio(probe) >= 0.9:
+        return 'cp949'
+    return None
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                _cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _cache = {}
+        # 예전 형식(지문 → 인코딩) 항목은 버린다
+        _cache = {k: v for k, v in _cache.items() if isinstance(v, dict)}
+    return _cache
+
+
+def _save_cache():
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    tmp_path = CACHE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def detect_encoding(path, use_cache=True):
+    """파일 인코딩을 판별한다(캐시 사용). 판별할 수 없으면 EncodingError."""
+    if not use_cache:
+        encoding = sniff_file(path)
+    else:
+        cache = _load_cache()
+        name = os.path.abspath(path)
+        key = _cache_key(path)
+        entry = cache.get(name)
+        encoding = entry['encoding'] if entry and entry.get('key') == key else sniff_file(path)
+        if encoding is not None and entry != {'key': key, 'encoding': encoding}:
+            cache[name] = {'key': key, 'encoding': encoding}
+            _save_cache()
+    if encoding is None:
+        forget_encoding(path)
+        raise EncodingError(f'인코딩을 판별할 수 없습니다(UTF-8/CP949 아님): {path}')
+    return encoding
+
+
+def forget_encoding(path):
+    """캐시된 판별 결과를 지운다."""
+    cache = _load_cache()
+    if cache.pop(os.path.abspath(path), None) is not None:
+        _save_cache()
+
+
+def open_text(path, encoding=None):
+    """판별된 인코딩으로 텍스트 모드 파일을 연다(csv 모듈용 newline='')."""
+    return open(path, 'r', encoding=encoding or detect_encoding(path), newline='')
+
+
+def read_csv_rows(path, encoding=None, **reader_kwargs):
+    """CSV 행(list[str])을 하나씩 돌려준다. 파일은 한 번만 열고 한 번만 디코딩한다.
+
+    encoding을 주지 않으면 detect_encoding으로 판별한다(파일 전체로 검증된 인코딩이다).
+    """
+    with open_text(path, encoding) as f:
+        yield from csv.reader(f, **reader_kwargs)
+
+
+def read_csv_df(path, encoding=None, **kwargs):
+    """pandas.read_csv에 판별된 인코딩을 넘겨 읽는다. encoding을 주면 판별하지 않는다."""
+    import pandas as pd
+
+    return pd.read_csv(path, encoding=encoding or detect_encoding(path), **kwargs)
@@ -0,0 +1,249 @@
+"""
+db/ 산출물의 원자적 일괄 쓰기
+
+WriteBatch는 각 파일을 같은 디렉터리의 임시 파일에 쓰고 fsync한 뒤, commit 때 한꺼번에
+제자리로 rename한다. 한 배치에서 쓴 파일들은 세대 번호 하나를 공유하고, 마지막 단계로
+세대 매니페스트(db/_generation.json)를 원자적으로 교체한다.
+
+커밋 순서:
+ 1) 모든 임시 파일 fsync (실패하면 임시 파일만 지우고 원본은 그대로)
+ 2) 저널(db/_generation.journal)에 (임시 → 대상) 목록 기록 + fsync
+ 3) rename 실행, 디렉터리 fsync
+ 4) 매니페스트 교체(세대 +1, 파일별 세대/크기/sha256), 저널 삭제
+3)이나 4) 도중 중단되면 다음 WriteBatch(또는 recover())가 저널을 보고 남은 rename과 매니페스트 갱신을
+마저 끝낸다(roll-forward). 따라서 읽는 쪽은 이전 세대 전체 또는 새 세대 전체를 보게 된다.
+여러 파일을 한 시점으로 읽어야 하면 read_consistent()가 세대 번호를 앞뒤로 확인한다.
+
+사용법:
+  with WriteBatch() as batch:
+      batch.write_json('db/equipment_data.json', records)
+      batch.write_json('db/equipment_db.json', equipment)
+  write_json_atomic('db/dashboard_data.json', data)     # 파일 하나짜리 배치
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 진행
+    fcntl = None
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+GENERATION_NAME = '_generation.json'
+JOURNAL_NAME = '_generation.journal'
+LOCK_NAME = '_generation.lock'
+
+JSON_DEFAULTS = {'ensure_ascii': False, 'indent': 2}
+
+
+def _fsync_dir(path):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _replace_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def _locked(db_dir):
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(db_dir, LOCK_NAME), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_generation(db_dir=DB_DIR):
+    """현재 세대 매니페스트. 없으면 세대 0의 빈 매니페스트."""
+    try:
+        with open(os.path.join(db_dir, GENERATION_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'generation': 0, 'files': {}}
+
+
+def _commit_manifest(db_dir, renames, removed):
+    manifest = read_generation(db_dir)
+    generation = manifest.get('generation', 0) + 1
+    files = manifest.setdefault('files', {})
+    for _, target in renames:
+        if os.path.exists(target):
+            rel = os.path.relpath(target, db_dir).replace(os.sep, '/')
+            if not rel.startswith('..'):
+                files[rel] = {'generation': generation, 'size': os.path.getsize(target),
+                              'sha256': _file_digest(target)}
+    for target in removed:
+        files.pop(os.path.relpath(target, db_dir).replace(os.sep, '/'), None)
+    manifest['generation'] = generation
+    manifest['committedAt'] = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+    manifest['files'] = dict(sorted(files.items()))
+    _replace_json(os.path.join(db_dir, GENERATION_NAME), manifest)
+    return generation
+
+
+def recover(db_dir=DB_DIR):
+    """중단된 커밋의 저널이 있으면 남은 rename/삭제와 매니페스트 갱신을 끝낸다. 복구했으면 True."""
+    journal_path = os.path.join(db_dir, JOURNAL_NAME)
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+    except FileNotFoundError:
+        return False
+    except json.JSONDecodeError:
+        # 저널 기록 중 중단: rename이 시작되지 않았으므로 원본이 그대로다
+        os.remove(journal_path)
+        return False
+    renames = journal.get('renames', [])
+    for tmp_path, target in renames:
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, target)
+    for target in journal.get('removed', []):
+        if os.path.exists(target):
+            os.remove(target)
+    _fsync_dir(db_dir)
+    _commit_manifest(db_dir, renames, journal.get('removed', []))
+    os.remove(journal_path)
+    return True
+
+
+class WriteBatch:
+    """여러 파일을 한 세대로 커밋하는 쓰기 배치. with 블록이 예외 없이 끝나면 commit()."""
+
+    def __init__(self, db_dir=DB_DIR):
+        self.db_dir = db_dir
+        self.generation = None
+        self._staged = {}     # 대상 경로 → 임시 경로
+        self._removed = set()
+        os.makedirs(db_dir, exist_ok=True)
+        with _locked(db_dir):
+            recover(db_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def _tmp_path(self, path):
+        return f'{path}.{os.getpid()}.tmp'
+
+    @contextlib.contextmanager
+    def open(self, path, mode='w'):
+        """대상 파일 대신 임시 파일을 연다('w' 텍스트 UTF-8 또는 'wb'). 닫을 때 fsync한다."""
+        path = os.path.abspath(path)
+        tmp_path = self._tmp_path(path)
+        kwargs = {} if 'b' in mode else {'encoding': 'utf-8'}
+        try:
+            with open(tmp_path, mode, **kwargs) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+        self._staged[path] = tmp_path
+        self._removed.discard(path)
+
+    def write_bytes(self, path, data):
+        with self.open(path, 'wb') as f:
+            f.write(data)
+
+    def write_json(self, path, data, **dump_kw):
+        with self.open(path, 'w') as f:
+            json.dump(data, f, **{**JSON_DEFAULTS, **dump_kw})
+
+    def remove(self, path):
+        """커밋 시 대상 파일을 지운다(없으면 무시)."""
+        path = os.path.abspath(path)
+        tmp_path = self._staged.pop(path, None)
+        if tmp_path:
+            os.remove(tmp_path)
+        self._removed.add(path)
+
+    def abort(self):
+        for tmp_path in self._staged.values():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+        self._staged.clear()
+        self._removed.clear()
+
+    def commit(self):
+        """스테이징한 파일을 제자리로 옮기고 세대 번호를 올린다. 쓴 파일이 없으면 None."""
+        renames = [(tmp_path, target) for target, tmp_path in self._staged.items()]
+        removed = sorted(p for p in self._removed if os.path.exists(p))
+        if not renames and not removed:
+            return None
+        journal_path = os.path.join(self.db_dir, JOURNAL_NAME)
+        with _locked(self.db_dir):
+            with open(journal_path, 'w', encoding='utf-8') as f:
+                json.dump({'renames': renames, 'removed': removed}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            for tmp_path, target in renames:
+                os.replace(tmp_path, target)
+            for target in removed:
+                os.remove(target)
+            for directory in {os.path.dirname(t) for _, t in renames} | {self.db_dir}:
+                _fsync_dir(directory)
+            self.generation = _commit_manifest(self.db_dir, renames, removed)
+            os.remove(journal_path)
+        self._staged.clear()
+        self._removed.clear()
+        return self.generation
+
+
+def write_json_atomic(path, data, db_dir=DB_DIR, **dump_kw):
+    """파일 하나를 원자적으로 쓴다(기본 indent=2, ensure_ascii=False)."""
+    with WriteBatch(db_dir) as batch:
+        batch.write_json(path, data, **dump_kw)
+    return batch.generation
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_consistent(paths, db_dir=DB_DIR, retries=5, load=None):
+    """paths의 JSON을 같은 세대에서 읽는다. 읽는 도중 세대가 바뀌면 다시 읽는다.
+    load(path)를 넘기면 json.load 대신 그것으로 읽는다.
+
+    반환: (세대 번호, [데이터, ...])
+    """
+    for _ in range(retries):
+        before = read_generation(db_dir).get('generation', 0)
+        data = [(load or _load_json)(path) for path in paths]
+        if read_generation(db_dir).get('generation', 0) == before:
+            return before, data
+    raise RuntimeError(f'{retries}회 시도 동안 db 세대가 계속 바뀌었습니다')
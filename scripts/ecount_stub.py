@@ -0,0 +1,212 @@
+"""
+ECOUNT 프록시 대역(stand-in) 서버 — 오프라인 재생/처리량 측정용
+
+ecount-zone-api-backend.js와 같은 경로를 흉내 낸다.
+  GET  /api/health        {"status": "OK"}
+  POST /api/ecount/call   {"path", "body"} → {"zone", "data"}
+응답은 --recordings 디렉터리(ecount_sync.py --record로 저장한 파일)에서 요청 해시로 찾아 재생하고,
+녹화가 없는 요청은 결정적인 합성 페이지(Data.Total + Data.List, ECOUNT 필드명)로 답한다.
+--latency로 요청당 지연을, --fail-rate로 일시 오류(503)를 흉내 내 재시도 경로도 확인할 수 있다.
+
+사용법:
+  python scripts/ecount_stub.py --port 3900 --latency 40
+  python scripts/ecount_sync.py --proxy http://127.0.0.1:3900 --no-cache
+  python scripts/ecount_stub.py --bench --concurrency 1 4 16 --latency 40   # 임시 저장소로 처리량 비교
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime
+
+from cems_store import CemsStore
+from ecount_sync import run_sync, request_hash
+
+# 합성 응답 행 수(경로별)
+DEFAULT_ROWS = {
+    '/Inventory/GetListProduct': 5000,
+    '/Customer/GetListCustomer': 1200,
+    '/Inventory/GetListCurrentStock': 8000,
+}
+CATEGORIES = ['(NOx, SOx) BMW-5000', '(PM-10) KMS-4200', '(CO) MEZUS-310', '(벤젠) MP-Σ30KNⅡ', '(HCl) HCl-2000']
+WAREHOUSES = ['청명', '현장', '수리', '본사 창고']
+
+
+def _synthetic_row(api_path, i):
+    if api_path == '/Inventory/GetListProduct':
+        category = CATEGORIES[i % len(CATEGORIES)]
+        return {'PROD_CD': f'P{i:06d}', 'PROD_DES': f'{category} 부품 {i}', 'STND_DES': f'규격-{i % 97}',
+                'UNIT_DES': 'EA', 'SALE_PRICE': str(10000 + i % 500 * 100), 'PUR_PRICE': str(7000 + i % 300 * 100),
+                'CATEGORY': category, 'STATUS': '활성'}
+    if api_path == '/Customer/GetListCustomer':
+        return {'CUST_CD': f'C{i:05d}', 'CUST_DES': f'거래처 {i}', 'TEL': f'02-{1000 + i % 9000}-{i % 10000:04d}',
+                'CEO_DES': f'대표 {i % 50}', 'ADDR': f'서울시 {i % 25}구', 'EMAIL': f'c{i}@example.com',
+                'CUST_TYPE': '매출처' if i % 3 else '매입처'}
+    return {'PROD_CD': f'P{i % 5000:06d}', 'WH_CD': WAREHOUSES[i % len(WAREHOUSES)], 'QTY': str(i % 40),
+            'LOT': f'L{i // 40:05d}', 'LAST_DT': f'2025{(i % 12) + 1:02d}{(i % 28) + 1:02d}'}
+
+
+def synthetic_response(api_path, body, rows=DEFAULT_ROWS, with_total=True):
+    total = rows.get(api_path, 0)
+    page = int(body.get('Page') or 1)
+    size = int(body.get('PageSize') or 500)
+    start = (page - 1) * size
+    items = [_synthetic_row(api_path, i) for i in range(start, min(start + size, total))]
+    data = {'List': items}
+    if with_total:
+        data['Total'] = total
+    return {'zone': 'STUB', 'data': {'Status': '200', 'Data': data}}
+
+
+def load_recordings(directory):
+    """{요청 해시: 녹화된 응답}. 디렉터리가 없으면 빈 dict."""
+    recordings = {}
+    if not directory or not os.path.isdir(directory):
+        return recordings
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                rec = json.load(f)
+            recordings[request_hash(rec['path'], rec.get('body'))] = rec['response']
+        except (OSError, ValueError, KeyError):
+            continue
+    return recordings
+
+
+class StubServer:
+    def __init__(self, recordings=None, rows=DEFAULT_ROWS, latency=0.0, fail_rate=0.0, with_total=True, seed=0):
+        self.recordings = recordings or {}
+        self.rows = rows
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.with_total = with_total
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self.replayed = 0
+
+    def respond(self, method, path, body):
+        """(status, payload)."""
+        if method == 'GET' and path == '/api/health':
+            return 200, {'status': 'OK', 'timestamp': datetime.utcnow().isoformat() + 'Z'}
+        if method != 'POST' or path != '/api/ecount/call':
+            return 404, {'error': 'not found'}
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'error': 'invalid json'}
+        api_path = request.get('path') or ''
+        if not api_path.startswith('/'):
+            return 400, {'error': 'path가 필요합니다. 예: /Inventory/GetListProduct'}
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            return 503, {'error': 'stub: injected failure'}
+        recorded = self.recordings.get(request_hash(api_path, request.get('body')))
+        if recorded is not None:
+            self.replayed += 1
+            return 200, recorded
+        return 200, synthetic_response(api_path, request.get('body') or {}, self.rows, self.with_total)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request_line = await reader.readuntil(b'\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                    return  # 클라이언트가 연결을 닫았거나 서버 종료
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readuntil(b'\r\n')
+                    if line == b'\r\n':
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, payload = self.respond(method, target.split('?')[0], body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                close = headers.get('connection', '').lower() == 'close'
+                writer.write((f'HTTP/1.1 {status} {"OK" if status == 200 else "ERROR"}\r\n'
+                              'Content-Type: application/json; charset=utf-8\r\n'
+                              f'Content-Length: {len(data)}\r\n'
+                              f'Connection: {"close" if close else "keep-alive"}\r\n\r\n').encode('latin-1') + data)
+                await writer.drain()
+                if close:
+                    return
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=0):
+        server = await asyncio.start_server(self.handle, host, port)
+        return server, server.sockets[0].getsockname()[1]
+
+
+async def bench(concurrencies, page_size, latency, recordings, rows, fail_rate):
+    """동시 요청 수별로 임시 저장소에 전체 동기화를 돌려 처리량을 비교한다."""
+    print(f'{"동시":>4} {"시간(초)":>9} {"요청":>6} {"연결":>5} {"행":>8} {"행/초":>10}')
+    for concurrency in concurrencies:
+        stub = StubServer(recordings, rows, latency, fail_rate)
+        server, port = await stub.start()
+        tmp_dir = tempfile.mkdtemp(prefix='ecount_bench_')
+        try:
+            store = CemsStore(os.path.join(tmp_dir, 'cems.sqlite'), tmp_dir)
+            try:
+                counts, stats = await run_sync(f'http://127.0.0.1:{port}', concurrency, page_size,
+                                               cache_ttl=0, store=store)
+            finally:
+                store.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        total = sum(counts.values())
+        print(f'{concurrency:>4} {stats["elapsed"]:>9.2f} {stats["requests"]:>6} {stats["connections"]:>5} '
+              f'{total:>8} {total / stats["elapsed"]:>10,.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ECOUNT 프록시 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3900)
+    parser.add_argument('--recordings', help='ecount_sync.py --record로 저장한 응답 디렉터리')
+    parser.add_argument('--latency', type=float, default=0.0, help='요청당 지연(ms)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='503으로 답할 비율(0~1)')
+    parser.add_argument('--no-total', action='store_true', help='합성 응답에서 Data.Total을 빼기')
+    parser.add_argument('--scale', type=float, default=1.0, help='합성 행 수 배율')
+    parser.add_argument('--bench', action='store_true', help='서버를 띄우지 않고 동시 요청 수별 처리량 측정')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='--bench 동시 요청 수')
+    parser.add_argument('--page-size', type=int, default=500)
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings)
+    rows = {path: int(n * args.scale) for path, n in DEFAULT_ROWS.items()}
+    latency = args.latency / 1000
+
+    if args.bench:
+        asyncio.run(bench(args.concurrency, args.page_size, latency, recordings, rows, args.fail_rate))
+        return
+
+    async def serve():
+        stub = StubServer(recordings, rows, latency, args.fail_rate, with_total=not args.no_total)
+        server, port = await stub.start(args.host, args.port)
+        print(f'🧪 ECOUNT 대역 서버: http://{args.host}:{port} (녹화 {len(recordings)}건, 지연 {args.latency:g}ms)')
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,474 @@
+"""
+ECOUNT → CEMS 저장소 비동기 동기화(scripts/backend_ecount_sync.mjs의 Python 판)
+
+로컬 ECOUNT 프록시(ecount api/ecount-zone-api-backend.js, POST /api/ecount/call)를 통해
+제품/거래처/재고 목록을 받아 정규화하고 CEMS 저장소(ecount_products/customers/inventory)에 넣은 뒤
+db/backend_ecount_*.json으로 내보낸다. 산출물 형식은 .mjs와 같다({메타..., count, items}).
+
+ - 페이지 조회: 1페이지의 Total로 전체 페이지 수를 알면 나머지를 한꺼번에 요청하고,
+   Total이 없으면 concurrency개씩 묶어서 빈/짧은 페이지가 나올 때까지 요청한다.
+   동시 요청 수는 세마포어(--concurrency)로 제한한다.
+ - 연결: 표준 라이브러리 asyncio 스트림 위의 HTTP/1.1 keep-alive 풀(호스트당 최대 concurrency개)
+ - 재시도: 연결 오류/타임아웃/429/5xx는 지수 백오프 + 지터로 재시도
+ - 캐시: 요청(경로 + 본문) sha1별 응답을 .cache/ecount/에 TTL 동안 보관
+ - 페이지는 도착하는 대로 정규화해 저장소 스테이징 테이블의 (page-1)·pageSize 위치부터 넣으므로 전체 목록을
+   모으지 않는다. 모든 대상의 모든 페이지를 받은 뒤에만 한 트랜잭션으로 본 테이블과 바꾸고 내보낸다.
+   한 페이지라도 실패하면 스테이징을 버리므로 기존 JSON과 저장소(dirty 표시 포함)는 그대로 남는다.
+ - 프록시가 없거나 ECOUNT_DISABLED=1이면 빈 placeholder 산출물을 쓴다(.mjs와 같음).
+ - --record DIR: 받은 응답을 ecount_stub.py가 재생할 수 있는 형식으로 저장한다.
+
+사용법:
+  python scripts/ecount_sync.py                                  # 기본 프록시 http://localhost:3000
+  python scripts/ecount_sync.py --proxy http://127.0.0.1:3900 --concurrency 8 --no-cache
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import random
+import ssl
+import time
+from collections import deque
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+from cems_store import open_store
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT, '.cache', 'ecount')
+DEFAULT_PROXY = os.environ.get('ECOUNT_PROXY_BASE', 'http://localhost:3000')
+
+DEFAULT_CONCURRENCY = 6
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_MAX_PAGES = 200
+CACHE_TTL = 60.0
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class HttpError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f'HTTP {status}: {body[:200]!r}')
+        self.status = status
+        self.body = body
+
+
+# --- HTTP/1.1 keep-alive 연결 풀 ---
+
+class ConnectionPool:
+    """한 호스트에 대한 keep-alive 연결 풀. size개를 넘는 연결은 만들지 않는다."""
+
+    def __init__(self, base_url, size=DEFAULT_CONCURRENCY, timeout=30.0):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.base_path = url.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+
+    async def request(self, method, path, body=None, headers=None):
+        """(status, headers, body bytes). 재사용한 유휴 연결이 끊겨 있으면 새 연결로 한 번 더 보낸다."""
+        async with self._slots:
+            if self._idle:
+                try:
+                    return await self._send(self._idle.popleft(), method, path, body, headers)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    pass  # 서버가 닫은 유휴 연결
+            return await self._send(await self._connect(), method, path, body, headers)
+
+    async def _send(self, conn, method, path, body, headers):
+        try:
+            status, resp_headers, data, keep_alive = await asyncio.wait_for(
+                self._exchange(conn, method, path, body, headers), self.timeout)
+        except BaseException:
+            conn[1].close()
+            raise
+        if keep_alive:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+        return status, resp_headers, data
+
+    async def _exchange(self, conn, method, path, body, headers):
+        reader, writer = conn
+        lines = [f'{method} {self.base_path}{path} HTTP/1.1', f'Host: {self.host}:{self.port}',
+                 'Connection: keep-alive', 'Accept-Encoding: identity']
+        for key, value in (headers or {}).items():
+            lines.append(f'{key}: {value}')
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await writer.drain()
+
+        status_line = await reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            resp_headers[key.strip().lower()] = value.strip()
+
+        if resp_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b''.join(chunks)
+            keep_alive = resp_headers.get('connection', '').lower() != 'close'
+        elif 'content-length' in resp_headers:
+            data = await reader.readexactly(int(resp_headers['content-length']))
+            keep_alive = resp_headers.get('connection', '').lower() != 'close'
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return status, resp_headers, data, keep_alive
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.popleft()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+# --- ECOUNT 프록시 클라이언트 ---
+
+def request_hash(api_path, body):
+    return hashlib.sha1(json.dumps({'path': api_path, 'body': body or {}}, ensure_ascii=False,
+                                   sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class EcountClient:
+    def __init__(self, proxy=DEFAULT_PROXY, concurrency=DEFAULT_CONCURRENCY, retries=3, backoff=0.5,
+                 cache_ttl=CACHE_TTL, cache_dir=CACHE_DIR, record_dir=None, timeout=30.0):
+        self.pool = ConnectionPool(proxy, concurrency, timeout)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self.record_dir = record_dir
+        self.requests = 0
+        self.cache_hits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.pool.close()
+
+    async def health(self):
+        try:
+            status, _, data = await self.pool.request('GET', '/api/health')
+            return status == 200 and json.loads(data).get('status') == 'OK'
+        except (OSError, asyncio.TimeoutError, ValueError):
+            return False
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _read_cache(self, key):
+        if not self.cache_ttl:
+            return None
+        path = self._cache_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['data']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_json(self, directory, key, payload):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f'{key}.json.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directory, f'{key}.json'))
+
+    async def call(self, api_path, body=None):
+        """프록시로 ECOUNT API를 호출해 data 부분을 돌려준다(캐시/재시도 포함)."""
+        key = request_hash(api_path, body)
+        cached = self._read_cache(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        payload = json.dumps({'path': api_path, 'body': body or {}}, ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        for attempt in range(self.retries + 1):
+            try:
+                self.requests += 1
+                status, _, data = await self.pool.request('POST', '/api/ecount/call', payload, headers)
+                if status != 200:
+                    raise HttpError(status, data)
+                response = json.loads(data)
+                break
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HttpError) as e:
+                if attempt == self.retries or (isinstance(e, HttpError) and e.status not in RETRYABLE_STATUS):
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt + random.uniform(0, self.backoff / 2))
+        result = response.get('data', response) if isinstance(response, dict) else response
+        if self.cache_ttl:
+            self._write_json(self.cache_dir, key, {'data': result, 'cachedAt': datetime.now().isoformat()})
+        if self.record_dir:
+            self._write_json(self.record_dir, key, {'path': api_path, 'body': body or {}, 'response': response})
+        return result
+
+
+def _page_list(data):
+    inner = data.get('Data') if isinstance(data, dict) else None
+    inner = inner if isinstance(inner, dict) else {}
+    for candidate in (inner.get('List'), inner.get('Datas'), (data or {}).get('List'), (data or {}).get('Datas')):
+        if candidate:
+            return candidate if isinstance(candidate, list) else []
+    return []
+
+
+def _page_total(data):
+    inner = data.get('Data') if isinstance(data, dict) else None
+    total = (inner.get('Total') if isinstance(inner, dict) else None) or (data or {}).get('Total')
+    try:
+        return int(total) if total else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _cancel_all(tasks):
+    """실패 뒤 남은 작업을 멈추고 결과(예외 포함)를 거둬 들인다."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fetch_paged(client, api_path, body=None, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES,
+                      on_page=None):
+    """모든 페이지를 받아 on_page(page, items)를 호출한다(도착 순서). 받은 항목 수를 반환."""
+    async def fetch(page):
+        data = await client.call(api_path, {**(body or {}), 'Page': page, 'PageSize': page_size})
+        return page, _page_list(data), data
+
+    _, items, first = await fetch(1)
+    if not items:
+        return 0
+    on_page(1, items)
+    received = len(items)
+    total = _page_total(first)
+
+    if total:
+        pages = min(max_pages, math.ceil(total / page_size))
+        tasks = [asyncio.ensure_future(fetch(p)) for p in range(2, pages + 1)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                page, items, _ = await done
+                if items:
+                    on_page(page, items)
+                    received += len(items)
+        except BaseException:
+            await _cancel_all(tasks)
+            raise
+        return received
+
+    # Total이 없으면 concurrency개씩 묶어 요청하고, 빈 페이지나 짧은 페이지가 나오면 멈춘다
+    page = 2
+    while page <= max_pages:
+        wave = range(page, min(page + client.concurrency, max_pages + 1))
+        tasks = [asyncio.ensure_future(fetch(p)) for p in wave]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            await _cancel_all(tasks)
+            raise
+        last = False
+        for p, items, _ in sorted(results, key=lambda r: r[0]):
+            if not items:
+                last = True
+                break
+            on_page(p, items)
+            received += len(items)
+            if len(items) < page_size:
+                last = True
+                break
+        if last:
+            break
+        page = wave[-1] + 1
+    return received
+
+
+# --- 정규화(backend_ecount_sync.mjs와 같은 규칙) ---
+
+def _pick(record, *keys, default=''):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+def _text(record, *keys, default=''):
+    return str(_pick(record, *keys, default=default)).strip()
+
+
+def _number(value):
+    try:
+        number = float(value or 0)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def normalize_product(p):
+    return {
+        'productCode': _text(p, 'PROD_CD', 'ProdCd', 'prod_cd'),
+        'productName': _text(p, 'PROD_DES', 'ProdDes', 'prod_des'),
+        'specification': _text(p, 'STND_DES', 'StndDes', 'stnd_des'),
+        'unit': _text(p, 'UNIT_DES', 'UnitDes', 'unit_des', default='EA'),
+        'salePrice': _number(_pick(p, 'SALE_PRICE', 'SalePrice', default=0)),
+        'purchasePrice': _number(_pick(p, 'PUR_PRICE', 'PurPrice', default=0)),
+        'category': str(_pick(p, 'CATEGORY', 'Category', 'category')),
+        'status': str(_pick(p, 'STATUS', 'Status', 'status', default='활성')),
+    }
+
+
+def normalize_customer(c):
+    return {
+        'customerCode': _text(c, 'CUST_CD', 'CustCd'),
+        'customerName': _text(c, 'CUST_DES', 'CustDes'),
+        'phone': _text(c, 'TEL', 'Phone'),
+        'ceo': _text(c, 'CEO_DES', 'CeoDes'),
+        'address': _text(c, 'ADDR', 'Address'),
+        'email': _text(c, 'EMAIL', 'Email'),
+        'type': str(_pick(c, 'CUST_TYPE', 'CustType')),
+    }
+
+
+def normalize_inventory(i):
+    return {
+        'productCode': _text(i, 'PROD_CD', 'ProdCd'),
+        'warehouse': _text(i, 'WH_CD', 'WhCd', 'WH_DES', 'WhDes'),
+        'qty': _number(_pick(i, 'QTY', 'Qty', 'STOCK_QTY', default=0)),
+        'lot': str(_pick(i, 'LOT', 'Lot')),
+        'lastDate': str(_pick(i, 'LAST_DT', 'LastDate')),
+    }
+
+
+# 데이터셋 → (API 경로, 요청 본문 함수, 정규화, 유지 조건)
+SYNC_TARGETS = {
+    'ecount_products': ('/Inventory/GetListProduct', lambda: {'UseYn': 'Y'}, normalize_product,
+                        lambda p: p['productCode'] or p['productName']),
+    'ecount_customers': ('/Customer/GetListCustomer', lambda: {'UseYn': 'Y'}, normalize_customer,
+                         lambda c: c['customerCode'] or c['customerName']),
+    'ecount_inventory': ('/Inventory/GetListCurrentStock', lambda: {'StdDt': date.today().strftime('%Y%m%d')},
+                         normalize_inventory, lambda i: i['productCode']),
+}
+
+
+def _meta(**extra):
+    return {'_schemaVersion': 1, 'generatedAt': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'source': 'ecount', **extra}
+
+
+def write_placeholders(store, reason):
+    for dataset in SYNC_TARGETS:
+        store.replace(dataset, [], _meta(disabled=True, reason=reason))
+    return store.export(list(SYNC_TARGETS))
+
+
+async def sync(store, client, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES, targets=None):
+    """대상 데이터셋을 모두 받아 저장소에 넣고 JSON으로 내보낸다. {데이터셋: 저장 건수}를 반환."""
+    targets = targets or list(SYNC_TARGETS)
+    counts = {}
+
+    async def run(dataset):
+        api_path, make_body, normalize, keep = SYNC_TARGETS[dataset]
+        store.stage(dataset)
+        kept = 0
+
+        def on_page(page, items):
+            nonlocal kept
+            rows = [r for r in map(normalize, items) if keep(r)]
+            # 페이지 안 위치를 유지하도록 (page-1)·page_size 기준으로 넣는다(걸러진 행은 빈 자리)
+            store.insert(dataset, rows, (page - 1) * page_size, staged=True)
+            kept += len(rows)
+
+        await fetch_paged(client, api_path, make_body(), page_size, max_pages, on_page)
+        counts[dataset] = kept
+
+    # 데이터셋끼리도 동시에 진행하되 요청 수는 클라이언트 풀 크기로 제한된다
+    tasks = [asyncio.ensure_future(run(d)) for d in targets]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # 하나라도 실패하면 나머지를 멈추고 받은 페이지를 버린다(본 테이블/JSON/dirty는 그대로)
+        await _cancel_all(tasks)
+        store.discard_staged(targets)
+        raise
+    store.swap_staged({d: _meta() for d in targets})
+    store.export(targets)
+    return counts
+
+
+async def run_sync(proxy=DEFAULT_PROXY, concurrency=DEFAULT_CONCURRENCY, page_size=DEFAULT_PAGE_SIZE,
+                   max_pages=DEFAULT_MAX_PAGES, cache_ttl=CACHE_TTL, record_dir=None, store=None):
+    """동기화 한 번. (결과 {데이터셋: 건수} 또는 None(placeholder), 통계 dict)."""
+    own_store = store is None
+    store = store or open_store()
+    started = time.perf_counter()
+    try:
+        disabled = os.environ.get('ECOUNT_DISABLED', '').lower() in ('1', 'true')
+        async with EcountClient(proxy, concurrency, cache_ttl=cache_ttl, record_dir=record_dir) as client:
+            if disabled or not await client.health():
+                reason = 'disabled' if disabled else 'proxy_unavailable'
+                write_placeholders(store, reason)
+                return None, {'reason': reason}
+            counts = await sync(store, client, page_size, max_pages)
+            stats = {'elapsed': time.perf_counter() - started, 'requests': client.requests,
+                     'cacheHits': client.cache_hits, 'connections': client.pool.opened}
+            return counts, stats
+    finally:
+        if own_store:
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ECOUNT → CEMS 저장소 비동기 동기화')
+    parser.add_argument('--proxy', default=DEFAULT_PROXY, help=f'ECOUNT 프록시 주소 (기본: {DEFAULT_PROXY})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='동시 요청 수')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES)
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL, help='응답 캐시 유지 시간(초)')
+    parser.add_argument('--no-cache', action='store_true', help='응답 캐시를 쓰지 않음')
+    parser.add_argument('--record', metavar='DIR', help='받은 응답을 스텁 재생용으로 저장할 디렉터리')
+    args = parser.parse_args()
+
+    print('=== ECOUNT 동기화 시작 ===')
+    counts, stats = asyncio.run(run_sync(args.proxy, args.concurrency, args.page_size, args.max_pages,
+                                         0 if args.no_cache else args.cache_ttl, args.record))
+    if counts is None:
+        print(f"⚠️ ECOUNT 동기화 생략({stats['reason']}): 빈 산출물을 썼습니다.")
+        return
+    for dataset, count in counts.items():
+        print(f'  {dataset}: {count}건')
+    rows = sum(counts.values())
+    print(f"⏱️ {stats['elapsed']:.2f}초, 요청 {stats['requests']}회(캐시 {stats['cacheHits']}회), "
+          f"연결 {stats['connections']}개, {rows / stats['elapsed']:,.0f}행/초")
+    print('=== ECOUNT 동기화 완료 ===')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+장비 이동 이벤트 로그와 상태 머신
+
+movements를 추가 전용(append-only) 이벤트 로그(db/equipment_events.jsonl)로 쌓고,
+리듀서가 시리얼별 현재 상태 테이블을 유지한다. SNAPSHOT_EVERY 이벤트마다 전체 상태를
+스냅샷(db/equipment_snapshots/)으로 남기므로, "D일 기준 전체 장비 상태"는 D 이전의 가장
+가까운 스냅샷을 읽고 그 뒤 몇 개의 이벤트만 다시 적용해서 구한다. 현재 상태 테이블은 기록할 때마다
+db/equipment_snapshots/current.json에 같은 형식(seq, date, offset, states)으로 저장하고, 장비 상태 갱신
+(update_equipment_status.py)은 이 테이블을 그대로 읽는다. offset이 로그 크기보다 작으면(기록 도중 중단 등)
+그 뒤 이벤트만 다시 적용하고, 로그가 다시 만들어져 맞지 않으면 가장 가까운 스냅샷에서 다시 구한다.
+
+이벤트 한 줄: {"seq", "src", "date": "YYYY-MM-DD", "serial", "from", "to"}
+  seq: 로그 내 일련번호(0부터), src: 원본 movements JSON 배열에서의 위치(객체가 아닌 원소 포함)
+로그는 날짜 순으로 쌓인다고 가정한다(ECOUNT 내보내기/movements_db.json이 날짜 순).
+
+위치 규칙: 입고처 → (currentLocation, status)는 transition() 하나로 정한다. '현장2'처럼 '현장' 뒤에 번호만
+붙은 입고처(실데이터 13건)는 normalize_location()이 '현장'으로 맞추므로 가동 중이다. 장비 상태 갱신
+(update_equipment_status.py)은 리듀서가 이 규칙으로 만든 상태를 읽고, 가동률(utilization.is_deployed)도 이 함수를 쓴다. 규칙이 바뀌면
+RULES_VERSION을 올린다. 스냅샷에는 규칙을 적용한 상태가 들어 있으므로 로그와 스냅샷을 다시 만든다.
+
+증분 수집: movements_db.json은 통째로 다시 만들어지므로 행 번호만으로는 재정렬/중복 제거/중간 삽입을
+알 수 없다. 그래서 stats_engine.scan_source와 같은 워터마크(size/mtime, 전체 sha1, 마지막 원소 끝 위치와
+그 앞부분 sha1)를 db/equipment_events_source.json에 두고, 앞부분이 그대로이고 뒤에 원소만 붙은 경우에만
+이어 읽는다. 그 밖의 변경이나 로그 크기가 워터마크와 다르면(기록 도중 중단 등) 로그와 스냅샷을 지우고
+처음부터 다시 만든다.
+
+사용법:
+  python scripts/equipment_events.py ingest                    # movements 추가분을 로그에 반영
+  python scripts/equipment_events.py state [--as-of 2025-03-01] [--serial 1789]
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+from db_writer import write_json_atomic
+from movements_store import MOVEMENTS_FILE
+from stats_engine import JsonArrayReader, scan_source
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+EVENTS_FILE = os.path.join(DB_DIR, 'equipment_events.jsonl')
+SNAPSHOT_DIR = os.path.join(DB_DIR, 'equipment_snapshots')
+SOURCE_FILE = os.path.join(DB_DIR, 'equipment_events_source.json')
+CURRENT_NAME = 'current.json'
+
+SNAPSHOT_EVERY = 2000
+RULES_VERSION = 2
+
+SITE_LOCATION = '현장'
+# 입고처 → (currentLocation, status, equipment_data.json의 상태)
+LOCATION_RULES = {
+    SITE_LOCATION: ('현장', '가동 중', '가동중'),
+    '업체': ('수리업체', '수리 중', '수리중'),
+}
+DEFAULT_RULE = ('본사 창고', '대기 중', '대기중')
+_SITE_VARIANT = re.compile(SITE_LOCATION + r'\d+')
+
+
+def normalize_location(to_location):
+    """입고처 이름 정규화. '현장2' 같은 번호 붙은 현장은 '현장'으로 바꾸고 나머지는 앞뒤 공백만 뺀다."""
+    name = (to_location or '').strip()
+    return SITE_LOCATION if _SITE_VARIANT.fullmatch(name) else name
+
+
+def transition(to_location):
+    """입고처로부터 (currentLocation, status, 상태)를 결정한다."""
+    return LOCATION_RULES.get(normalize_location(to_location), DEFAULT_RULE)
+
+
+def apply_event(states, event):
+    """리듀서: 이벤트 하나를 상태 테이블(serial → 상태 dict)에 반영한다. O(1)."""
+    location, status, _ = transition(event['to'])
+    states[event['serial']] = {
+        'date': event['date'],
+        'from': event['from'],
+        'to': event['to'],
+        'currentLocation': location,
+        'status': status,
+        'seq': event['seq'],
+    }
+
+
+def _read_last_line(path):
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    with open(path, 'rb') as f:
+        block = 4096
+        while True:
+            f.seek(max(0, size - block))
+            data = f.read().rstrip(b'\n')
+            if b'\n' in data or block >= size:
+                break
+            block *= 2
+    line = data.rsplit(b'\n', 1)[-1]
+    return json.loads(line) if line.strip() else None
+
+
+class EventLog:
+    def __init__(self, path=EVENTS_FILE, snapshot_dir=SNAPSHOT_DIR, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_every = snapshot_every
+        self.current_path = os.path.join(snapshot_dir, CURRENT_NAME)
+
+    def last_event(self):
+        return _read_last_line(self.path)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def reset(self):
+        """로그와 스냅샷을 모두 지운다(처음부터 다시 수집할 때)."""
+        for _, _, path in self._snapshots():
+            os.remove(path)
+        for path in (self.current_path, self.path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # --- 스냅샷 ---
+
+    def _snapshots(self):
+        """(seq, date, 파일 경로) 목록을 seq 순으로. 파일명: snapshot_{seq}_{date}.json"""
+        try:
+            names = os.listdir(self.snapshot_dir)
+        except FileNotFoundError:
+            return []
+        out = []
+        for name in names:
+            if name.startswith('snapshot_') and name.endswith('.json'):
+                seq, date = name[len('snapshot_'):-len('.json')].split('_', 1)
+                out.append((int(seq), date, os.path.join(self.snapshot_dir, name)))
+        out.sort()
+        return out
+
+    def _load_snapshot(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_snapshot(self, seq, date, offset, states):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, f'snapshot_{seq:08d}_{date}.json')
+        write_json_atomic(path, {'seq': seq, 'date': date, 'offset': offset, 'states': states}, indent=None)
+
+    def _load_current(self):
+        """저장된 현재 상태 테이블. 없거나 로그보다 앞선(로그가 다시 만들어진) 경우 가장 가까운 스냅샷."""
+        try:
+            current = self._load_snapshot(self.current_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            current = None
+        if current is None or current.get('offset', 0) > self.size():
+            return self._nearest_snapshot()
+        return current
+
+    def _nearest_snapshot(self, as_of=None):
+        """as_of(YYYY-MM-DD) 이전의 가장 가까운 스냅샷. 없으면 빈 상태."""
+        for _, date, path in reversed(self._snapshots()):
+            if as_of is None or date <= as_of:
+                return self._load_snapshot(path)
+        return {'seq': -1, 'date': '', 'offset': 0, 'states': {}}
+
+    # --- 기록/재생 ---
+
+    def append(self, events):
+        """이벤트를 로그 끝에 추가하고 필요한 스냅샷을 남긴다. 추가된 이벤트 수를 반환."""
+        if not events:
+            return 0
+        states = self.current()
+        last = self.last_event()
+        seq = last['seq'] + 1 if last else 0
+
+        with open(self.path, 'ab') as f:
+            for event in events:
+                event = dict(event, seq=seq)
+                f.write((json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+                apply_event(states, event)
+                seq += 1
+                if seq % self.snapshot_every == 0:
+                    f.flush()
+                    self._write_snapshot(event['seq'], event['date'], f.tell(), states)
+            f.flush()
+            self._write_current(event['seq'], event['date'], f.tell(), states)
+        return len(events)
+
+    def _write_current(self, seq, date, offset, states):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        write_json_atomic(self.current_path, {'seq': seq, 'date': date, 'offset': offset, 'states': states},
+                          indent=None)
+
+    def current(self):
+        """현재 상태 테이블(serial → 상태). 저장된 테이블 뒤에 로그가 더 있으면 그만큼 적용해 다시 저장한다."""
+        current = self._load_current()
+        states, offset = current['states'], current['offset']
+        seq, date = current['seq'], current['date']
+        for event in self._replay_from(offset):
+            apply_event(states, event)
+            seq, date = event['seq'], event['date']
+        size = self.size()
+        if size and offset != size:
+            self._write_current(seq, date, size, states)
+        return states
+
+    def _replay_from(self, offset):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def state(self, as_of=None):
+        """as_of(YYYY-MM-DD) 시점(당일 이벤트 포함)의 serial → 상태 테이블. None이면 저장된 현재 상태."""
+        if as_of is None:
+            return self.current()
+        snap = self._nearest_snapshot(as_of)
+        states = snap['states']
+        for event in self._replay_from(snap['offset']):
+            if as_of is not None and event['date'] > as_of:
+                break
+            apply_event(states, event)
+        return states
+
+
+def movement_event(src, m):
+    """movements 원소 하나 → 이벤트(seq 제외). 시리얼이나 날짜가 없으면 None."""
+    if not isinstance(m, dict):
+        return None
+    serial = (m.get('serial') or '').strip()
+    date = (m.get('date') or '').strip()[:10]
+    if not serial or not date:
+        return None
+    return {'src': src, 'date': date, 'serial': serial,
+            'from': (m.get('outLocation') or '').strip(), 'to': (m.get('inLocation') or '').strip()}
+
+
+def _load_source(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def ingest_movements(log, json_path=MOVEMENTS_FILE, source_path=SOURCE_FILE):
+    """movements에서 아직 로그에 없는 원소만 이벤트로 추가한다. 뒤에 붙은 것이 아니면 로그를 다시 만든다."""
+    prev = _load_source(source_path)
+    if prev is not None and (prev.get('logSize') != log.size() or prev.get('rulesVersion') != RULES_VERSION):
+        prev = None  # 로그가 워터마크 이후 바뀌었거나 기록이 중간에 끊겼거나 위치 규칙이 바뀌었다
+    mode, wm = scan_source(json_path, prev)
+    if wm is None:
+        print(f'⚠️ {json_path}이(가) 없습니다.')
+        return 0
+    if mode == 'unchanged':
+        if wm != prev:  # 내용은 같고 mtime만 바뀜: 다음 실행에서 다시 해시하지 않도록 갱신
+            wm['logSize'] = log.size()
+            wm['rulesVersion'] = RULES_VERSION
+            write_json_atomic(source_path, wm)
+        return 0
+
+    if mode == 'append':
+        start, start_row = prev['offset'], prev['rows']
+    else:
+        if prev is not None or log.size():
+            print('♻️ movements가 뒤에 추가된 것이 아니어서 이벤트 로그를 처음부터 다시 만듭니다.')
+        # 다시 만드는 동안 끊기면 워터마크가 없어 다음 실행도 처음부터 다시 한다
+        if os.path.exists(source_path):
+            os.remove(source_path)
+        log.reset()
+        start, start_row = 0, 0
+
+    reader = JsonArrayReader(json_path, start)
+    events = [e for e in (movement_event(src, m) for src, m in enumerate(reader, start_row)) if e is not None]
+    last = log.last_event()
+    if last and events and events[0]['date'] < last['date']:
+        late = sum(1 for e in events if e['date'] < last['date'])
+        print(f"⚠️ 마지막 이벤트({last['date']})보다 이전 날짜의 이동 {late}건이 로그 끝에 추가됩니다.")
+    added = log.append(events)
+    wm['rows'] = start_row + reader.rows
+    wm['logSize'] = log.size()
+    wm['rulesVersion'] = RULES_VERSION
+    write_json_atomic(source_path, wm)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description='장비 이동 이벤트 로그/상태 조회')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('ingest', help='movements 추가분을 이벤트 로그에 반영')
+    state_parser = sub.add_parser('state', help='현재 또는 특정 일자 기준 장비 상태')
+    state_parser.add_argument('--as-of', help='기준일 (YYYY-MM-DD)')
+    state_parser.add_argument('--serial', help='특정 시리얼만 조회')
+    args = parser.parse_args()
+
+    log = EventLog()
+    if args.command == 'ingest':
+        added = ingest_movements(log)
+        print(f'이벤트 {added}건 추가: {EVENTS_FILE}')
+        return
+
+    states = log.state(args.as_of)
+    if args.serial:
+        print(json.dumps(states.get(args.serial), ensure_ascii=False, indent=2))
+        return
+    label = args.as_of or '현재'
+    print(f'{label} 기준 장비 {len(states)}대')
+    for status, count in Counter(s['status'] for s in states.values()).most_common():
+        print(f'  {status}: {count}대')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,22 +4,27 @@
 한글이 깨진 CSV 파일을 수정하는 스크립트
 """
 
-import pandas as pd
 import os
 import sys
 
-def fix_csv_encoding(input_file, output_file=None, encoding='cp949'):
+from csv_ingest import detect_encoding, read_csv_df
+
+def fix_csv_encoding(input_file, output_file=None, encoding=None):
     """
     CSV 파일의 인코딩을 수정합니다.
     
     Args:
         input_file (str): 입력 파일 경로
         output_file (str): 출력 파일 경로 (None이면 입력 파일 덮어쓰기)
-        encoding (str): 원본 파일의 인코딩 (보통 'cp949' 또는 'euc-kr')
+        encoding (str): 원본 파일의 인코딩 (None이면 자동 판별)
     """
     try:
         # 원본 인코딩으로 파일 읽기
-        df = pd.read_csv(input_file, encoding=encoding)
+        # 인코딩은 한 번만 판별하고 그 결과를 그대로 넘긴다
+        if encoding is None:
+            encoding = detect_encoding(input_file)
+        df = read_csv_df(input_file, encoding=encoding)
+        print(f"원본 인코딩: {encoding}")
         
         # 헤더 확인 및 수정
         print(f"원본 헤더: {list(df.columns)}")
@@ -0,0 +1,228 @@
+"""
+movements_db.json 컬럼형 바이너리 저장소
+
+레이아웃(리틀 엔디안):
+  magic(8) 'CEMSCOL1' | 헤더 길이 uint32 | 헤더 JSON(utf-8) | 8바이트 정렬된 컬럼 블록들
+헤더: rows, source(원본 JSON의 size/mtime), columns{name: {kind, typecode, offset, dictionary?}}
+  - date: int32 일 번호(1970-01-01 기준 경과일, 결측은 MISSING_DAY)
+  - quantity: int32
+  - serial/outLocation/inLocation/equipmentName/note/status: 사전 인코딩(uint16/uint32 코드 + 문자열 사전)
+
+리더는 파일을 mmap으로 열고 요청한 컬럼 블록만 memoryview로 노출하므로,
+date와 serial만 읽는 집계는 나머지 컬럼 바이트를 건드리지 않고 행 dict도 만들지 않는다.
+
+사용법:
+  python scripts/movements_store.py [입력 JSON] [출력 .cols]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from datetime import date, timedelta
+
+from db_writer import WriteBatch
+from stats_engine import iter_json_array
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+MOVEMENTS_FILE = os.path.join(DB_DIR, 'movements_db.json')
+STORE_FILE = os.path.join(DB_DIR, 'movements_db.cols')
+
+MAGIC = b'CEMSCOL1'
+MISSING_DAY = -(2 ** 31)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# 원본 레코드의 필드 순서를 그대로 유지한다(row() 복원 시 동일한 dict가 나오도록)
+FIELDS = ('date', 'outLocation', 'inLocation', 'equipmentName', 'serial', 'quantity', 'note', 'status')
+DICT_FIELDS = ('outLocation', 'inLocation', 'equipmentName', 'serial', 'note', 'status')
+
+
+def day_number(value):
+    """'YYYY-MM-DD...' 문자열을 일 번호로 변환. 비었거나 형식이 다르면 MISSING_DAY."""
+    value = (value or '').strip()[:10]
+    if len(value) != 10 or value[4] != '-' or value[7] != '-':
+        return MISSING_DAY
+    try:
+        return date(int(value[:4]), int(value[5:7]), int(value[8:10])).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return MISSING_DAY
+
+
+def day_to_iso(day):
+    if day == MISSING_DAY:
+        return ''
+    return (date(1970, 1, 1) + timedelta(days=day)).isoformat()
+
+
+def _align(n, to=8):
+    return (n + to - 1) // to * to
+
+
+def convert(json_path=MOVEMENTS_FILE, out_path=STORE_FILE):
+    """movements JSON을 컬럼형 파일로 변환한다. 변환한 행 수를 반환."""
+    from array import array
+
+    dates = array('i')
+    quantities = array('i')
+    codes = {f: array('I') for f in DICT_FIELDS}
+    lookups = {f: {} for f in DICT_FIELDS}
+
+    for m in iter_json_array(json_path):
+        if not isinstance(m, dict):
+            continue
+        dates.append(day_number(m.get('date')))
+        try:
+            quantities.append(int(m.get('quantity') or 0))
+        except (TypeError, ValueError):
+            quantities.append(0)
+        for f in DICT_FIELDS:
+            value = m.get(f)
+            value = '' if value is None else str(value)
+            lookup = lookups[f]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes[f].append(code)
+
+    rows = len(dates)
+    blocks = [('date', 'i', dates, None), ('quantity', 'i', quantities, None)]
+    for f in DICT_FIELDS:
+        typecode = 'H' if len(lookups[f]) <= 0xFFFF else 'I'
+        blocks.append((f, typecode, array(typecode, codes[f]), list(lookups[f])))
+
+    st = os.stat(json_path)
+    columns = {}
+    header = {
+        'rows': rows,
+        'fields': list(FIELDS),
+        'source': {'path': os.path.basename(json_path), 'size': st.st_size, 'mtime': st.st_mtime_ns},
+        'columns': columns,
+    }
+    # 헤더 길이가 오프셋에 영향을 주므로 오프셋을 채운 뒤 길이가 안정될 때까지 반복
+    header_len = 0
+    while True:
+        offset = _align(len(MAGIC) + 4 + header_len)
+        for name, typecode, data, dictionary in blocks:
+            columns[name] = {'kind': 'dict' if dictionary is not None else 'int',
+                             'typecode': typecode, 'offset': offset}
+            if dictionary is not None:
+                columns[name]['dictionary'] = dictionary
+            offset = _align(offset + len(data) * data.itemsize)
+        encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        if len(encoded) == header_len:
+            break
+        header_len = len(encoded)
+
+    if sys.byteorder != 'little':
+        for _, _, data, _ in blocks:
+            data.byteswap()
+
+    with WriteBatch() as batch, batch.open(out_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(encoded)))
+        f.write(encoded)
+        for name, _, data, _ in blocks:
+            f.write(b'\0' * (columns[name]['offset'] - f.tell()))
+            data.tofile(f)
+    return rows
+
+
+class MovementsStore:
+    """컬럼형 movements 파일의 mmap 리더."""
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 빈 파일은 mmap 불가
+            self._file.close()
+            raise ValueError(f'컬럼형 파일이 비어 있습니다: {path}')
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'컬럼형 movements 파일이 아닙니다: {path}')
+        (header_len,) = struct.unpack_from('<I', self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[start:start + header_len].decode('utf-8'))
+        self.rows = self.header['rows']
+        self._columns = {}
+
+    def close(self):
+        # mmap을 닫기 전에 내보낸 memoryview를 모두 해제해야 한다
+        for view in self._columns.values():
+            view.release()
+        self._columns.clear()
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """컬럼 블록을 복사 없이 memoryview(int32 또는 사전 코드)로 돌려준다."""
+        view = self._columns.get(name)
+        if view is None:
+            spec = self.header['columns'][name]
+            size = struct.calcsize(spec['typecode'])
+            with memoryview(self._mm) as whole:
+                with whole[spec['offset']:spec['offset'] + self.rows * size] as raw:
+                    view = self._columns[name] = raw.cast(spec['typecode'])
+        return view
+
+    def dictionary(self, name):
+        return self.header['columns'][name].get('dictionary')
+
+    def row(self, i):
+        """i번째 행을 원본 JSON과 같은 dict로 복원한다(최근 이동 표시 등 소량 조회용)."""
+        if i < 0:
+            i += self.rows
+        out = {}
+        for f in self.header['fields']:
+            value = self.column(f)[i]
+            if f == 'date':
+                value = day_to_iso(value)
+            elif self.header['columns'][f]['kind'] == 'dict':
+                value = self.dictionary(f)[value]
+            out[f] = value
+        return out
+
+    def tail(self, n):
+        return [self.row(i) for i in range(max(0, self.rows - n), self.rows)]
+
+
+def open_store_for(json_path=MOVEMENTS_FILE, store_path=None):
+    """원본 JSON과 동기화된 컬럼형 파일(기본: 같은 이름의 .cols)이 있으면 MovementsStore를,
+    없거나 오래됐으면 None을 돌려준다."""
+    if store_path is None:
+        store_path = os.path.splitext(json_path)[0] + '.cols'
+    try:
+        st = os.stat(json_path)
+        store = MovementsStore(store_path)
+    except (OSError, ValueError):
+        return None
+    source = store.header.get('source', {})
+    if source.get('size') != st.st_size or source.get('mtime') != st.st_mtime_ns:
+        store.close()
+        return None
+    return store
+
+
+def main():
+    json_path = sys.argv[1] if len(sys.argv) > 1 else MOVEMENTS_FILE
+    out_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(json_path)[0] + '.cols'
+    rows = convert(json_path, out_path)
+    print(f'{rows}행 변환 완료: {out_path} ({os.path.getsize(out_path):,} bytes, 원본 {os.path.getsize(json_path):,} bytes)')
+
+
+if __name__ == '__main__':
+    main()
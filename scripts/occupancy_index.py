@@ -0,0 +1,244 @@
+"""
+시리얼별 일 단위 배치 비트맵 인덱스
+
+시리얼마다 조회 구간의 하루를 1비트로 표현한다(1 = 현장 배치, 0 = 미배치(청명 재고/업체 등)).
+배치 정의는 가동률(utilization.py)과 같다: utilization.is_deployed(equipment_events.transition 규칙,
+'현장2' 같은 번호 붙은 현장 포함)인 이동부터 그 시리얼의 다음 이동 전날까지, 다음 이동이 없으면
+구간 끝까지다(utilization.deployed_intervals). 변형 시리얼은 공유 시리얼 인덱스로 마스터 시리얼에 합치고,
+이동 기록이 없는 마스터 장비도 0 비트맵으로 넣으므로 category_rollup()의 deployedPct는
+stats_uptime_by_category의 utilizationPct와 같은 값이다.
+
+비트맵은 파이썬 int로 들고 있으므로 구간 질의는 시프트/마스크 후 int.bit_count()(popcount) 한 번이다.
+
+저장 형식(db/occupancy_index.bin):
+  magic(8) 'CEMSOCC2' | 헤더 길이 uint32 | 헤더 JSON(startDay, days, serials, categories) |
+  시리얼별 ceil(days/8) 바이트 비트맵(리틀 엔디안, 헤더의 serials 순서)
+
+사용법:
+  python scripts/occupancy_index.py                           # movements로부터 인덱스 생성/저장
+  python scripts/occupancy_index.py --serial 1789 --from 2025-01-01 --to 2025-03-31
+  python scripts/occupancy_index.py --day 2025-03-01          # 그날 현장에 없던 시리얼
+  python scripts/occupancy_index.py --rollup
+"""
+
+import argparse
+import json
+import os
+import struct
+from collections import defaultdict
+
+from db_writer import WriteBatch
+from movements_store import MISSING_DAY, MOVEMENTS_FILE, day_number, day_to_iso, open_store_for
+from serial_index import EQUIPMENT_FILE, load_serial_index
+from stats_engine import iter_json_array
+from utilization import deployed_intervals, is_deployed
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+INDEX_FILE = os.path.join(DB_DIR, 'occupancy_index.bin')
+
+MAGIC = b'CEMSOCC2'
+
+
+def _to_day(value):
+    if isinstance(value, int):
+        return value
+    day = day_number(value)
+    if day == MISSING_DAY:
+        raise ValueError(f'날짜 형식이 올바르지 않습니다: {value!r}')
+    return day
+
+
+class OccupancyIndex:
+    def __init__(self, start_day, days, bitmaps, categories=None):
+        self.start_day = start_day
+        self.days = days
+        self.bitmaps = bitmaps  # serial -> int (bit i = start_day + i 배치 여부)
+        self.categories = categories or {}
+
+    @classmethod
+    def from_events(cls, events_by_serial, start_day=None, end_day=None, categories=None):
+        """시리얼별 (day, deployed) 이벤트로 인덱스를 만든다. 구간을 안 주면 이벤트 최초~최종일.
+
+        categories(serial → category)에 있지만 이벤트가 없는 시리얼은 0 비트맵으로 넣는다.
+        """
+        all_days = [day for events in events_by_serial.values() for day, _ in events]
+        if start_day is None:
+            start_day = min(all_days) if all_days else 0
+        if end_day is None:
+            end_day = max(all_days) if all_days else start_day
+        days = max(0, end_day - start_day + 1)
+
+        bitmaps = dict.fromkeys(categories or (), 0)
+        for serial, events in events_by_serial.items():
+            bits = 0
+            for lo, hi in deployed_intervals(events, end_day):
+                lo = max(lo, start_day) - start_day
+                hi = min(hi, end_day) - start_day
+                if lo <= hi:
+                    bits |= ((1 << (hi - lo + 1)) - 1) << lo
+            bitmaps[serial] = bits
+        return cls(start_day, days, bitmaps, categories)
+
+    # --- 저장/로드 ---
+
+    def save(self, path=INDEX_FILE):
+        serials = list(self.bitmaps)
+        header = {
+            'startDay': self.start_day,
+            'startDate': day_to_iso(self.start_day),
+            'days': self.days,
+            'serials': serials,
+            'categories': [self.categories.get(s) for s in serials],
+        }
+        encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        width = (self.days + 7) // 8
+        with WriteBatch() as batch, batch.open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(encoded)))
+            f.write(encoded)
+            for serial in serials:
+                f.write(self.bitmaps[serial].to_bytes(width, 'little'))
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'배치 인덱스 파일이 아니거나 이전 형식입니다: {path}')
+        (header_len,) = struct.unpack_from('<I', data, len(MAGIC))
+        pos = len(MAGIC) + 4
+        header = json.loads(data[pos:pos + header_len].decode('utf-8'))
+        pos += header_len
+        width = (header['days'] + 7) // 8
+        bitmaps = {}
+        categories = {}
+        for serial, category in zip(header['serials'], header['categories']):
+            bitmaps[serial] = int.from_bytes(data[pos:pos + width], 'little')
+            pos += width
+            if category is not None:
+                categories[serial] = category
+        return cls(header['startDay'], header['days'], bitmaps, categories)
+
+    # --- 질의 ---
+
+    def _range_mask(self, a, b):
+        """[a, b] 구간(일 번호 또는 'YYYY-MM-DD')을 (시프트, 마스크, 일수)로. 인덱스 밖은 잘라낸다."""
+        lo = self.start_day if a is None else max(_to_day(a), self.start_day)
+        hi = self.start_day + self.days - 1 if b is None else min(_to_day(b), self.start_day + self.days - 1)
+        if lo > hi:
+            return 0, 0, 0
+        n = hi - lo + 1
+        return lo - self.start_day, (1 << n) - 1, n
+
+    def days_deployed(self, serial, a=None, b=None):
+        """[a, b] 동안 serial이 현장에 배치된 일수."""
+        shift, mask, _ = self._range_mask(a, b)
+        return ((self.bitmaps.get(serial, 0) >> shift) & mask).bit_count()
+
+    def days_not_deployed(self, serial, a=None, b=None):
+        shift, mask, n = self._range_mask(a, b)
+        return n - ((self.bitmaps.get(serial, 0) >> shift) & mask).bit_count()
+
+    def is_deployed(self, serial, day):
+        i = _to_day(day) - self.start_day
+        if i < 0 or i >= self.days:
+            return False
+        return bool((self.bitmaps.get(serial, 0) >> i) & 1)
+
+    def serials_deployed(self, day):
+        return [s for s in self.bitmaps if self.is_deployed(s, day)]
+
+    def serials_not_deployed(self, day):
+        """day에 현장에 없던(청명 재고/업체 등) 시리얼 목록."""
+        return [s for s in self.bitmaps if not self.is_deployed(s, day)]
+
+    def category_rollup(self, a=None, b=None):
+        """카테고리별 {serials, serialDays, deployedDays, deployedPct}."""
+        shift, mask, n = self._range_mask(a, b)
+        rollup = defaultdict(lambda: {'serials': 0, 'serialDays': 0, 'deployedDays': 0})
+        for serial, bits in self.bitmaps.items():
+            cat = self.categories.get(serial) or 'UNKNOWN'
+            agg = rollup[cat]
+            agg['serials'] += 1
+            agg['serialDays'] += n
+            agg['deployedDays'] += ((bits >> shift) & mask).bit_count()
+        for agg in rollup.values():
+            agg['deployedPct'] = round(agg['deployedDays'] / agg['serialDays'] * 100) if agg['serialDays'] else 0
+        return dict(rollup)
+
+
+def load_movement_events(json_path=MOVEMENTS_FILE, serial_index=None):
+    """movements에서 시리얼별 (day, deployed) 이벤트 목록을 읽는다. 컬럼형 파일이 동기화돼 있으면 그것을 쓴다.
+
+    serial_index가 있으면 변형 시리얼을 마스터 시리얼로 합친다(build_stats 가동률과 같음).
+    """
+    events = defaultdict(list)
+    store = open_store_for(json_path)
+    if store is not None:
+        with store:
+            serial_names = [s.strip() for s in store.dictionary('serial')]
+            deployed = [int(is_deployed(v)) for v in store.dictionary('inLocation')]
+            days = store.column('date')
+            serials = store.column('serial')
+            in_col = store.column('inLocation')
+            for i in range(store.rows):
+                serial = serial_names[serials[i]]
+                day = days[i]
+                if serial and day != MISSING_DAY:
+                    events[serial].append((day, deployed[in_col[i]]))
+    else:
+        for m in iter_json_array(json_path):
+            if not isinstance(m, dict):
+                continue
+            serial = (m.get('serial') or '').strip()
+            day = day_number(m.get('date'))
+            if serial and day != MISSING_DAY:
+                events[serial].append((day, int(is_deployed(m.get('inLocation')))))
+    if serial_index is None:
+        return events
+    merged = defaultdict(list)
+    for serial, items in events.items():
+        merged[serial_index.match(serial) or serial].extend(items)
+    return merged
+
+
+def build_index(json_path=MOVEMENTS_FILE, equipment_path=EQUIPMENT_FILE):
+    serial_index = load_serial_index(equipment_path)
+    categories = {serial: entry.get('category') or 'UNKNOWN' for serial, entry in serial_index.entries.items()}
+    events = load_movement_events(json_path, serial_index)
+    for serial in events:
+        categories.setdefault(serial, 'UNKNOWN')
+    return OccupancyIndex.from_events(events, categories=categories)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='시리얼별 배치 비트맵 인덱스 생성/조회')
+    parser.add_argument('--serial', help='배치/미배치 일수를 조회할 시리얼')
+    parser.add_argument('--from', dest='date_from', help='조회 시작일 (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', help='조회 종료일 (YYYY-MM-DD)')
+    parser.add_argument('--day', help='해당 일자에 현장에 없던 시리얼 목록')
+    parser.add_argument('--rollup', action='store_true', help='카테고리별 배치 일수 집계 출력')
+    args = parser.parse_args()
+
+    if args.serial or args.day or args.rollup:
+        index = OccupancyIndex.load()
+        if args.serial:
+            deployed = index.days_deployed(args.serial, args.date_from, args.date_to)
+            idle = index.days_not_deployed(args.serial, args.date_from, args.date_to)
+            print(f'{args.serial}: 배치 {deployed}일 / 미배치 {idle}일')
+        if args.day:
+            serials = index.serials_not_deployed(args.day)
+            print(f'{args.day} 미배치 {len(serials)}대: {", ".join(serials)}')
+        if args.rollup:
+            for cat, agg in sorted(index.category_rollup(args.date_from, args.date_to).items()):
+                print(f'{cat}: {agg["deployedPct"]}% ({agg["deployedDays"]}/{agg["serialDays"]}일, {agg["serials"]}대)')
+        return
+
+    index = build_index()
+    index.save()
+    print(f'배치 인덱스 저장: {INDEX_FILE} ({len(index.bitmaps)}개 시리얼 × {index.days}일, '
+          f'{os.path.getsize(INDEX_FILE):,} bytes)')
+
+
+if __name__ == '__main__':
+    main()
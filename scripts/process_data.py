@@ -3,6 +3,9 @@ import pandas as pd
 import json
 import os
 
+from csv_ingest import read_csv_df
+from db_writer import WriteBatch
+
 def process_data():
     # Define file paths
     base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,13 +13,9 @@ def process_data():
     logs_path = os.path.join(base_path, '청명장비 엑셀', 'logs.csv')
     output_path = os.path.join(base_path, 'db', 'equipment_data.json')
 
-    # Read CSV files with appropriate encoding
-    try:
-        serials_df = pd.read_csv(serials_path, encoding='cp949')
-        logs_df = pd.read_csv(logs_path, encoding='cp949', header=None)
-    except UnicodeDecodeError:
-        serials_df = pd.read_csv(serials_path, encoding='utf-8')
-        logs_df = pd.read_csv(logs_path, encoding='utf-8', header=None)
+    # Read CSV files with the detected encoding (one pass per file)
+    serials_df = read_csv_df(serials_path)
+    logs_df = read_csv_df(logs_path, header=None)
 
     # Manually set column names
     serials_df.columns = ['index', '품목계열', '시리얼번호']
@@ -47,7 +46,7 @@ def process_data():
     result = equipment_data.to_json(orient='records', force_ascii=False)
 
     # Save to file
-    with open(output_path, 'w', encoding='utf-8') as f:
+    with WriteBatch() as batch, batch.open(output_path) as f:
         f.write(result)
 
     print(f"Data processed and saved to {output_path}")
@@ -0,0 +1,64 @@
+"""
+QC 대장(QC_logs_fixed.csv) → 레코드 변환용 열 단위 도구
+
+build_qc_logs_db.py / build_qc_logs_db_simplified.py가 함께 쓴다. 행마다 iterrows + pd.isna로
+값을 고르던 것을 열 연산으로 바꿨다.
+ - blank_to_none: 문자열은 strip, 빈 문자열/NaN → None (숫자 값은 그대로)
+ - dotted_dates: 'YYYY.MM.DD'를 형식을 지정해 한 번에 파싱해 'YYYY-MM-DD'로. 날짜가 아닌 값은 원래 값 유지
+ - records_from_columns: {키: 열} → [dict]. 열 배열을 zip해 레코드를 바로 만든다
+여러 기관의 QC 대장을 합쳐도 행 수에 대해 Python 루프는 레코드 생성 한 번뿐이다.
+"""
+
+import pandas as pd
+
+DATE_FORMAT = '%Y.%m.%d'
+
+
+def non_blank(series):
+    """NaN이 아니고 공백만으로 된 문자열도 아닌 행의 불리언 마스크."""
+    text = series.astype('string').str.strip()
+    return (series.notna() & (text != '')).fillna(False).astype(bool)
+
+
+def nan_to_none(series):
+    """NaN → None인 object 열."""
+    series = series.astype(object)
+    return series.where(series.notna(), None)
+
+
+def blank_to_none(series):
+    """문자열은 앞뒤 공백을 지우고, 빈 문자열과 NaN은 None으로 바꾼 object 열."""
+    series = series.astype(object)
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'mixed', 'mixed-integer'):
+        stripped = series.str.strip()
+        # .str은 문자열이 아닌 값을 NaN으로 만들므로 그 자리는 원래 값을 쓴다
+        series = stripped.where(stripped.notna(), series)
+        series = series.where(series != '', None)
+    return nan_to_none(series)
+
+
+def dotted_dates(series):
+    """'YYYY.MM.DD'(월/일 한 자리 허용) 값을 'YYYY-MM-DD'로. 파싱되지 않는 값과 None은 그대로 둔다."""
+    text = series.where(series.isna(), series.astype(str))
+    parsed = pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+    return nan_to_none(parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), series))
+
+
+def row_ids(index, prefix='qc_'):
+    """원본 행 번호(0부터) → 'qc_0001' 형식 id 열."""
+    return prefix + pd.Series(index + 1, dtype='int64').astype(str).str.zfill(4)
+
+
+def records_from_columns(columns):
+    """{키: 열(Series/배열/스칼라)} → 레코드 목록. 스칼라는 모든 레코드에 같은 값을 넣는다."""
+    keys = list(columns)
+    n = next((len(v) for v in columns.values() if hasattr(v, '__len__') and not isinstance(v, str)), 0)
+    arrays = []
+    for value in columns.values():
+        if isinstance(value, pd.Series):
+            arrays.append(value.to_numpy(dtype=object))
+        elif hasattr(value, '__len__') and not isinstance(value, str):
+            arrays.append(value)
+        else:
+            arrays.append([value] * n)
+    return [dict(zip(keys, row)) for row in zip(*arrays)]
@@ -0,0 +1,399 @@
+"""
+db/ 조회용 로컬 HTTP 서버(표준 라이브러리만 사용)
+
+db/*.json을 한 번 읽어 필드별 색인(값 → 행 위치 목록)과 날짜 정렬 배열을 만들고,
+필터/페이지 단위로 잘라서 돌려준다. 브라우저는 화면에 필요한 행만 받는다.
+
+엔드포인트(GET, JSON):
+  /api/movements?serial=1789&from=2025-01-01&to=2025-03-31&in=현장&out=청명
+  /api/repairs?company=켐익&type=정도검사&serial=18P353&from=&to=
+  /api/equipment?status=가동 중&location=현장&category=...
+  /api/meta                       데이터셋별 행 수, 버전, db 세대
+공통 파라미터: offset(기본 0), limit(기본 100, 최대 1000), order=asc|desc(날짜 순, 기본 asc)
+응답: {"total", "offset", "limit", "items": [...]}
+
+ - 시리얼 조건은 정규화 키로 비교하고, 못 찾으면 공유 시리얼 인덱스의 별칭/변형 매칭을 한 번 더 시도한다.
+ - ETag: 데이터 파일 버전(size/mtime) + 쿼리 문자열. If-None-Match가 같으면 304(조회도 하지 않음).
+   movements/repairs에 serial 조건이 있으면 장비 마스터 버전도 넣는다(못 찾은 시리얼은 장비 마스터의
+   별칭으로 다시 찾으므로 장비 마스터만 바뀌어도 결과가 달라진다).
+ - gzip: Accept-Encoding에 gzip이 있고 본문이 1KB 이상이면 압축한다.
+ - 핫 리로드: 요청 시 최대 1초에 한 번 모든 데이터셋 파일의 size/mtime을 확인하고, 바뀐 데이터셋을
+   db_writer.read_consistent로 한꺼번에 다시 읽어 색인한다. 읽는 도중 db 세대(_generation.json)가 바뀌면
+   다시 읽으므로 서로 다른 세대의 파일(새 movements + 옛 equipment 등)을 섞어 보여 주지 않는다.
+   db_writer가 rename으로 교체하므로 반쯤 쓰인 파일을 읽지 않는다.
+ - 정적 파일: index.html, dashboard.html, assets/, db/*.json(미리 압축한 .gz가 있으면 그대로 사용)
+
+사용법:
+  python scripts/query_server.py --port 8000
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from categorical import load_json
+from db_writer import read_consistent
+from serial_index import load_serial_index, normalize_serial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = os.path.join(ROOT, 'db')
+
+# 데이터셋 → (파일, 날짜 필드, 시리얼 필드)
+DATASETS = {
+    'movements': ('movements_db.json', 'date', 'serial'),
+    'repairs': ('repairs_db_clean.json', 'repair_date', 'serial'),
+    'equipment': ('equipment_db.json', None, 'serial'),
+}
+# 경로 → (데이터셋, {쿼리 파라미터: 레코드 필드})
+ROUTES = {
+    '/api/movements': ('movements', {'serial': 'serial', 'in': 'inLocation', 'out': 'outLocation'}),
+    '/api/repairs': ('repairs', {'serial': 'serial', 'company': 'repair_company', 'type': 'repair_type',
+                                 'category': 'equipment_category'}),
+    '/api/equipment': ('equipment', {'serial': 'serial', 'status': 'status', 'location': 'currentLocation',
+                                     'category': 'category'}),
+}
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+GZIP_MIN_BYTES = 1024
+RELOAD_INTERVAL = 1.0
+STATIC_FILES = ('index.html', 'dashboard.html')
+STATIC_DIRS = ('assets',)
+
+
+def _load_records(path):
+    try:
+        # 서버는 데이터를 계속 들고 있으므로 반복되는 범주형 값(위치/업체/유형 등)은 객체 하나를 공유한다
+        records = load_json(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    return records if isinstance(records, list) else []
+
+
+def _field_key(field, serial_field, value):
+    if field == serial_field:
+        return normalize_serial(value)
+    return '' if value is None else str(value).strip()
+
+
+class IndexedTable:
+    """레코드 목록 + 필드별 역색인. 날짜 필드가 있으면 날짜 순으로 정렬해 두고 기간은 bisect로 자른다."""
+
+    def __init__(self, records, fields, date_field=None, serial_field=None):
+        records = [r for r in records if isinstance(r, dict)]
+        if date_field:
+            records.sort(key=lambda r: str(r.get(date_field) or '')[:10])
+        self.records = records
+        self.serial_field = serial_field
+        self.dates = [str(r.get(date_field) or '')[:10] for r in records] if date_field else None
+        self.postings = {}
+        for field in fields:
+            index = {}
+            for pos, r in enumerate(records):
+                index.setdefault(_field_key(field, serial_field, r.get(field)), []).append(pos)
+            self.postings[field] = index
+
+    def _range(self, date_from, date_to):
+        if self.dates is None:
+            return 0, len(self.records)
+        lo = bisect_left(self.dates, date_from) if date_from else 0
+        hi = bisect_right(self.dates, date_to) if date_to else len(self.records)
+        return lo, hi
+
+    def query(self, filters, date_from=None, date_to=None):
+        """filters: {필드: 정규화 값}. 조건을 모두 만족하는 행 위치 목록(날짜 오름차순)."""
+        lo, hi = self._range(date_from, date_to)
+        if not filters:
+            return range(lo, hi)
+        # 가장 짧은 색인 목록 하나만 기간으로 자르고 나머지 조건은 행 값으로 확인한다
+        lists = sorted(((self.postings[f].get(v, []), f, v) for f, v in filters.items()), key=lambda x: len(x[0]))
+        base, _, _ = lists[0]
+        base = base[bisect_left(base, lo):bisect_left(base, hi)]
+        rest = [(f, v) for _, f, v in lists[1:]]
+        if not rest:
+            return base
+        return [pos for pos in base
+                if all(_field_key(f, self.serial_field, self.records[pos].get(f)) == v for f, v in rest)]
+
+
+class Dataset:
+    def __init__(self, name, fields):
+        self.name = name
+        self.file, self.date_field, self.serial_field = DATASETS[name]
+        self.path = os.path.join(DB_DIR, self.file)
+        self.fields = fields
+        self.version = None
+        self.generation = None
+        self.table = None
+
+    def fingerprint(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return f'{st.st_size:x}-{st.st_mtime_ns:x}'
+
+    def load(self, records, version, generation=None):
+        self.table = IndexedTable(records, self.fields, self.date_field, self.serial_field)
+        self.version = version
+        self.generation = generation
+
+
+class DataStore:
+    """데이터셋 묶음. get()은 필요하면 다시 색인한 뒤 (버전, 테이블)을 돌려준다."""
+
+    def __init__(self):
+        self.datasets = {name: Dataset(name, list(params.values())) for name, params in ROUTES.values()}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._serial_index = None
+        self._serial_index_version = None
+
+    def get(self, name):
+        ds = self.datasets[name]
+        now = time.monotonic()
+        if ds.table is None or now - self._checked >= RELOAD_INTERVAL:
+            with self._lock:
+                if ds.table is None or now - self._checked >= RELOAD_INTERVAL:
+                    self._checked = now
+                    self._reload()
+        return ds.version, ds.table
+
+    def _reload(self):
+        """바뀐 데이터셋을 같은 db 세대에서 한꺼번에 다시 읽는다. 버전은 읽기 전에 찍은 size/mtime이므로
+        읽는 사이 파일이 바뀌면 다음 확인 때 다시 읽는다."""
+        versions = {name: ds.fingerprint() for name, ds in self.datasets.items()}
+        changed = [ds for name, ds in self.datasets.items() if ds.table is None or versions[name] != ds.version]
+        if not changed:
+            return
+        started = time.perf_counter()
+        try:
+            generation, data = read_consistent([ds.path for ds in changed], DB_DIR, load=_load_records)
+        except RuntimeError as e:
+            # 쓰기가 이어지는 중: 이전 색인을 유지하고 다음 확인 때 다시 읽는다
+            print(f'⚠️ 다시 읽기 보류: {e}')
+            for ds in changed:
+                if ds.table is None:
+                    ds.load([], None)
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        for ds, records in zip(changed, data):
+            ds.load(records, versions[ds.name], generation)
+        print(f"🔄 세대 {generation} 색인: " + ', '.join(f'{ds.file} {len(ds.table.records)}행' for ds in changed)
+              + f', {elapsed:.0f}ms')
+
+    def resolve_serial(self, raw):
+        """시리얼 인덱스(별칭/변형)로 찾은 원본 시리얼의 정규화 키. 못 찾으면 None."""
+        version = self.datasets['equipment'].fingerprint()
+        if version != self._serial_index_version:
+            with self._lock:
+                try:
+                    self._serial_index = load_serial_index()
+                except (OSError, ValueError):
+                    self._serial_index = None
+                self._serial_index_version = version
+        if self._serial_index is None:
+            return None
+        serial = self._serial_index.match(raw)
+        return normalize_serial(serial) if serial is not None else None
+
+
+def _int_param(params, name, default, upper=None):
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise ValueError(f'{name}은(는) 정수여야 합니다')
+    if value < 0:
+        raise ValueError(f'{name}은(는) 0 이상이어야 합니다')
+    return min(value, upper) if upper is not None else value
+
+
+def run_query(store, path, params):
+    """API 경로와 쿼리 파라미터로 응답 dict를 만든다. 잘못된 파라미터는 ValueError."""
+    name, mapping = ROUTES[path]
+    _, table = store.get(name)
+    unknown = set(params) - set(mapping) - {'from', 'to', 'offset', 'limit', 'order'}
+    if unknown:
+        raise ValueError(f"알 수 없는 파라미터: {', '.join(sorted(unknown))}")
+    offset = _int_param(params, 'offset', 0)
+    limit = _int_param(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+    order = params.get('order', ['asc'])[0]
+    if order not in ('asc', 'desc'):
+        raise ValueError('order는 asc 또는 desc여야 합니다')
+
+    filters = {}
+    for param, field in mapping.items():
+        if param in params:
+            filters[field] = _field_key(field, table.serial_field, params[param][0])
+    date_from = params.get('from', [''])[0][:10] or None
+    date_to = params.get('to', [''])[0][:10] or None
+
+    positions = table.query(filters, date_from, date_to)
+    serial_field = table.serial_field
+    if not positions and serial_field in filters:
+        resolved = store.resolve_serial(params['serial'][0])
+        if resolved and resolved != filters[serial_field]:
+            filters[serial_field] = resolved
+            positions = table.query(filters, date_from, date_to)
+
+    total = len(positions)
+    if order == 'desc':
+        page = [positions[i] for i in range(total - 1 - offset, max(total - 1 - offset - limit, -1), -1)]
+    else:
+        page = positions[offset:offset + limit]
+    return {'total': total, 'offset': offset, 'limit': limit, 'items': [table.records[i] for i in page]}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = 'CemsQuery/1.0'
+    store = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in ROUTES or url.path == '/api/meta':
+            self._serve_api(url)
+        else:
+            self._serve_static(unquote(url.path))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    # --- API ---
+
+    def _serve_api(self, url):
+        if url.path == '/api/meta':
+            meta = {}
+            for name in DATASETS:
+                version, table = self.store.get(name)
+                meta[name] = {'file': DATASETS[name][0], 'rows': len(table.records), 'version': version,
+                              'generation': self.store.datasets[name].generation}
+            etag = '"meta-' + hashlib.sha1(json.dumps(meta).encode()).hexdigest()[:16] + '"'
+            if not self._not_modified(etag):
+                self._send_json(meta, etag)
+            return
+        name = ROUTES[url.path][0]
+        params = parse_qs(url.query)
+        version, _ = self.store.get(name)
+        if 'serial' in params and name != 'equipment':
+            # 시리얼을 못 찾으면 장비 마스터의 별칭으로 다시 찾으므로 장비 마스터 버전도 결과를 정한다
+            version = f"{version}-{self.store.get('equipment')[0]}"
+        etag = f'"{name}-{version}-' + hashlib.sha1(url.query.encode('utf-8')).hexdigest()[:16] + '"'
+        if self._not_modified(etag):
+            return
+        try:
+            body = run_query(self.store, url.path, params)
+        except ValueError as e:
+            self._send_json({'error': str(e)}, status=HTTPStatus.BAD_REQUEST)
+            return
+        self._send_json(body, etag)
+
+    def _not_modified(self, etag):
+        if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return True
+        return False
+
+    def _send_json(self, data, etag=None, status=HTTPStatus.OK):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._send_body(body, 'application/json; charset=utf-8', etag, status, compressible=True)
+
+    def _accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def _send_body(self, body, content_type, etag=None, status=HTTPStatus.OK,
+                   compressible=False, encoding=None, last_modified=None):
+        if encoding is None and compressible and self._accepts_gzip() and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=6)
+            encoding = 'gzip'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', formatdate(last_modified, usegmt=True))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    # --- 정적 파일 ---
+
+    def _static_path(self, path):
+        rel = os.path.normpath(path.lstrip('/') or 'index.html')
+        if rel.startswith('..') or os.path.isabs(rel):
+            return None
+        parts = rel.split(os.sep)
+        allowed = (rel in STATIC_FILES or parts[0] in STATIC_DIRS
+                   or (parts[0] == 'db' and len(parts) == 2 and rel.endswith('.json')))
+        full = os.path.join(ROOT, rel)
+        return full if allowed and os.path.isfile(full) else None
+
+    def _serve_static(self, path):
+        full = self._static_path(path)
+        if full is None:
+            self._send_json({'error': '찾을 수 없습니다'}, status=HTTPStatus.NOT_FOUND)
+            return
+        st = os.stat(full)
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        if self._not_modified(etag):
+            return
+        content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/json':
+            content_type += '; charset=utf-8'
+        # build_stats --compact가 만든 .gz가 원본보다 새것이면 그대로 보낸다
+        gz_path = full + '.gz'
+        if self._accepts_gzip() and os.path.exists(gz_path) and os.stat(gz_path).st_mtime_ns >= st.st_mtime_ns:
+            with open(gz_path, 'rb') as f:
+                self._send_body(f.read(), content_type, etag, encoding='gzip', last_modified=st.st_mtime)
+            return
+        with open(full, 'rb') as f:
+            body = f.read()
+        compressible = content_type.startswith(('text/', 'application/json', 'application/javascript'))
+        self._send_body(body, content_type, etag, compressible=compressible, last_modified=st.st_mtime)
+
+    def log_message(self, format, *args):
+        print(f'{self.address_string()} - {format % args}')
+
+
+def make_server(host='127.0.0.1', port=8000, store=None):
+    handler = type('Handler', (QueryHandler,), {'store': store or DataStore()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='db/ 조회용 로컬 HTTP 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    store = DataStore()
+    for name in DATASETS:
+        store.get(name)
+    server = make_server(args.host, args.port, store)
+    print(f'🌐 http://{args.host}:{args.port}/  (API: /api/movements, /api/repairs, /api/equipment, /api/meta)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
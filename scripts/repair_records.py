@@ -0,0 +1,251 @@
+"""
+수리 기록 타입 레이어: 비용/날짜를 한 번만 정규화한 레코드와 검증 보고
+
+수리 기록의 cost는 원본에 따라 '50,000' 같은 문자열이거나 int이고, 필드 이름도 파일마다 다르다
+(repairs_db.json: date/company/details, repairs_db_clean.json: repair_date/repair_company/repair_type).
+RepairParser가 레코드당 한 번 변환해 두면 이후 집계는 정수 비용/일 번호만 다루고 파싱이나 예외 처리를
+반복하지 않는다.
+ - Repair: __slots__ 레코드(date, day, cost, has_cost, serial, company, rtype, category).
+   cost는 항상 int(없거나 잘못된 값은 0, has_cost=False), day는 movements_store의 일 번호.
+   시리얼/업체/유형/카테고리 문자열은 파서의 사전에서 꺼낸 같은 객체를 공유한다.
+ - RepairTable: 같은 값을 열 배열로 보관(day/cost는 array('i'/'q'), 문자열은 categorical.StringTable 코드 array('I')).
+   dict 없이 집계만 하는 쪽(create_dashboard의 수리 비용/건수 요약)이 쓴다.
+ - ValidationReport: 제외한 행(객체가 아님)과, 기본값으로 바꿔 남긴 필드(비용 형식 오류/누락, 날짜 형식
+   오류/누락, 시리얼 누락)의 사유별 건수와 예시.
+
+사용법:
+  python scripts/repair_records.py                       # db/repairs_db_clean.json 검증 보고
+  python scripts/repair_records.py db/repairs_db.json --examples 20
+"""
+
+import argparse
+import json
+import math
+import os
+from array import array
+from collections import Counter
+
+from categorical import StringTable
+from movements_store import MISSING_DAY, day_number
+from stats_engine import iter_json_array
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+REPAIRS_CLEAN_FILE = os.path.join(DB_DIR, 'repairs_db_clean.json')
+
+UNKNOWN = '알 수 없음'
+UNKNOWN_CATEGORY = 'UNKNOWN'
+
+# 검증 사유 → 설명. REJECT_REASONS의 행은 결과에서 빠지고 나머지는 기본값으로 남는다.
+REASONS = {
+    'not_object': '객체가 아닌 행(제외)',
+    'bad_cost': '비용이 숫자가 아님(0으로 처리)',
+    'missing_cost': '비용 없음(0으로 처리)',
+    'bad_date': '날짜 형식 오류',
+    'missing_date': '날짜 없음',
+    'missing_serial': '시리얼 없음',
+}
+REJECT_REASONS = ('not_object',)
+
+
+def parse_cost(value):
+    """비용 값 → int. '50,000', ' 50000원', 50000, 50000.0 모두 50000. 없거나 숫자가 아니면 None."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else None
+    text = str(value).replace(',', '').strip()
+    if text.endswith('원'):
+        text = text[:-1].rstrip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return int(number) if math.isfinite(number) else None
+
+
+class Repair:
+    __slots__ = ('date', 'day', 'cost', 'has_cost', 'serial', 'company', 'rtype', 'category')
+
+    def __init__(self, date, day, cost, has_cost, serial, company, rtype, category):
+        self.date = date
+        self.day = day
+        self.cost = cost
+        self.has_cost = has_cost
+        self.serial = serial
+        self.company = company
+        self.rtype = rtype
+        self.category = category
+
+    def __repr__(self):
+        return (f'Repair(date={self.date!r}, cost={self.cost}, serial={self.serial!r}, '
+                f'company={self.company!r}, rtype={self.rtype!r}, category={self.category!r})')
+
+
+class ValidationReport:
+    def __init__(self, max_examples=10):
+        self.max_examples = max_examples
+        self.total = 0
+        self.rejected = 0
+        self.counts = Counter()
+        self.examples = []
+
+    def add(self, index, record, reason, value=None):
+        self.counts[reason] += 1
+        if reason in REJECT_REASONS:
+            self.rejected += 1
+        if len(self.examples) < self.max_examples:
+            rid = record.get('id') if isinstance(record, dict) else None
+            self.examples.append({'row': index, 'id': rid, 'reason': reason, 'value': value})
+
+    @property
+    def ok(self):
+        return not self.counts
+
+    def summary(self):
+        return {
+            'total': self.total,
+            'accepted': self.total - self.rejected,
+            'rejected': self.rejected,
+            'issues': dict(sorted(self.counts.items())),
+            'examples': self.examples,
+        }
+
+    def lines(self):
+        out = [f'수리 기록 {self.total:,}건: 사용 {self.total - self.rejected:,}건, 제외 {self.rejected:,}건']
+        for reason, count in sorted(self.counts.items()):
+            out.append(f'  {REASONS[reason]}: {count:,}건')
+        for ex in self.examples:
+            where = f"행 {ex['row']}" + (f" ({ex['id']})" if ex['id'] else '')
+            value = '' if ex['value'] is None else f" {ex['value']!r}"
+            out.append(f"  - {where}: {REASONS[ex['reason']]}{value}")
+        return out
+
+
+class RepairParser:
+    """수리 원본 dict → Repair. 문자열 필드는 파서 단위 사전으로 공유하고, 문제는 report에 모은다.
+
+    serial_index가 있으면 equipment_category가 없는 기록의 카테고리를 시리얼로 찾는다.
+    StatsEngine의 prepare 함수로 바로 쓸 수 있다(객체가 아닌 행은 엔진이 먼저 거른다).
+    """
+
+    def __init__(self, serial_index=None, report=None):
+        self.serial_index = serial_index
+        self.report = report if report is not None else ValidationReport()
+        self.strings = {}
+        self._categories = {}
+
+    def intern(self, value):
+        return self.strings.setdefault(value, value)
+
+    def _category(self, serial):
+        category = self._categories.get(serial)
+        if category is None:
+            category = self.serial_index.category(serial) if self.serial_index else None
+            category = self._categories[serial] = (category or '').strip() or UNKNOWN_CATEGORY
+        return category
+
+    def parse(self, r):
+        report = self.report
+        index = report.total
+        report.total += 1
+        if not isinstance(r, dict):
+            report.add(index, r, 'not_object')
+            return None
+
+        date = (r.get('date') or r.get('repair_date') or '').strip()
+        day = day_number(date)
+        if not date:
+            report.add(index, r, 'missing_date')
+        elif day == MISSING_DAY:
+            report.add(index, r, 'bad_date', date)
+
+        raw_cost = r.get('cost')
+        cost = parse_cost(raw_cost)
+        if cost is None:
+            report.add(index, r, 'missing_cost' if raw_cost in (None, '') else 'bad_cost',
+                       None if raw_cost in (None, '') else raw_cost)
+
+        serial = self.intern((r.get('serial') or '').strip())
+        if not serial:
+            report.add(index, r, 'missing_serial')
+        company = self.intern((r.get('repair_company') or r.get('company') or '').strip() or UNKNOWN)
+        rtype = self.intern((r.get('repair_type') or r.get('type') or '').strip() or UNKNOWN)
+        category = r.get('equipment_category')
+        category = self.intern((category or '').strip() or UNKNOWN_CATEGORY) if category else self._category(serial)
+        return Repair(date, day, cost or 0, cost is not None, serial, company, rtype, category)
+
+    __call__ = parse
+
+
+class RepairTable:
+    """Repair 열 배열. 문자열 열은 사전 코드(array('I'))와 StringTable로 보관한다(vocab[f]가 값 목록)."""
+
+    STRING_FIELDS = ('serial', 'company', 'rtype', 'category')
+
+    def __init__(self):
+        self.days = array('i')
+        self.costs = array('q')
+        self.has_cost = array('b')
+        self.codes = {f: array('I') for f in self.STRING_FIELDS}
+        self.tables = {f: StringTable() for f in self.STRING_FIELDS}
+        self.vocab = {f: table.values for f, table in self.tables.items()}
+
+    def __len__(self):
+        return len(self.days)
+
+    def append(self, rec):
+        self.days.append(rec.day)
+        self.costs.append(rec.cost)
+        self.has_cost.append(rec.has_cost)
+        for f in self.STRING_FIELDS:
+            self.codes[f].append(self.tables[f].code(getattr(rec, f)))
+
+    def counts(self, field):
+        """{값: 행 수}."""
+        vocab = self.vocab[field]
+        return {vocab[code]: n for code, n in Counter(self.codes[field]).items()}
+
+    def cost_totals(self, field):
+        """{값: 비용 합}."""
+        totals = [0] * len(self.vocab[field])
+        for code, cost in zip(self.codes[field], self.costs):
+            totals[code] += cost
+        return dict(zip(self.vocab[field], totals))
+
+
+def load_repair_table(rows, serial_index=None, report=None):
+    """수리 레코드 목록(또는 JSON 배열 파일 경로) → (RepairTable, ValidationReport)."""
+    parser = RepairParser(serial_index, report)
+    table = RepairTable()
+    for r in iter_json_array(rows) if isinstance(rows, str) else rows:
+        rec = parser.parse(r)
+        if rec is not None:
+            table.append(rec)
+    return table, parser.report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='수리 기록 타입 변환 검증 보고')
+    parser.add_argument('path', nargs='?', default=REPAIRS_CLEAN_FILE, help='수리 JSON 배열 파일')
+    parser.add_argument('--examples', type=int, default=10, help='출력할 예시 수')
+    parser.add_argument('--json', action='store_true', help='보고를 JSON으로 출력')
+    args = parser.parse_args()
+
+    table, report = load_repair_table(args.path, report=ValidationReport(args.examples))
+    if args.json:
+        print(json.dumps(report.summary(), ensure_ascii=False, indent=2))
+        return
+    for line in report.lines():
+        print(line)
+    print(f'비용 합계: {sum(table.costs):,}원, 시리얼 {len(table.vocab["serial"]):,}종, '
+          f'업체 {len(table.vocab["company"]):,}곳')
+
+
+if __name__ == '__main__':
+    main()
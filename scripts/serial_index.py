@@ -0,0 +1,212 @@
+"""
+장비 시리얼 인덱스(정규화 키 + 별칭 테이블)
+
+장비 마스터(db/equipment_db.json)에서 한 번 만들어 db/serial_index.json에 저장하고,
+수리/QC/이동 빌더가 같은 인덱스를 읽어 시리얼을 매칭한다. 마스터 파일의 size/mtime이
+바뀌지 않았으면 저장된 인덱스를 그대로 로드한다.
+
+매칭 순서:
+ 1) 정규화 키 일치(NFKC, 공백 제거, 대문자, 엑셀 '.0' 꼬리 제거)
+ 2) 별칭 일치: '4159/TA3671'의 각 부분, 'K1614025A'의 끝 리비전 문자를 뗀 'K1614025',
+    하이픈 제거('17-1733' → '171733'), 숫자 시리얼의 앞자리 0 제거
+ 3) 변형 일치: 조회 시리얼에도 같은 규칙으로 후보를 만들어 1), 2)를 다시 찾는다.
+    부분마다 구체적인 후보(부분 그대로 → 리비전/하이픈/앞자리 0 제거)부터 찾고, '4159/TA3671'처럼
+    여러 부분이 서로 다른 장비에 걸리면 어느 쪽인지 알 수 없으므로 매칭하지 않는다
+두 장비 이상에 걸리는 별칭은 버린다. 이웃 시리얼이 한 자리만 다른 경우가 많아(770654/770656)
+편집 거리 기반 추정은 하지 않는다.
+
+사용법:
+  python scripts/serial_index.py                   # 인덱스 생성/저장
+  python scripts/serial_index.py TA3671 K1614025    # 시리얼 매칭 확인
+"""
+
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+
+from db_writer import write_json_atomic
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+EQUIPMENT_FILE = os.path.join(DB_DIR, 'equipment_db.json')
+INDEX_FILE = os.path.join(DB_DIR, 'serial_index.json')
+
+INDEX_VERSION = 1
+CATEGORY_PATTERN = re.compile(r'\((.*?)\)\s*(.*)')
+REVISION_SUFFIX = re.compile(r'^([A-Z]*\d+)[A-Z]$')
+
+
+def normalize_serial(value):
+    """시리얼 비교용 정규화 키. 비어 있으면 ''."""
+    if value is None:
+        return ''
+    text = unicodedata.normalize('NFKC', str(value)).strip().strip('"\'')
+    text = ''.join(text.split()).upper()
+    if text.endswith('.0') and text[:-2].isdigit():
+        text = text[:-2]
+    return text
+
+
+def serial_parts(key):
+    """'4159/TA3671' 같은 복합 키를 부분으로 나눈다. 단일 키는 [key]."""
+    return [p for p in re.split(r'[/,]', key) if p] if ('/' in key or ',' in key) else [key]
+
+
+def serial_variants(key):
+    """정규화 키에서 별칭 후보를 만든다(자기 자신 제외). 부분별로 구체적인 후보가 앞에 온다."""
+    out = []
+    for part in serial_parts(key):
+        if part != key:
+            out.append(part)
+        m = REVISION_SUFFIX.match(part)
+        if m:
+            out.append(m.group(1))
+        if '-' in part:
+            out.append(part.replace('-', ''))
+        if part.isdigit() and part.startswith('0') and part.lstrip('0'):
+            out.append(part.lstrip('0'))
+    return [v for v in dict.fromkeys(out) if v and v != key]
+
+
+def split_category(category):
+    """'(측정항목) 품목계열' → (측정항목, 품목계열). 형식이 다르면 ('', category)."""
+    match = CATEGORY_PATTERN.match(category or '')
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return '', (category or '').strip()
+
+
+class SerialIndex:
+    def __init__(self, entries, keys, aliases, source=None):
+        self.entries = entries    # 원본 시리얼 → {category, measurement_item, product_series, status}
+        self.keys = keys          # 정규화 키 → 원본 시리얼
+        self.aliases = aliases    # 별칭 → 원본 시리얼
+        self.source = source or {}
+
+    @classmethod
+    def from_equipment(cls, equipment, source=None):
+        entries = {}
+        keys = {}
+        for e in equipment:
+            if not isinstance(e, dict) or e.get('serial') in (None, ''):
+                continue
+            serial = str(e['serial']).strip()
+            category = e.get('category')
+            measurement_item, product_series = split_category(category)
+            entries[serial] = {
+                'category': category,
+                'measurement_item': e.get('measurement_item') or measurement_item,
+                'product_series': e.get('product_series') or product_series,
+                'status': e.get('status'),
+            }
+            keys.setdefault(normalize_serial(serial), serial)
+
+        candidates = defaultdict(set)
+        for key, serial in keys.items():
+            for alias in serial_variants(key):
+                if alias not in keys:
+                    candidates[alias].add(serial)
+        aliases = {alias: next(iter(serials)) for alias, serials in candidates.items() if len(serials) == 1}
+        return cls(entries, keys, aliases, source)
+
+    # --- 저장/로드 ---
+
+    def save(self, path=INDEX_FILE):
+        data = {'version': INDEX_VERSION, 'source': self.source,
+                'entries': self.entries, 'keys': self.keys, 'aliases': self.aliases}
+        write_json_atomic(path, data, indent=None, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f'시리얼 인덱스 버전이 다릅니다: {path}')
+        return cls(data['entries'], data['keys'], data['aliases'], data.get('source'))
+
+    # --- 매칭 ---
+
+    def resolve(self, raw):
+        """(원본 시리얼, 방법)을 돌려준다. 방법: 'exact' | 'alias' | 'variant'. 못 찾으면 (None, None)."""
+        key = normalize_serial(raw)
+        if not key:
+            return None, None
+        serial = self.keys.get(key)
+        if serial is not None:
+            return serial, 'exact'
+        serial = self.aliases.get(key)
+        if serial is not None:
+            return serial, 'alias'
+        matches = []
+        for part in serial_parts(key):
+            candidates = serial_variants(part) if part == key else [part] + serial_variants(part)
+            for variant in candidates:
+                serial = self.keys.get(variant) or self.aliases.get(variant)
+                if serial is not None:
+                    matches.append(serial)
+                    break
+        matches = list(dict.fromkeys(matches))
+        if len(matches) == 1:
+            return matches[0], 'variant'
+        # 부분마다 다른 장비에 걸리면 모호하므로 매칭하지 않는다
+        return None, None
+
+    def match(self, raw):
+        return self.resolve(raw)[0]
+
+    def lookup(self, raw):
+        """매칭된 장비 정보 dict(serial 포함) 또는 None."""
+        serial = self.match(raw)
+        if serial is None:
+            return None
+        return dict(self.entries[serial], serial=serial)
+
+    def category(self, raw):
+        serial = self.match(raw)
+        return self.entries[serial]['category'] if serial is not None else None
+
+    def __contains__(self, raw):
+        return self.match(raw) is not None
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _source_fingerprint(path):
+    st = os.stat(path)
+    return {'path': os.path.basename(path), 'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+
+def build_index(equipment_path=EQUIPMENT_FILE):
+    source = _source_fingerprint(equipment_path)
+    with open(equipment_path, 'r', encoding='utf-8') as f:
+        equipment = json.load(f)
+    return SerialIndex.from_equipment(equipment, source)
+
+
+def load_serial_index(equipment_path=EQUIPMENT_FILE, index_path=INDEX_FILE):
+    """장비 마스터와 동기화된 저장 인덱스를 읽는다. 없거나 오래됐으면 다시 만들어 저장한다."""
+    try:
+        index = SerialIndex.load(index_path)
+        if index.source == _source_fingerprint(equipment_path):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    index = build_index(equipment_path)
+    index.save(index_path)
+    return index
+
+
+def main():
+    index = build_index()
+    index.save()
+    print(f'시리얼 인덱스 저장: {INDEX_FILE} (장비 {len(index)}대, 별칭 {len(index.aliases)}개)')
+    for raw in sys.argv[1:]:
+        serial, how = index.resolve(raw)
+        print(f'  {raw} → {serial or "매칭 실패"}' + (f' ({how})' if how else ''))
+
+
+if __name__ == '__main__':
+    main()
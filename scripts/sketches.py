@@ -0,0 +1,202 @@
+"""
+제한된 메모리의 상위 K / 빈도 / 고유 개수 집계
+
+ - top_k: 최종 집계 목록에서 힙으로 상위 k개만 고른다(전체 정렬 후 자르기와 같은 결과, O(n log k)).
+ - SpaceSaving: 최대 capacity개의 카운터로 스트림의 heavy hitter(건수/금액 가중치)를 유지한다.
+   보고 값은 실제 값 이상이고, 과대 추정 폭은 error 이하다.
+ - CountMinSketch: width × depth 정수 표로 임의 키의 빈도를 과대 추정한다(모든 키를 보관하지 않음).
+ - HyperLogLog: 2^p 바이트 레지스터로 고유 개수를 추정한다(표준 오차 ≈ 1.04 / √2^p).
+   원소가 2^p / 8개 이하인 동안은 해시 집합으로 정확히 센다.
+
+모든 스케치는 get_state()/set_state()로 JSON 직렬화 가능한 상태를 주고받아 증분 재계산 상태에 저장된다.
+해시는 blake2b(64비트)라 실행마다 같은 값을 낸다(파이썬 hash()는 프로세스마다 달라 쓰지 않는다).
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+
+
+def _hash64(value, salt=b''):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8, salt=salt).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def top_k(items, k, key):
+    """sorted(items, key=key)[:k]와 같은 결과를 힙 선택으로 구한다."""
+    return heapq.nsmallest(k, items, key=key)
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitter 카운터(가중치 지원).
+
+    카운터가 가득 찬 상태에서 새 키가 오면 가장 작은 카운터를 넘겨받는다(그 값이 새 키의 error).
+    최소 카운터는 지연 삭제 힙으로 찾으므로 갱신은 O(log capacity)다.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.counters = {}    # key → [count, error]
+        self._heap = []       # (count, key) — 값이 바뀐 항목은 꺼낼 때 버린다
+
+    def add(self, key, weight=1):
+        entry = self.counters.get(key)
+        if entry is None:
+            if len(self.counters) < self.capacity:
+                entry = self.counters[key] = [0, 0]
+            else:
+                floor = self._pop_min()
+                entry = self.counters[key] = [floor, floor]
+        entry[0] += weight
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self.counters.get(key)
+            if entry is not None and entry[0] == count:
+                del self.counters[key]
+                return count
+
+    def _rebuild_heap(self):
+        self._heap = [(entry[0], key) for key, entry in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k):
+        """[(key, count, error)] — count 내림차순, 같으면 key 오름차순."""
+        return top_k(((key, c, e) for key, (c, e) in self.counters.items()), k, key=lambda x: (-x[1], x[0]))
+
+    def get_state(self):
+        return {'capacity': self.capacity, 'counters': [[k, c, e] for k, (c, e) in self.counters.items()]}
+
+    def set_state(self, state):
+        state = state or {}
+        self.capacity = state.get('capacity', self.capacity)
+        self.counters = {k: [c, e] for k, c, e in state.get('counters', [])}
+        self._rebuild_heap()
+
+
+class CountMinSketch:
+    """Count-Min 스케치. estimate()는 실제 빈도 이상이며, 확률 1 - e^-depth로 e/width × total 이내다."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = [[0] * width for _ in range(depth)]
+
+    def _columns(self, key):
+        # 64비트 해시 하나를 두 부분으로 나눠 행마다 h1 + i·h2 (double hashing)
+        h = _hash64(key)
+        h1, h2 = h >> 32, (h & 0xFFFFFFFF) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, weight=1):
+        self.total += weight
+        for row, col in zip(self.table, self._columns(key)):
+            row[col] += weight
+
+    def estimate(self, key):
+        return min(row[col] for row, col in zip(self.table, self._columns(key)))
+
+    def error_bound(self):
+        return math.e / self.width * self.total
+
+    def get_state(self):
+        return {'width': self.width, 'depth': self.depth, 'total': self.total, 'table': self.table}
+
+    def set_state(self, state):
+        if not state:
+            self.__init__(self.width, self.depth)
+            return
+        self.width, self.depth, self.total = state['width'], state['depth'], state['total']
+        self.table = [list(row) for row in state['table']]
+
+
+class HyperLogLog:
+    """HyperLogLog 고유 개수 추정기(소규모 구간은 linear counting 보정).
+
+    원소가 적은 동안은 64비트 해시 집합(sparse)으로 정확히 세고, 해시가 레지스터 크기(2^p 바이트)만큼
+    쌓이면(2^p / 8개 초과) 레지스터(dense)로 바꾼다. 어느 쪽이든 메모리는 2^p 바이트 안팎으로 제한된다.
+    """
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = None
+        self.sparse = set()
+
+    def _sparse_limit(self):
+        return self.m // 8
+
+    def _update(self, h):
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def _densify(self):
+        if self.sparse is None:
+            return
+        self.registers = bytearray(self.m)
+        for h in self.sparse:
+            self._update(h)
+        self.sparse = None
+
+    def add(self, value):
+        h = _hash64(value)
+        if self.sparse is not None:
+            self.sparse.add(h)
+            if len(self.sparse) > self._sparse_limit():
+                self._densify()
+        else:
+            self._update(h)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError('HyperLogLog 정밀도(p)가 다르면 합칠 수 없습니다')
+        if self.sparse is not None and other.sparse is not None:
+            self.sparse |= other.sparse
+            if len(self.sparse) > self._sparse_limit():
+                self._densify()
+            return
+        self._densify()
+        if other.sparse is not None:
+            for h in other.sparse:
+                self._update(h)
+        else:
+            self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self):
+        if self.sparse is not None:
+            return len(self.sparse)
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def get_state(self):
+        if self.sparse is not None:
+            return {'p': self.p, 'sparse': sorted(self.sparse)}
+        return {'p': self.p, 'registers': base64.b64encode(bytes(self.registers)).decode('ascii')}
+
+    def set_state(self, state):
+        if not state:
+            self.registers = None
+            self.sparse = set()
+            return
+        self.p = state['p']
+        self.m = 1 << self.p
+        if 'sparse' in state:
+            self.registers = None
+            self.sparse = set(state['sparse'])
+        else:
+            self.registers = bytearray(base64.b64decode(state['registers']))
+            self.sparse = None
@@ -0,0 +1,321 @@
+"""
+통계 집계 엔진
+
+각 소스(JSON 배열 파일)를 한 번만 스트리밍으로 읽고, 해당 소스에 등록된
+모든 누산기(accumulator)에 레코드를 차례로 전달한다.
+ - 소스별 prepare 함수로 날짜/비용 등 공통 필드를 레코드당 한 번만 파싱한다.
+ - 파일 전체를 리스트로 올리지 않으므로 메모리는 누산기 상태 크기에만 비례한다.
+ - 이전 실행 상태(누산기 상태 + 소스별 워터마크)가 주어지면 변경 없는 소스는 건너뛰고,
+   배열 끝에 원소만 추가된 소스는 추가분만 이어서 읽는다.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+CHUNK_SIZE = 1 << 16
+
+_WS = ' \t\r\n'
+
+
+class JsonArrayReader:
+    """JSON 배열 파일을 원소 단위로 스트리밍하는 리더.
+
+    start: 이어 읽을 바이트 위치(이전에 읽은 마지막 원소의 끝). 0이면 배열 처음부터 읽는다.
+    object_pairs_hook: 원소 디코딩에 쓸 훅(예: categorical.interning_hook으로 범주형 값 공유)
+    rows: 이번에 읽은 원소 수
+    """
+
+    def __init__(self, path, start=0, chunk_size=CHUNK_SIZE, object_pairs_hook=None):
+        self.path = path
+        self.start = start
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+
+    def __iter__(self):
+        try:
+            raw = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        if self.start:
+            raw.seek(self.start)
+        with io.TextIOWrapper(raw, encoding='utf-8') as f:
+            buf = ''
+            pos = 0
+            eof = False
+            started = bool(self.start)
+
+            while True:
+                # 공백/구분자 건너뛰기
+                while pos < len(buf) and (buf[pos] in _WS or (started and buf[pos] == ',')):
+                    pos += 1
+                if pos >= len(buf):
+                    if eof:
+                        return
+                    chunk = f.read(self.chunk_size)
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    eof = not chunk
+                    continue
+
+                if not started:
+                    if buf[pos] != '[':
+                        return
+                    started = True
+                    pos += 1
+                    continue
+                if buf[pos] == ']':
+                    return
+
+                try:
+                    obj, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    obj, end = None, None
+                # 버퍼 끝에서 잘린 값일 수 있으면 더 읽고 재시도
+                if end is None or (end >= len(buf) and not eof):
+                    if eof:
+                        return
+                    chunk = f.read(self.chunk_size)
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    eof = not chunk
+                    continue
+
+                pos = end
+                self.rows += 1
+                yield obj
+
+
+def iter_json_array(path, object_pairs_hook=None):
+    """JSON 배열 파일의 원소를 하나씩 돌려준다. 파일이 없거나 형식이 다르면 아무것도 내지 않는다."""
+    return iter(JsonArrayReader(path, object_pairs_hook=object_pairs_hook))
+
+
+# 소스 워터마크
+# path/size/mtime: 빠른 변경 판정용, hash: 파일 전체 sha1
+# offset: 마지막 원소가 끝나는 바이트 위치, prefixHash: 파일[0:offset]의 sha1, rows: 누적 원소 수
+
+def array_end_offset(path):
+    """JSON 배열의 마지막 원소가 끝나는 바이트 위치(닫는 ']' 앞 공백 제외). 배열 형태가 아니면 None."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 256))
+        tail = f.read()
+    stripped = tail.rstrip()
+    if not stripped.endswith(b']'):
+        return None
+    return size - len(tail) + len(stripped[:-1].rstrip())
+
+
+def hash_file(path, checkpoints=()):
+    """파일 전체 sha1과 각 checkpoint(바이트 위치)까지의 prefix sha1을 한 번의 읽기로 계산한다."""
+    h = hashlib.sha1()
+    pending = sorted(set(c for c in checkpoints if c is not None))
+    prefix = {}
+    pos = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            while pending and pending[0] <= pos + len(chunk):
+                cut = pending.pop(0)
+                h_cut = h.copy()
+                h_cut.update(chunk[:cut - pos])
+                prefix[cut] = h_cut.hexdigest()
+            h.update(chunk)
+            pos += len(chunk)
+    return h.hexdigest(), prefix
+
+
+def _next_byte(path, offset):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(64).lstrip()[:1]
+
+
+def scan_source(path, prev):
+    """이전 워터마크와 비교해 (mode, watermark)를 돌려준다.
+
+    mode: 'unchanged'(그대로), 'append'(prev['offset'] 이후 원소만 추가됨), 'full'(처음부터 다시)
+    watermark: 현재 파일 기준 새 워터마크(rows는 호출자가 채운다)
+    """
+    if not os.path.exists(path):
+        return 'full', None
+    st = os.stat(path)
+    if prev and prev.get('path') == path and prev.get('size') == st.st_size and prev.get('mtime') == st.st_mtime_ns:
+        return 'unchanged', dict(prev)
+
+    end = array_end_offset(path)
+    prev_offset = prev.get('offset') if prev and prev.get('path') == path else None
+    full_hash, prefix = hash_file(path, (prev_offset, end))
+    wm = {
+        'path': path,
+        'size': st.st_size,
+        'mtime': st.st_mtime_ns,
+        'hash': full_hash,
+        'offset': end,
+        'prefixHash': prefix.get(end),
+        'rows': 0,
+    }
+    if prev_offset is None:
+        return 'full', wm
+    if full_hash == prev.get('hash'):
+        wm['rows'] = prev.get('rows', 0)
+        return 'unchanged', wm
+    if (end is not None and prev_offset < end
+            and prefix.get(prev_offset) == prev.get('prefixHash')
+            and _next_byte(path, prev_offset) == b','):
+        return 'append', wm
+    return 'full', wm
+
+
+class Accumulator:
+    """누산기 기본형.
+
+    source: 입력 소스 이름('movements', 'repairs', 'qc'). None이면 다른 누산기 결과로부터
+            파생되는 통계로, 모든 소스 처리가 끝난 뒤 result()만 호출된다.
+    inputs: 결과가 의존하는 소스 이름들(기본값은 source 하나)
+    result(): {산출 파일 경로: 데이터} 형태로 반환(outputs()의 경로들)
+    get_state()/set_state(): 증분 재계산용 부분 집계 상태(JSON 직렬화 가능)
+    """
+
+    source = None
+    inputs = None
+
+    @property
+    def key(self):
+        return os.path.basename(self.path)
+
+    def depends_on(self):
+        return self.inputs or ((self.source,) if self.source else ())
+
+    def outputs(self):
+        return (self.path,)
+
+    def add(self, row):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+    def get_state(self):
+        return None
+
+    def set_state(self, state):
+        pass
+
+
+class StatsEngine:
+    def __init__(self):
+        self._sources = {}
+        self._order = []
+        self.accumulators = []
+
+    def add_source(self, name, paths, prepare=None, columnar=None, object_pairs_hook=None):
+        """소스를 등록한다. paths는 우선순위 순서의 후보 경로 목록(첫 번째로 레코드가 있는 파일을 사용).
+
+        columnar: 경로를 받아 동기화된 컬럼형 저장소(rows 속성, close())를 돌려주는 함수.
+                  해당 소스의 누산기가 모두 add_columns(store, start_row)를 지원하면 JSON 대신 사용한다.
+        object_pairs_hook: JSON 스트리밍 디코더에 넘길 훅. 범주형 값을 인터닝하면 누산기의 groupby가
+                  같은 객체끼리의 dict 조회가 된다.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        self._sources[name] = (list(paths), prepare, columnar, object_pairs_hook)
+        if name not in self._order:
+            self._order.append(name)
+
+    def register(self, acc):
+        self.accumulators.append(acc)
+        return acc
+
+    def run(self, state=None):
+        """모든 소스를 최대 한 번씩 스트리밍하여 누산기에 전달한다.
+
+        state: 이전 실행의 get_state() 결과. 주어지면 변경 없는 소스는 읽지 않고,
+               추가분만 있는 소스는 워터마크 이후만 읽는다.
+        반환: ({소스 이름: 사용한 경로}, 변경된 소스 이름 집합)
+        """
+        state = state or {}
+        prev_sources = state.get('sources', {})
+        prev_accs = state.get('accumulators', {})
+        self.watermarks = {}
+        used = {}
+        changed = set()
+
+        for name in self._order:
+            accs = [a for a in self.accumulators if a.source == name]
+            if not accs:
+                continue
+            paths, prepare, columnar, object_pairs_hook = self._sources[name]
+            prev = prev_sources.get(name)
+            adds = [a.add for a in accs]
+
+            for path in paths:
+                mode, wm = scan_source(path, prev)
+                if wm is None:
+                    continue
+                if mode != 'full' and any(acc.key not in prev_accs for acc in accs):
+                    # 새로 추가된 누산기는 이전 상태가 없으므로 처음부터 다시 읽는다
+                    mode = 'full'
+                    wm['rows'] = 0
+                start = 0
+                if mode in ('unchanged', 'append'):
+                    for acc in accs:
+                        acc.set_state(prev_accs.get(acc.key))
+                if mode == 'append':
+                    start = prev['offset']
+                    wm['rows'] = prev.get('rows', 0)
+                if mode != 'unchanged':
+                    store = None
+                    if columnar and all(hasattr(acc, 'add_columns') for acc in accs):
+                        store = columnar(path)
+                    if store is not None:
+                        # 컬럼형: 행 번호 워터마크 이후만 컬럼 배열로 전달
+                        start_row = wm['rows']
+                        try:
+                            for acc in accs:
+                                acc.add_columns(store, start_row)
+                            read = max(0, store.rows - start_row)
+                        finally:
+                            store.close()
+                    else:
+                        reader = JsonArrayReader(path, start=start, object_pairs_hook=object_pairs_hook)
+                        for rec in reader:
+                            if not isinstance(rec, dict):
+                                continue
+                            row = prepare(rec) if prepare else rec
+                            for add in adds:
+                                add(row)
+                        read = reader.rows
+                    wm['rows'] += read
+                    if mode == 'full' or read:
+                        changed.add(name)
+                if wm['rows']:
+                    used[name] = path
+                    self.watermarks[name] = wm
+                    break
+            else:
+                # 후보 파일이 모두 비었는데 이전에 데이터가 있었다면 산출물도 갱신해야 한다
+                if prev:
+                    changed.add(name)
+        return used, changed
+
+    def get_state(self):
+        return {
+            'sources': self.watermarks,
+            'accumulators': {a.key: a.get_state() for a in self.accumulators if a.source},
+        }
+
+    def results(self, changed=None):
+        """{산출 파일 경로: 데이터}. changed가 주어지면 해당 소스에 의존하는 산출물만 돌려준다."""
+        out = {}
+        for acc in self.accumulators:
+            if (changed is not None and not (set(acc.depends_on()) & changed)
+                    and all(os.path.exists(p) for p in acc.outputs())):
+                continue
+            out.update(acc.result())
+        return out
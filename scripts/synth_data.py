@@ -0,0 +1,400 @@
+"""
+벤치마크용 합성 CEMS 데이터 생성기
+
+현재 규모(시리얼 약 300대, 이동 약 16,000행, 수리 약 850행, QC 약 215행)를 1배로 보고
+--scale 배수만큼 실제 파일과 같은 모양의 입력을 만든다.
+
+<out>/청명장비 엑셀/
+  logs_fixed.csv     UTF-8. 제목 행 + 탭이 붙은 헤더, '2024/07/18 -1' 일자, 앞쪽 기간은 필드 끝에 탭
+  수리내역logs.csv    UTF-8. 제목 행 + 헤더, '23/01/10-1' 일자, 합계/출력 시각 꼬리 행
+  QC_logs_fixed.csv  UTF-8. 줄바꿈이 들어간 헤더 셀, 'YYYY.MM.DD' 날짜
+  serials.csv        CP949. 순번, 품목계열, 일련번호
+  logs.csv           CP949. inventory_analysis.py가 읽는 5열(일자, 출고, 입고, 시리얼, 수량)
+<out>/db/
+  movements_db.json, equipment_db.json, equipment_data.json, repairs_db.json
+  (Node build-db가 만들어 두는 파이프라인 시작 데이터)
+
+'(NOx, SOx) BMW-5000'처럼 쉼표가 든 품목계열은 csv 모듈이 따옴표로 감싼다.
+같은 --seed면 같은 파일이 나온다. 모든 파일은 행 단위로 흘려 쓰므로 큰 배수에서도 메모리는
+장비 수에 비례한다(이동/수리 행 수와 무관).
+
+사용법:
+  python scripts/synth_data.py --scale 10 --out /tmp/cems_x10
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from equipment_events import transition
+
+EXCEL_DIR = '청명장비 엑셀'
+
+# 1배 기준 행 수
+BASE_COUNTS = {'serials': 292, 'unregistered': 100, 'movements': 15947, 'repairs': 853, 'qc': 214}
+
+MOVEMENT_RANGE = (date(2024, 7, 18), date(2025, 8, 25))
+REPAIR_RANGE = (date(2023, 1, 1), date(2025, 8, 25))
+QC_RANGE = (date(2022, 1, 3), date(2025, 8, 20))
+PADDED_FRACTION = 0.63   # 실제 파일은 앞쪽 약 63% 행의 필드 끝에 탭이 붙어 있다
+
+# 품목계열 → (serials.csv 대수, 시리얼 모양). 대수는 실제 serials.csv 분포
+CATEGORIES = {
+    '(NOx, SOx) BMW-5000': (49, 'bmw'),
+    '(PM-10) KMS-4200': (37, 'kms'),
+    '(PM-2.5) PMS-204': (32, 'pms'),
+    '(Pb) T8400ME': (28, 'plain'),
+    '(O3) Serinus10i': (25, 'serinus'),
+    '(CO) Serinus30i': (23, 'serinus'),
+    '(PM-10) E-BAM': (20, 'ebam'),
+    '(NO2) MEZUS-210': (10, 'plain'),
+    '(PM-10) PMS-204': (10, 'pms'),
+    '(PM-2.5) E-BAM': (10, 'ebam'),
+    '(PM-2.5) KMS-4200': (8, 'kms'),
+    '(NO2) Serinus40': (7, 'serinus'),
+    '(SO2) Serinus50i': (7, 'serinus'),
+    '(벤젠) MP-Σ30KNⅡ': (7, 'mp'),
+    '(CO) MEZUS-310': (4, 'plain'),
+    '(Pb) TFIA-2': (4, 'plain'),
+    '(O3) 49i': (3, 'plain'),
+    '(CO) 48iQ': (2, 'plain'),
+    '(O3) 49iQ': (2, 'plain'),
+    '(PM-10) BAM 1020': (2, 'plain'),
+    '(PM-2.5) BAM 1020': (2, 'plain'),
+    '(CO) 48i': (1, 'plain'),
+}
+# serials.csv에 없지만 이동/수리 기록에는 나오는 품목
+UNREGISTERED = {'(소음) SC-260': 40, '(진동) TYPE3233': 25, '(소음계교정) AC-300': 20, 'ProPlus': 10,
+                'FP101 Flow Probe.': 5}
+
+HOME, SITE, VENDOR = '청명', '현장', '업체'
+EQUIPMENT_STATES = [('정상', 85), ('', 13), ('정도검사', 1), ('수리완료', 1)]
+NOTES = [('', 60), ('A-1', 8), ('A-2', 7), ('A-3', 6), ('A-4', 4), ('A-5', 3), ('A-6', 2), ('여분장비', 1),
+         ('A-4,8', 1)]
+REPAIR_COMPANIES = [('APM', 393), ('켐익', 211), ('하림', 70), ('카인', 59), ('토탈엔지니어링', 50), ('켄텍', 35),
+                    ('태원시바타', 21), ('KNJ', 12)]
+REPAIR_TYPES = [('일반수리', 308), ('정도검사', 263), ('정도검사 및 수리', 255), ('확인필요', 27)]
+REPAIR_KINDS = [('정도검사', 368), ('기본점검', 119), ('DC', 34), ('정도검사 대행료', 17), ('확인필요', 14),
+                ('일반수리', 12), ('컨트롤러 교체', 9)]
+MANAGERS = [('황연걸', 578), ('성기성', 39), ('신재경', 38), ('김현식', 33), ('김균학', 31), ('조용재', 27),
+            ('신수용', 25), ('백승철', 24)]
+UNIT_PRICES = [('100000', 242), ('50000', 170), ('', 138), ('250000', 33), ('150000', 31), ('300000', 21),
+               ('400000', 17), ('185000', 15), ('1,250,000', 3)]
+QC_ITEMS = {'PM-10': 'PM10', 'PM-2.5': 'PM2.5', 'CO': 'CO', 'O3': 'O3', 'NO2': 'NO2', 'SO2': 'SO2'}
+QC_HEADER = ['항목', '장비명', '박스번호\n(23.05기준)', '일련번호', '정도검사일', '유효기간', '기준일', '교정주기', '비고',
+             '접수월', '계산서날짜', '등가성', 'Unnamed: 12', 'Unnamed: 13', '등가성 내역', '비고.1', '구매년도',
+             'Unnamed: 17', 'Unnamed: 18']
+
+
+def _weighted(pairs):
+    values = [v for v, _ in pairs]
+    weights = [w for _, w in pairs]
+    return lambda rng, k=1: rng.choices(values, weights, k=k)
+
+
+def _serial(shape, i):
+    if shape == 'bmw':
+        return str(800 + i)
+    if shape == 'kms':
+        return f'{18 + i % 6}P{i:03d}'
+    if shape == 'pms':
+        return str(1501478 + i)
+    if shape == 'serinus':
+        return f'{17 + i % 5}-{i:04d}'
+    if shape == 'ebam':
+        return f'{"TW"[i % 2]}{15000 + i}'
+    if shape == 'mp':
+        return str(770654 + i)
+    return None
+
+
+def make_fleet(scale, rng):
+    """[(시리얼, 품목계열, 등록 여부)]. 시리얼은 전체에서 고유하다."""
+    fleet = []
+    seen = set()
+    n_registered = max(1, round(BASE_COUNTS['serials'] * scale))
+    n_unregistered = round(BASE_COUNTS['unregistered'] * scale)
+    total_registered = sum(n for n, _ in CATEGORIES.values())
+    total_unregistered = sum(UNREGISTERED.values())
+    plan = [(cat, shape, n * n_registered / total_registered, True) for cat, (n, shape) in CATEGORIES.items()]
+    plan += [(cat, 'plain', n * n_unregistered / total_unregistered, False) for cat, n in UNREGISTERED.items()]
+    for k, (category, shape, share, registered) in enumerate(plan):
+        for i in range(max(1, round(share)) if registered else round(share)):
+            serial = _serial(shape, i) or f'{"T" if registered else "N"}{k:02d}{i:05d}'
+            while serial in seen:
+                serial += 'A'
+            seen.add(serial)
+            fleet.append((serial, category, registered))
+    return fleet
+
+
+def _days(start, end):
+    return (end - start).days + 1
+
+
+def _per_day(total, start, n_days, rng):
+    """하루 건수 목록(합이 total). 주말은 평일의 1/4 정도."""
+    weights = [0.25 if (start + timedelta(d)).weekday() >= 5 else 1.0 for d in range(n_days)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for d in rng.choices(range(n_days), weights, k=total - sum(counts)):
+        counts[d] += 1
+    return counts
+
+
+class _Pools:
+    """위치별 장비 목록. 임의 선택/이동이 O(1)(swap-remove)."""
+
+    def __init__(self, n, location):
+        self.members = {location: list(range(n))}
+        self.pos = list(range(n))
+        self.where = [location] * n
+
+    def size(self, location):
+        return len(self.members.get(location, ()))
+
+    def take(self, location, rng):
+        items = self.members[location]
+        j = rng.randrange(len(items))
+        idx = items[j]
+        last = items.pop()
+        if last != idx:
+            items[j] = last
+            self.pos[last] = j
+        return idx
+
+    def put(self, idx, location):
+        items = self.members.setdefault(location, [])
+        self.pos[idx] = len(items)
+        items.append(idx)
+        self.where[idx] = location
+
+
+def _json_array_writer(f):
+    """json.dump(list, indent=2, ensure_ascii=False)와 같은 텍스트를 레코드 단위로 쓴다."""
+    first = [True]
+
+    def write(record):
+        text = json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        f.write(('[\n  ' if first[0] else ',\n  ') + text)
+        first[0] = False
+
+    def close():
+        f.write('[]' if first[0] else '\n]')
+
+    return write, close
+
+
+def write_movements(out, fleet, scale, rng):
+    """이동 기록을 logs_fixed.csv, logs.csv, db/movements_db.json에 함께 쓴다. 장비별 최종 상태를 돌려준다."""
+    start, end = MOVEMENT_RANGE
+    n_days = _days(start, end)
+    total = round(BASE_COUNTS['movements'] * scale)
+    per_day = _per_day(total, start, n_days, rng)
+    padded_until = round(total * PADDED_FRACTION)
+    pools = _Pools(len(fleet), HOME)
+    last_move = [None] * len(fleet)
+    state_of = _weighted(EQUIPMENT_STATES)
+    note_of = _weighted(NOTES)
+    routes = [((HOME, SITE), 47), ((SITE, HOME), 47), ((HOME, VENDOR), 1.5), ((VENDOR, HOME), 1.5),
+              ((SITE, '현장2'), 0.1), ((HOME, '청명지하'), 0.2), (('청명지하', HOME), 0.2)]
+    route_of = _weighted(routes)
+    excel = os.path.join(out, EXCEL_DIR)
+    written = 0
+
+    with open(os.path.join(excel, 'logs_fixed.csv'), 'w', encoding='utf-8', newline='') as fixed_f, \
+            open(os.path.join(excel, 'logs.csv'), 'w', encoding='cp949', newline='') as logs_f, \
+            open(os.path.join(out, 'db', 'movements_db.json'), 'w', encoding='utf-8') as json_f:
+        fixed = csv.writer(fixed_f, lineterminator='\n')
+        logs = csv.writer(logs_f, lineterminator='\n')
+        write_json, close_json = _json_array_writer(json_f)
+        fixed.writerow([f'회사명 : (주)청명기연환경 / {start:%Y/%m/%d}  ~ {end:%Y/%m/%d}  / 장비투입현황']
+                       + [f'Unnamed: {i}' for i in range(1, 8)])
+        fixed.writerow(['일자-No.\t', '출고창고명\t', '입고창고명\t', '품목명\t', '규격\t', '수량\t', '장비상태\t', '비고'])
+        logs.writerow(['일자-No.', '출고창고명', '입고창고명', '규격', '수량'])
+
+        for d, count in enumerate(per_day):
+            day = start + timedelta(d)
+            slip = 0
+            while count > 0:
+                slip += 1
+                size = min(count, rng.choice((1, 1, 2, 3, 4, 6, 8)))
+                src, dst = route_of(rng)[0]
+                if pools.size(src) == 0:
+                    src, dst = dst, src
+                if pools.size(src) == 0:
+                    src = max(pools.members, key=pools.size)
+                    dst = SITE if src == HOME else HOME
+                date_no = f'{day:%Y/%m/%d} -{slip}'
+                for _ in range(min(size, pools.size(src))):
+                    idx = pools.take(src, rng)
+                    pools.put(idx, dst)
+                    last_move[idx] = (day, src, dst)
+                    serial, category, _ = fleet[idx]
+                    state, note = state_of(rng)[0], note_of(rng)[0]
+                    row = [date_no, src, dst, category, serial, '1', state, note]
+                    if written < padded_until:
+                        row = [v if i == 5 else v + '\t' for i, v in enumerate(row)]
+                    fixed.writerow(row)
+                    logs.writerow([date_no, src, dst, serial, 1])
+                    write_json({'date': day.isoformat(), 'outLocation': src, 'inLocation': dst,
+                                'equipmentName': category, 'serial': serial, 'quantity': 1,
+                                'note': note, 'status': state})
+                    written += 1
+                    count -= 1
+        close_json()
+    return pools.where, last_move, written
+
+
+def write_serials(out, fleet):
+    with open(os.path.join(out, EXCEL_DIR, 'serials.csv'), 'w', encoding='cp949', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['순번', '품목계열', '일련번호'])
+        n = 0
+        for serial, category, registered in fleet:
+            if registered:
+                n += 1
+                writer.writerow([n, category, serial])
+    return n
+
+
+def write_repairs(out, fleet, scale, rng):
+    """수리내역logs.csv와 db/repairs_db.json. 반환: ({시리얼: [건수, 비용 합]}, 행 수)."""
+    start, end = REPAIR_RANGE
+    n_days = _days(start, end)
+    total = round(BASE_COUNTS['repairs'] * scale)
+    per_day = _per_day(total, start, n_days, rng)
+    # 일부 장비에 수리가 몰리도록 임의 순서의 앞쪽을 더 자주 고른다
+    hot = rng.sample(range(len(fleet)), len(fleet))
+    company_of, type_of = _weighted(REPAIR_COMPANIES), _weighted(REPAIR_TYPES)
+    kind_of, manager_of, price_of = _weighted(REPAIR_KINDS), _weighted(MANAGERS), _weighted(UNIT_PRICES)
+    per_serial = {}
+    cost_sum = 0
+    seq = 0
+
+    with open(os.path.join(out, EXCEL_DIR, '수리내역logs.csv'), 'w', encoding='utf-8', newline='') as csv_f, \
+            open(os.path.join(out, 'db', 'repairs_db.json'), 'w', encoding='utf-8') as json_f:
+        writer = csv.writer(csv_f, lineterminator='\n')
+        write_json, close_json = _json_array_writer(json_f)
+        writer.writerow([f'회사명 : (주)청명기연환경 / {start:%Y/%m/%d}  ~ {end:%Y/%m/%d}  / AS수리현황']
+                        + [f'Unnamed: {i}' for i in range(1, 10)])
+        writer.writerow(['일자-No.', '제목', '수리업체', '수리유형명', '담당자명', '품목계열명', '단가', '수리구분', '일련번호', '순번'])
+        for d, count in enumerate(per_day):
+            day = start + timedelta(d)
+            slip = 0
+            while count > 0:
+                slip += 1
+                size = min(count, rng.choice((1, 1, 2, 3, 5, 10)))
+                company, repair_type, manager = company_of(rng)[0], type_of(rng)[0], manager_of(rng)[0]
+                for _ in range(size):
+                    serial, category, _ = fleet[hot[int(len(hot) * rng.random() ** 2.5)]]
+                    kind, price = kind_of(rng)[0], price_of(rng)[0]
+                    seq += 1
+                    writer.writerow([f'{day:%y/%m/%d}-{slip}', f'{company} {repair_type}', company, repair_type,
+                                     manager, category, price, kind, serial, seq])
+                    cost = int(price.replace(',', '')) if price else 0
+                    write_json({'date': day.isoformat(), 'serial': serial, 'company': company,
+                                'details': kind, 'cost': cost})
+                    stats = per_serial.setdefault(serial, [0, 0])
+                    stats[0] += 1
+                    stats[1] += cost
+                    cost_sum += cost
+                count -= size
+        writer.writerow(['합계', '', '', '', '', '', cost_sum, '', '', ''])
+        writer.writerow([f'{end:%Y/%m/%d}  오후 12:55:30'] + [''] * 9)
+        close_json()
+    return per_serial, seq
+
+
+def write_qc(out, fleet, scale, rng):
+    total = round(BASE_COUNTS['qc'] * scale)
+    candidates = []
+    for serial, category, registered in fleet:
+        key, _, model = category[1:].partition(') ')
+        if registered and key in QC_ITEMS:
+            candidates.append((serial, QC_ITEMS[key], model))
+    cycle_of = _weighted([('매년', 102), ('', 56), ('2차 완료', 24), ('3차 완료', 14), ('1차 완료', 6)])
+    span = (QC_RANGE[1] - QC_RANGE[0]).days
+    rows = 0
+    with open(os.path.join(out, EXCEL_DIR, 'QC_logs_fixed.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(QC_HEADER)
+        # 후보보다 많이 만들면 같은 장비가 여러 번 나온다(실제 파일에도 중복 시리얼이 있다)
+        while rows < total and candidates:
+            for serial, item, model in rng.sample(candidates, min(len(candidates), total - rows)):
+                inspected = QC_RANGE[0] + timedelta(rng.randrange(span))
+                valid_until = inspected + timedelta(364 + rng.randint(-10, 10))
+                base = valid_until + timedelta(1)
+                row = [item + ('(자)' if rng.random() < 0.2 else ''), model,
+                       str(rng.randint(1, 12)) if rng.random() < 0.95 else '', serial,
+                       f'{inspected:%Y.%m.%d}', f'{valid_until:%Y.%m.%d}',
+                       f'{base.month}/{base.day}' if rng.random() < 0.9 else '', cycle_of(rng)[0],
+                       '청명' if rng.random() < 0.1 else '', f'{inspected.month}월' if rng.random() < 0.4 else '',
+                       '', '', '', '', f'{inspected.year}년 등가성' if rng.random() < 0.15 else '', '',
+                       str(rng.randint(2015, 2020)) if rng.random() < 0.2 else '', '', '']
+                writer.writerow(row)
+                rows += 1
+    return rows
+
+
+def write_equipment_seeds(out, fleet, where, last_move, repairs):
+    """db/equipment_db.json, db/equipment_data.json(등록 장비만)."""
+    with open(os.path.join(out, 'db', 'equipment_db.json'), 'w', encoding='utf-8') as db_f, \
+            open(os.path.join(out, 'db', 'equipment_data.json'), 'w', encoding='utf-8') as data_f:
+        write_db, close_db = _json_array_writer(db_f)
+        write_data, close_data = _json_array_writer(data_f)
+        n = 0
+        for idx, (serial, category, registered) in enumerate(fleet):
+            if not registered:
+                continue
+            n += 1
+            count, cost = repairs.get(serial, (0, 0))
+            move = last_move[idx]
+            location, status, simple_status = transition(where[idx])
+            write_db({'serial': serial, 'category': category, 'currentLocation': location, 'status': status,
+                      'lastMovement': move[0].isoformat() if move else '', 'uptimeEstimatePct': 100,
+                      'repairCount': count, 'totalRepairCost': cost})
+            write_data({'index': n, '품목계열': category, '시리얼번호': serial,
+                        '날짜': f'{move[0]:%Y/%m/%d}' if move else None, '출고처': move[1] if move else None,
+                        '입고처': move[2] if move else None, '품목': category, '수량': '1' if move else None,
+                        '기타': '정상' if move else None, '비고': None, '상태': simple_status})
+        close_db()
+        close_data()
+    return n
+
+
+def generate(out, scale=1.0, seed=0):
+    """out 아래에 합성 입력 전체를 만든다. 파일별 행 수와 경과 초를 돌려준다."""
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(out, EXCEL_DIR), exist_ok=True)
+    os.makedirs(os.path.join(out, 'db'), exist_ok=True)
+    fleet = make_fleet(scale, rng)
+    counts = {'serials': write_serials(out, fleet)}
+    where, last_move, counts['movements'] = write_movements(out, fleet, scale, rng)
+    repairs, counts['repairs'] = write_repairs(out, fleet, scale, rng)
+    counts['qc'] = write_qc(out, fleet, scale, rng)
+    counts['equipment'] = write_equipment_seeds(out, fleet, where, last_move, repairs)
+    counts['elapsed'] = time.perf_counter() - started
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크용 합성 CEMS 입력 생성')
+    parser.add_argument('--scale', type=float, default=10, help='현재 데이터 대비 배수 (기본: 10)')
+    parser.add_argument('--out', required=True, help='출력 루트(아래에 청명장비 엑셀/, db/를 만든다)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = generate(args.out, args.scale, args.seed)
+    print(f"✅ 합성 데이터 생성 완료 ({args.scale:g}배, {counts.pop('elapsed'):.1f}초): {args.out}")
+    for name, n in counts.items():
+        print(f'  {name}: {n:,}행')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+일 단위 시계열의 기간 버킷/이동 구간 집계
+
+(일 번호 → 건수, 합계)를 구간 첫날부터 마지막 날까지 빈틈없는 일 배열로 펼치고 누적합(prefix sum)을
+만든다. 그 뒤로 임의 기간 [a, b]의 건수/합계는 누적합 두 값의 차이라 O(1)이다.
+  - 버킷: daily(YYYY-MM-DD), weekly(ISO 주, YYYY-Www), monthly(YYYY-MM), quarterly(YYYY-Qn)
+  - 이동 구간: 기준일까지의 최근 N일(30/90/365) 합계와 일평균
+"""
+
+from datetime import date
+from itertools import accumulate
+
+from movements_store import EPOCH_ORDINAL
+
+BUCKETS = ('daily', 'weekly', 'monthly', 'quarterly')
+ROLLING_WINDOWS = (30, 90, 365)
+
+
+def _to_date(day):
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def _to_day(d):
+    return d.toordinal() - EPOCH_ORDINAL
+
+
+def bucket_start(day, kind):
+    """day가 속한 버킷의 (라벨, 첫날 일 번호)."""
+    d = _to_date(day)
+    if kind == 'daily':
+        return d.isoformat(), day
+    if kind == 'weekly':
+        year, week, weekday = d.isocalendar()
+        return f'{year}-W{week:02d}', day - (weekday - 1)
+    if kind == 'monthly':
+        return f'{d.year:04d}-{d.month:02d}', _to_day(d.replace(day=1))
+    if kind == 'quarterly':
+        quarter = (d.month - 1) // 3
+        return f'{d.year:04d}-Q{quarter + 1}', _to_day(date(d.year, quarter * 3 + 1, 1))
+    raise ValueError(f'알 수 없는 버킷 단위: {kind}')
+
+
+def _next_start(first_day, kind):
+    if kind == 'daily':
+        return first_day + 1
+    if kind == 'weekly':
+        return first_day + 7
+    d = _to_date(first_day)
+    months = 1 if kind == 'monthly' else 3
+    month = d.month - 1 + months
+    return _to_day(date(d.year + month // 12, month % 12 + 1, 1))
+
+
+class DailySeries:
+    """연속된 일 배열 위의 건수/합계 누적합."""
+
+    def __init__(self, start_day, counts, sums):
+        self.start_day = start_day
+        self.days = len(counts)
+        self._count_prefix = [0] + list(accumulate(counts))
+        self._sum_prefix = [0] + list(accumulate(sums))
+
+    @classmethod
+    def from_days(cls, values):
+        """values: {일 번호: (건수, 합계)}. 비어 있으면 길이 0 시리즈."""
+        if not values:
+            return cls(0, [], [])
+        start = min(values)
+        n = max(values) - start + 1
+        counts = [0] * n
+        sums = [0] * n
+        for day, (count, total) in values.items():
+            counts[day - start] = count
+            sums[day - start] = total
+        return cls(start, counts, sums)
+
+    @property
+    def end_day(self):
+        return self.start_day + self.days - 1
+
+    def window(self, a, b):
+        """[a, b](일 번호, 양 끝 포함)의 (건수, 합계). 시리즈 밖은 0으로 본다. O(1)."""
+        lo = max(a, self.start_day) - self.start_day
+        hi = min(b, self.end_day) - self.start_day
+        if lo > hi:
+            return 0, 0
+        return (self._count_prefix[hi + 1] - self._count_prefix[lo],
+                self._sum_prefix[hi + 1] - self._sum_prefix[lo])
+
+    def trailing(self, end_day, n):
+        """end_day까지의 최근 n일 (건수, 합계, 일평균 건수, 일평균 합계)."""
+        count, total = self.window(end_day - n + 1, end_day)
+        return count, total, count / n, total / n
+
+    def buckets(self, kind):
+        """[(라벨, 첫날, 마지막날, 건수, 합계)]. 첫날/마지막날은 달력상 버킷 경계다."""
+        if not self.days:
+            return []
+        out = []
+        label, first = bucket_start(self.start_day, kind)
+        while first <= self.end_day:
+            nxt = _next_start(first, kind)
+            count, total = self.window(first, nxt - 1)
+            out.append((label, first, nxt - 1, count, total))
+            first = nxt
+            if first <= self.end_day:
+                label = bucket_start(first, kind)[0]
+        return out
+
+    def rolling(self, n, at_days):
+        """at_days 각 기준일의 최근 n일 (기준일, 건수, 합계, 일평균 건수, 일평균 합계)."""
+        return [(day,) + self.trailing(day, n) for day in at_days]
+
+
+def week_ends(series):
+    """시리즈 구간 안의 ISO 주 마지막 날(일요일) + 시리즈 마지막 날."""
+    if not series.days:
+        return []
+    start = series.start_day + (6 - _to_date(series.start_day).weekday())
+    out = list(range(start, series.end_day + 1, 7))
+    if not out or out[-1] != series.end_day:
+        out.append(series.end_day)
+    return out
@@ -0,0 +1,119 @@
+"""
+장비 가동률(현장 배치율) 계산
+
+시리얼별 이동 이벤트를 날짜 순으로 훑어 상태 구간을 만든다. 입고처가 '현장'인 이동
+(equipment_events.transition 기준 '가동 중')부터 그 시리얼의 다음 이동 전날까지가 배치 구간이고,
+다음 이동이 없으면 관측 종료일까지다. 첫 이동 이전은 창고(미배치)로 본다.
+'현장2'처럼 번호 붙은 현장도 배치로 본다. 규칙은 equipment_events.transition 하나에 있고, 장비 상태 화면
+(update_equipment_status.py)도 같은 규칙을 쓴다. 시리얼/일 단위 배치 질의는 같은 구간
+정의(deployed_intervals)로 만든 occupancy_index.py의 비트맵 인덱스가 맡는다.
+
+가동률 = 배치 시리얼-일 / 보유(fleet) 시리얼-일
+  - 보유 대수: 장비 마스터의 카테고리별 대수(+ 마스터에 없지만 이동 기록이 있는 시리얼)
+  - 보유 시리얼-일: 보유 대수 × 관측 일수 (월별이면 그 달과 관측 구간이 겹치는 일수)
+
+계산은 시리얼별 이벤트 정렬 후 구간 스윕이므로 이동 건수에 대해 O(n log n)이고,
+구간을 월 경계에서 자르는 비용은 구간이 걸친 달 수에 비례한다(일 단위 집합을 만들지 않는다).
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+
+from equipment_events import transition
+from movements_store import EPOCH_ORDINAL
+
+DEPLOYED_STATUS = '가동 중'
+
+
+def is_deployed(in_location):
+    return transition(in_location)[1] == DEPLOYED_STATUS
+
+
+def deployed_intervals(events, end_day):
+    """(day, deployed) 이벤트 목록에서 배치 구간 [(시작일, 종료일)]을 만든다(일 번호, 양 끝 포함).
+
+    같은 날 이동이 여러 건이면 입력 순서상 마지막 이동이 그날의 상태를 정한다.
+    """
+    ordered = sorted(events, key=lambda e: e[0])
+    out = []
+    for i, (day, deployed) in enumerate(ordered):
+        if not deployed:
+            continue
+        next_day = ordered[i + 1][0] if i + 1 < len(ordered) else end_day + 1
+        if next_day > day:
+            out.append((day, min(next_day, end_day + 1) - 1))
+    return out
+
+
+def _month_starts(start_day, end_day):
+    """[start_day, end_day]에 걸친 달의 (월 키, 시작 일 번호) 목록. 첫 달은 start_day에서 시작."""
+    d = date.fromordinal(start_day + EPOCH_ORDINAL)
+    year, month = d.year, d.month
+    out = [(f'{year:04d}-{month:02d}', start_day)]
+    while True:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        first = date(year, month, 1).toordinal() - EPOCH_ORDINAL
+        if first > end_day:
+            return out
+        out.append((f'{year:04d}-{month:02d}', first))
+
+
+def utilization_by_category(events_by_serial, fleet, start_day=None, end_day=None):
+    """카테고리별 전체/월별 가동률.
+
+    events_by_serial: serial → [(day, deployed)]
+    fleet: serial → category (보유 장비 전체)
+    반환: (overall, monthly)
+      overall: {category: {fleetSize, deployedDays, fleetDays, utilizationPct}}
+      monthly: {(month, category): {fleetSize, deployedDays, fleetDays, utilizationPct}}
+    """
+    all_days = [day for events in events_by_serial.values() for day, _ in events]
+    if start_day is None:
+        start_day = min(all_days) if all_days else 0
+    if end_day is None:
+        end_day = max(all_days) if all_days else start_day
+    if end_day < start_day:
+        return {}, {}
+
+    categories = dict(fleet)
+    for serial in events_by_serial:
+        categories.setdefault(serial, 'UNKNOWN')
+    fleet_size = defaultdict(int)
+    for category in categories.values():
+        fleet_size[category or 'UNKNOWN'] += 1
+
+    months = _month_starts(start_day, end_day)
+    month_firsts = [first for _, first in months]
+    month_days = [(month_firsts[i + 1] if i + 1 < len(months) else end_day + 1) - first
+                  for i, first in enumerate(month_firsts)]
+
+    deployed = defaultdict(int)            # category → 배치 시리얼-일
+    deployed_monthly = defaultdict(int)    # (월 인덱스, category) → 배치 시리얼-일
+    for serial, events in events_by_serial.items():
+        category = categories[serial] or 'UNKNOWN'
+        for lo, hi in deployed_intervals(events, end_day):
+            lo = max(lo, start_day)
+            if lo > hi:
+                continue
+            deployed[category] += hi - lo + 1
+            m = bisect_right(month_firsts, lo) - 1
+            while lo <= hi:
+                month_end = month_firsts[m] + month_days[m] - 1
+                seg_end = min(hi, month_end)
+                deployed_monthly[(m, category)] += seg_end - lo + 1
+                lo = seg_end + 1
+                m += 1
+
+    def summary(size, days_observed, days_deployed):
+        fleet_days = size * days_observed
+        pct = round(days_deployed / fleet_days * 100) if fleet_days else 0
+        return {'fleetSize': size, 'deployedDays': days_deployed, 'fleetDays': fleet_days, 'utilizationPct': pct}
+
+    total_days = end_day - start_day + 1
+    overall = {cat: summary(size, total_days, deployed[cat]) for cat, size in fleet_size.items()}
+    monthly = {}
+    for m, (month, _) in enumerate(months):
+        for cat, size in fleet_size.items():
+            monthly[(month, cat)] = summary(size, month_days[m], deployed_monthly.get((m, cat), 0))
+    return overall, monthly
@@ -0,0 +1,109 @@
+"""WriteBatch: 커밋 도중 중단되면 다음 배치(또는 recover)가 저널로 roll-forward한다."""
+
+import json
+import os
+
+import pytest
+
+import db_writer
+from db_writer import JOURNAL_NAME, WriteBatch, read_consistent, read_generation, recover
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_commit_bumps_generation(tmp_path):
+    db_dir = str(tmp_path)
+    with WriteBatch(db_dir) as batch:
+        batch.write_json(os.path.join(db_dir, 'a.json'), {'v': 1})
+        batch.write_json(os.path.join(db_dir, 'b.json'), {'v': 1})
+    assert batch.generation == 1
+    manifest = read_generation(db_dir)
+    assert manifest['generation'] == 1
+    assert set(manifest['files']) == {'a.json', 'b.json'}
+    assert not [name for name in os.listdir(db_dir) if name.endswith('.tmp')]
+
+
+def test_exception_leaves_previous_generation(tmp_path):
+    db_dir = str(tmp_path)
+    target = os.path.join(db_dir, 'a.json')
+    with WriteBatch(db_dir) as batch:
+        batch.write_json(target, {'v': 1})
+    with pytest.raises(RuntimeError):
+        with WriteBatch(db_dir) as batch:
+            batch.write_json(target, {'v': 2})
+            raise RuntimeError('중단')
+    assert _read(target) == {'v': 1}
+    assert read_generation(db_dir)['generation'] == 1
+    assert not [name for name in os.listdir(db_dir) if name.endswith('.tmp')]
+
+
+def test_interrupted_commit_rolls_forward(tmp_path, monkeypatch):
+    db_dir = str(tmp_path)
+    paths = [os.path.join(db_dir, f'{name}.json') for name in ('a', 'b', 'c')]
+    removed = os.path.join(db_dir, 'old.json')
+    with WriteBatch(db_dir) as batch:
+        for path in paths + [removed]:
+            batch.write_json(path, {'v': 1})
+
+    # 두 번째 rename에서 프로세스가 죽은 것처럼 만든다(저널은 이미 기록됨)
+    real_replace = os.replace
+    calls = []
+
+    def crashing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        real_replace(src, dst)
+
+    monkeypatch.setattr(db_writer.os, 'replace', crashing_replace)
+    batch = WriteBatch(db_dir)
+    for path in paths:
+        batch.write_json(path, {'v': 2})
+    batch.remove(removed)
+    with pytest.raises(KeyboardInterrupt):
+        batch.commit()
+    monkeypatch.setattr(db_writer.os, 'replace', real_replace)
+
+    # 일부만 바뀐 상태: 저널이 남아 있고 세대는 그대로
+    assert os.path.exists(os.path.join(db_dir, JOURNAL_NAME))
+    assert [_read(p)['v'] for p in paths].count(2) == 1
+    assert read_generation(db_dir)['generation'] == 1
+
+    # 다음 배치가 열릴 때 남은 rename/삭제와 매니페스트 갱신을 마저 끝낸다
+    WriteBatch(db_dir)
+    assert not os.path.exists(os.path.join(db_dir, JOURNAL_NAME))
+    assert [_read(p)['v'] for p in paths] == [2, 2, 2]
+    assert not os.path.exists(removed)
+    manifest = read_generation(db_dir)
+    assert manifest['generation'] == 2
+    assert set(manifest['files']) == {'a.json', 'b.json', 'c.json'}
+    assert all(manifest['files'][name]['generation'] == 2 for name in manifest['files'])
+    assert not [name for name in os.listdir(db_dir) if name.endswith('.tmp')]
+    assert recover(db_dir) is False
+
+
+def test_truncated_journal_is_discarded(tmp_path):
+    db_dir = str(tmp_path)
+    target = os.path.join(db_dir, 'a.json')
+    with WriteBatch(db_dir) as batch:
+        batch.write_json(target, {'v': 1})
+    # 저널을 쓰는 도중 끊기면 rename이 시작되지 않았으므로 원본이 그대로다
+    with open(os.path.join(db_dir, JOURNAL_NAME), 'w', encoding='utf-8') as f:
+        f.write('{"renames": [["')
+    assert recover(db_dir) is False
+    assert _read(target) == {'v': 1}
+    assert read_generation(db_dir)['generation'] == 1
+
+
+def test_read_consistent(tmp_path):
+    db_dir = str(tmp_path)
+    paths = [os.path.join(db_dir, 'a.json'), os.path.join(db_dir, 'b.json')]
+    with WriteBatch(db_dir) as batch:
+        for i, path in enumerate(paths):
+            batch.write_json(path, {'i': i})
+    generation, data = read_consistent(paths, db_dir)
+    assert generation == 1
+    assert data == [{'i': 0}, {'i': 1}]
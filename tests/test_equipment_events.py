@@ -0,0 +1,99 @@
+"""이벤트 로그: 스냅샷 + 재생으로 구한 state(as_of)가 처음부터 전부 재생한 결과와 같은지 확인한다."""
+
+import json
+import random
+
+import pytest
+
+from equipment_events import EventLog, apply_event, ingest_movements, transition
+
+LOCATIONS = ['현장', '현장2', '청명', '업체', '청명지하']
+
+
+def _events(n, rng):
+    events = []
+    for i in range(n):
+        day = 1 + i * 120 // n
+        events.append({
+            'src': i,
+            'date': f'2025-{1 + (day - 1) // 30:02d}-{1 + (day - 1) % 30:02d}',
+            'serial': f'S{rng.randrange(25)}',
+            'from': rng.choice(LOCATIONS),
+            'to': rng.choice(LOCATIONS),
+        })
+    return events
+
+
+def _brute_force(events, as_of=None):
+    states = {}
+    for seq, event in enumerate(events):
+        if as_of is not None and event['date'] > as_of:
+            break
+        apply_event(states, dict(event, seq=seq))
+    return states
+
+
+@pytest.fixture
+def log(tmp_path):
+    return EventLog(str(tmp_path / 'events.jsonl'), str(tmp_path / 'snapshots'), snapshot_every=37)
+
+
+def test_state_as_of_matches_replay(log):
+    events = _events(500, random.Random(5))
+    # 여러 번에 나눠 추가해도 스냅샷/현재 상태가 이어져야 한다
+    for lo in range(0, len(events), 90):
+        log.append(events[lo:lo + 90])
+
+    dates = sorted({e['date'] for e in events})
+    for as_of in ['2024-12-31'] + dates[::7] + [dates[-1], '2099-01-01']:
+        assert log.state(as_of) == _brute_force(events, as_of)
+    assert log.state() == _brute_force(events)
+
+
+def test_current_table_is_persisted(log):
+    events = _events(100, random.Random(9))
+    log.append(events)
+    with open(log.current_path, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+    assert current['offset'] == log.size()
+    assert current['states'] == _brute_force(events)
+
+
+def test_current_table_catches_up_after_interrupted_append(log):
+    events = _events(80, random.Random(13))
+    log.append(events[:60])
+    # 로그에는 기록됐지만 현재 상태 테이블을 저장하기 전에 끊긴 상황
+    with open(log.path, 'ab') as f:
+        for seq, event in enumerate(events[60:], 60):
+            f.write((json.dumps(dict(event, seq=seq), ensure_ascii=False) + '\n').encode('utf-8'))
+    assert log.state() == _brute_force(events)
+    with open(log.current_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)['offset'] == log.size()
+
+
+def test_numbered_site_is_deployed(log):
+    assert transition('현장2')[1] == '가동 중'
+    assert transition(' 현장 ')[1] == '가동 중'
+    assert transition('현장사무소')[1] == '대기 중'
+    log.append([{'src': 0, 'date': '2025-01-01', 'serial': 'A', 'from': '청명', 'to': '현장2'}])
+    assert log.state()['A']['currentLocation'] == '현장'
+
+
+def test_ingest_appended_movements(tmp_path, log):
+    rng = random.Random(21)
+    movements = [
+        {'date': e['date'], 'serial': e['serial'], 'outLocation': e['from'], 'inLocation': e['to']}
+        for e in _events(120, rng)
+    ]
+    json_path = str(tmp_path / 'movements.json')
+    source_path = str(tmp_path / 'source.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(movements[:70], f, ensure_ascii=False)
+    assert ingest_movements(log, json_path, source_path) == 70
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(movements, f, ensure_ascii=False)
+    assert ingest_movements(log, json_path, source_path) == 50
+
+    events = [{'src': i, 'date': m['date'], 'serial': m['serial'], 'from': m['outLocation'], 'to': m['inLocation']}
+              for i, m in enumerate(movements)]
+    assert log.state() == _brute_force(events)
@@ -0,0 +1,61 @@
+"""시리얼 인덱스: 복합/변형 시리얼 매칭."""
+
+from serial_index import SerialIndex, normalize_serial, serial_variants
+
+EQUIPMENT = [
+    {'serial': '4159', 'category': '(PM-10) KMS-4200'},
+    {'serial': 'TA3671', 'category': '(PM-2.5) PMS-204'},
+    {'serial': 'K1614025', 'category': '(CO) Serinus30i'},
+    {'serial': '17-1733', 'category': '(SO2) T100'},
+    {'serial': '770654', 'category': '(O3) 49i'},
+    {'serial': '770656', 'category': '(O3) 49i'},
+    {'serial': '5001/5002', 'category': '(NO2) T200'},
+]
+
+
+def _index():
+    return SerialIndex.from_equipment(EQUIPMENT)
+
+
+def test_normalize_serial():
+    assert normalize_serial(' ta 3671 ') == 'TA3671'
+    assert normalize_serial(1789.0) == '1789'
+    assert normalize_serial('1789.0') == '1789'
+    assert normalize_serial(None) == ''
+
+
+def test_exact_and_alias():
+    index = _index()
+    assert index.resolve('ta3671') == ('TA3671', 'exact')
+    # 마스터의 하이픈 시리얼은 하이픈을 뺀 별칭으로도 찾는다
+    assert index.resolve('171733') == ('17-1733', 'alias')
+    # 마스터의 복합 시리얼은 각 부분이 별칭이다
+    assert index.resolve('5002') == ('5001/5002', 'alias')
+
+
+def test_variants():
+    index = _index()
+    assert index.resolve('K1614025A') == ('K1614025', 'variant')
+    assert index.resolve('0770654') == ('770654', 'variant')
+    # 한 자리만 다른 이웃 시리얼은 추정하지 않는다
+    assert index.resolve('770655') == (None, None)
+
+
+def test_compound_lookup_with_one_known_part():
+    index = _index()
+    assert index.resolve('4159/X9999') == ('4159', 'variant')
+    assert index.resolve('X9999, K1614025A') == ('K1614025', 'variant')
+    # 같은 장비를 가리키는 부분이 여럿이어도 매칭된다
+    assert index.resolve('4159/04159') == ('4159', 'variant')
+
+
+def test_compound_lookup_with_conflicting_parts_is_ambiguous():
+    index = _index()
+    # 부분마다 다른 장비에 걸리면 첫 번째를 고르지 않고 매칭하지 않는다
+    assert index.resolve('4159/TA3671') == (None, None)
+    assert index.match('TA3671/4159') is None
+
+
+def test_serial_variants_order():
+    # 부분별로 구체적인 후보(부분 그대로)가 리비전/하이픈 제거 후보보다 앞에 온다
+    assert serial_variants('K1614025A/17-1733') == ['K1614025A', 'K1614025', '17-1733', '171733']
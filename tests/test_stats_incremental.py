@@ -0,0 +1,127 @@
+"""증분 재계산(append 이어 읽기)과 --full 전체 재계산의 결과가 같은지 확인한다."""
+
+import json
+import random
+
+from build_stats import make_prepare_repair, prepare_movement, register_stats
+from serial_index import SerialIndex
+from stats_engine import StatsEngine
+
+EQUIPMENT = [
+    {'serial': 'A100', 'category': '(PM-10) KMS-4200'},
+    {'serial': 'B200', 'category': '(PM-10) KMS-4200'},
+    {'serial': 'C300', 'category': '(CO) Serinus30i'},
+    {'serial': 'D400', 'category': '(CO) Serinus30i'},
+]
+LOCATIONS = ['현장', '현장2', '청명', '업체', '청명지하']
+COMPANIES = ['APM', '켐익', '하림']
+
+
+def _movements(n, rng):
+    rows = []
+    for i in range(n):
+        rows.append({
+            'date': f'2025-{1 + i * 6 // n:02d}-{1 + i % 28:02d}',
+            'serial': rng.choice(['A100', 'B200', 'C300', 'D400', 'Z999']),
+            'outLocation': rng.choice(LOCATIONS),
+            'inLocation': rng.choice(LOCATIONS),
+        })
+    return rows
+
+
+def _repairs(n, rng):
+    rows = []
+    for i in range(n):
+        rows.append({
+            'repair_date': f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}',
+            'serial': rng.choice(['A100', 'B200', 'C300', 'D400', 'Z999', '']),
+            'repair_company': rng.choice(COMPANIES),
+            'repair_type': rng.choice(['정도검사', '기본점검', '']),
+            'cost': rng.choice([0, 50000, '120,000', 'N/A', 330000]),
+        })
+    # 객체가 아닌 원소도 섞는다
+    rows.insert(n // 2, None)
+    return rows
+
+
+def _qc(n):
+    return [{'next_calibration_date': f'2026-{1 + i % 12:02d}-15'} for i in range(n)]
+
+
+def _write(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+def _engine(tmp_path, serial_index):
+    engine = StatsEngine()
+    engine.add_source('movements', str(tmp_path / 'movements.json'), prepare_movement)
+    engine.add_source('repairs', str(tmp_path / 'repairs.json'), make_prepare_repair(serial_index))
+    engine.add_source('qc', str(tmp_path / 'qc.json'))
+    register_stats(engine, serial_index, sketches=True)
+    return engine
+
+
+def _run(tmp_path, serial_index, state=None):
+    engine = _engine(tmp_path, serial_index)
+    engine.run(state)
+    # 상태는 JSON 파일로 저장되므로 한 번 직렬화해 다음 실행에 넘긴다
+    return engine.results(), json.loads(json.dumps(engine.get_state(), ensure_ascii=False))
+
+
+def test_append_matches_full(tmp_path):
+    rng = random.Random(7)
+    serial_index = SerialIndex.from_equipment(EQUIPMENT)
+    movements, repairs, qc = _movements(600, rng), _repairs(300, rng), _qc(40)
+
+    # 앞부분으로 한 번 돌린 뒤 뒤에 원소를 붙여 이어 읽기
+    _write(tmp_path / 'movements.json', movements[:400])
+    _write(tmp_path / 'repairs.json', repairs[:200])
+    _write(tmp_path / 'qc.json', qc[:25])
+    _, state = _run(tmp_path, serial_index)
+
+    _write(tmp_path / 'movements.json', movements)
+    _write(tmp_path / 'repairs.json', repairs)
+    _write(tmp_path / 'qc.json', qc)
+    engine = _engine(tmp_path, serial_index)
+    _, changed = engine.run(state)
+    incremental = engine.results()
+    for name, rows in (('movements', movements), ('repairs', repairs), ('qc', qc)):
+        wm = engine.watermarks[name]
+        assert wm['rows'] == len(rows)
+        # 이어 읽었으면 워터마크의 앞부분 해시가 이전 끝 위치 이후로 갱신돼 있다
+        assert wm['offset'] > state['sources'][name]['offset']
+    assert changed == {'movements', 'repairs', 'qc'}
+
+    full, _ = _run(tmp_path, serial_index)
+    assert incremental == full
+
+
+def test_unchanged_sources_are_skipped(tmp_path):
+    rng = random.Random(11)
+    serial_index = SerialIndex.from_equipment(EQUIPMENT)
+    _write(tmp_path / 'movements.json', _movements(50, rng))
+    _write(tmp_path / 'repairs.json', _repairs(30, rng))
+    _write(tmp_path / 'qc.json', _qc(5))
+    first, state = _run(tmp_path, serial_index)
+
+    engine = _engine(tmp_path, serial_index)
+    _, changed = engine.run(state)
+    assert changed == set()
+    assert engine.results() == first
+
+
+def test_rewritten_prefix_falls_back_to_full(tmp_path):
+    rng = random.Random(3)
+    serial_index = SerialIndex.from_equipment(EQUIPMENT)
+    movements = _movements(200, rng)
+    _write(tmp_path / 'movements.json', movements[:150])
+    _write(tmp_path / 'repairs.json', [])
+    _write(tmp_path / 'qc.json', [])
+    _, state = _run(tmp_path, serial_index)
+
+    # 앞부분이 바뀌면(행 삭제) 이어 읽지 않고 처음부터 다시 읽어야 한다
+    _write(tmp_path / 'movements.json', movements[1:])
+    incremental, _ = _run(tmp_path, serial_index, state)
+    full, _ = _run(tmp_path, serial_index)
+    assert incremental == full
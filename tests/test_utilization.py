@@ -0,0 +1,85 @@
+"""구간 스윕 가동률을 손으로 만든 예제와 일 단위 전수 계산으로 확인한다."""
+
+import random
+
+from movements_store import day_number
+from utilization import deployed_intervals, is_deployed, utilization_by_category
+
+
+def d(text):
+    return day_number(text)
+
+
+FLEET = {'A': 'X', 'B': 'X', 'C': 'Y'}
+EVENTS = {
+    # 1/30 현장 → 2/1 청명: 1/30, 1/31 배치
+    'A': [(d('2025-01-30'), 1), (d('2025-02-01'), 0)],
+    # 번호 붙은 현장도 배치: 1/31부터 끝(2/2)까지
+    'B': [(d('2025-01-31'), int(is_deployed('현장2')))],
+    # 같은 날 여러 건이면 마지막 이동이 그날 상태
+    'C': [(d('2025-02-02'), 1), (d('2025-02-02'), 0)],
+}
+
+
+def test_is_deployed():
+    assert is_deployed('현장')
+    assert is_deployed('현장2')
+    assert not is_deployed('업체')
+    assert not is_deployed('청명')
+    assert not is_deployed(None)
+
+
+def test_deployed_intervals():
+    end = d('2025-02-02')
+    assert deployed_intervals(EVENTS['A'], end) == [(d('2025-01-30'), d('2025-01-31'))]
+    assert deployed_intervals(EVENTS['B'], end) == [(d('2025-01-31'), end)]
+    assert deployed_intervals(EVENTS['C'], end) == []
+
+
+def test_hand_built_fixture():
+    overall, monthly = utilization_by_category(EVENTS, FLEET, d('2025-01-30'), d('2025-02-02'))
+    # X: 2대 × 4일 중 A 2일 + B 3일
+    assert overall['X'] == {'fleetSize': 2, 'deployedDays': 5, 'fleetDays': 8, 'utilizationPct': 62}
+    assert overall['Y'] == {'fleetSize': 1, 'deployedDays': 0, 'fleetDays': 4, 'utilizationPct': 0}
+    assert monthly[('2025-01', 'X')] == {'fleetSize': 2, 'deployedDays': 3, 'fleetDays': 4, 'utilizationPct': 75}
+    assert monthly[('2025-02', 'X')] == {'fleetSize': 2, 'deployedDays': 2, 'fleetDays': 4, 'utilizationPct': 50}
+    assert monthly[('2025-02', 'Y')]['deployedDays'] == 0
+
+
+def test_unknown_serials_and_default_window():
+    events = dict(EVENTS, Z=[(d('2025-01-30'), 1)])
+    overall, _ = utilization_by_category(events, FLEET)
+    # 기본 관측 구간은 최초~최종 이동일(1/30~2/2), 마스터에 없는 시리얼은 UNKNOWN
+    assert overall['UNKNOWN'] == {'fleetSize': 1, 'deployedDays': 4, 'fleetDays': 4, 'utilizationPct': 100}
+
+
+def _day_by_day(events_by_serial, fleet, start, end):
+    """날마다 그날까지의 마지막 이동으로 배치 여부를 정하는 전수 계산."""
+    deployed = {}
+    for serial, events in events_by_serial.items():
+        category = fleet.get(serial, 'UNKNOWN')
+        ordered = sorted(events, key=lambda e: e[0])
+        for day in range(start, end + 1):
+            state = 0
+            for event_day, flag in ordered:
+                if event_day > day:
+                    break
+                state = flag
+            deployed[category] = deployed.get(category, 0) + state
+    return deployed
+
+
+def test_sweep_matches_day_by_day():
+    rng = random.Random(17)
+    fleet = {f'S{i}': rng.choice(['X', 'Y', 'Z']) for i in range(12)}
+    start, end = d('2024-11-20'), d('2025-03-10')
+    events = {}
+    for serial in fleet:
+        events[serial] = [(rng.randint(start - 30, end), rng.choice([0, 1])) for _ in range(rng.randint(0, 15))]
+    overall, monthly = utilization_by_category(events, fleet, start, end)
+    expected = _day_by_day(events, fleet, start, end)
+    for category, summary in overall.items():
+        assert summary['deployedDays'] == expected.get(category, 0)
+    # 월별 배치 일수의 합은 전체와 같다
+    for category, summary in overall.items():
+        assert sum(v['deployedDays'] for (_, cat), v in monthly.items() if cat == category) == summary['deployedDays']
@@ -1,7 +1,9 @@
+import argparse
+import os
+import time
 
-
+import numpy as np
 import pandas as pd
-import os
 
 # --- Configuration ---
 desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
@@ -9,91 +11,136 @@ serials_file = os.path.join(desktop_path, "serials.csv")
 logs_file = os.path.join(desktop_path, "logs.csv")
 output_file = os.path.join(desktop_path, "장비재고현황.xlsx")
 
-# --- Main Script ---
-try:
-    # 1. Load serial numbers (col C) and categories (col B), skipping the header
-    print("1. 'serials.csv' 파일에서 장비 일련번호와 품목계열을 읽어옵니다...")
-    serials_df = pd.read_csv(serials_file, header=None, usecols=[1, 2], names=['category', 'serial'], dtype=str, encoding='cp949', skiprows=1)
+DEFAULT_START = '2024-07-16'
+DEFAULT_END = '2025-07-16'
+HOME_KEYWORD = '청명'
+
+
+def load_serials(path):
+    """serials.csv에서 (고유 일련번호 목록, 일련번호 → 품목계열 매핑)을 읽는다."""
+    serials_df = pd.read_csv(path, header=None, usecols=[1, 2], names=['category', 'serial'], dtype=str, encoding='cp949', skiprows=1)
     serials_df['serial'] = serials_df['serial'].str.strip()
     serials_df.dropna(subset=['serial'], inplace=True)
     serial_list = serials_df['serial'].unique().tolist()
-    print(f"  - 총 {len(serial_list)}개의 고유한 장비 일련번호를 찾았습니다.")
-
-    # Create a mapping from serial to category for later use
     category_map = pd.Series(serials_df.category.values, index=serials_df.serial).to_dict()
+    return serial_list, category_map
+
 
-    # 2. Load and clean the movement logs
-    print("\n2. 'logs.csv' 파일에서 장비 이동 기록을 읽고 정리합니다...")
+def load_logs(path, serial_list):
+    """logs.csv 이동 기록을 읽어 날짜/위치/시리얼을 정리하고, 대상 시리얼만 (serial, date) 순으로 정렬해 돌려준다."""
     log_column_names = ['date_raw', 'from_loc', 'to_loc', 'serial', 'quantity']
-    logs_df = pd.read_csv(logs_file, header=None, names=log_column_names, dtype={'serial': str}, encoding='cp949', skiprows=1)
+    logs_df = pd.read_csv(path, header=None, names=log_column_names, dtype={'serial': str}, encoding='cp949', skiprows=1)
 
-    # Clean data
     logs_df['date'] = pd.to_datetime(logs_df['date_raw'].astype(str).str.split('-').str[0].str.strip(), format='%Y/%m/%d', errors='coerce')
     logs_df['serial'] = logs_df['serial'].str.strip()
+    logs_df['from_loc'] = logs_df['from_loc'].astype('string').str.strip()
+    logs_df['to_loc'] = logs_df['to_loc'].astype('string').str.strip()
     logs_df.dropna(subset=['date', 'serial'], inplace=True)
 
-    # Filter logs to only include the serials we are interested in
     logs_df = logs_df[logs_df['serial'].isin(serial_list)]
-    logs_df.sort_values(by=['serial', 'date'], inplace=True)
-    print(f"  - 분석할 총 {len(logs_df)}개의 유효한 이동 기록을 찾았습니다.")
-
-    # 3. Create the inventory DataFrame
-    print("\n3. 재고 현황표를 생성합니다 (2024-07-16 ~ 2025-07-16)...")
-    date_range = pd.date_range(start='2024-07-16', end='2025-07-16')
-    inventory_df = pd.DataFrame(1, index=serial_list, columns=date_range)
-    inventory_df.index.name = '일련번호'
-    inventory_df.columns = inventory_df.columns.strftime('%Y-%m-%d')
-
-    # 4. Process logs to update inventory status
-    print("\n4. 이동 기록을 바탕으로 일별 재고를 계산합니다...")
-    for i, serial in enumerate(serial_list):
-        serial_logs = logs_df[logs_df['serial'] == serial].copy()
-        serial_logs['from_loc'] = serial_logs['from_loc'].str.strip()
-        serial_logs['to_loc'] = serial_logs['to_loc'].str.strip()
-
-        departures = serial_logs[serial_logs['from_loc'].str.contains('청명', na=False)]
-        
-        for _, departure_log in departures.iterrows():
-            departure_date = departure_log['date']
-            returns = serial_logs[
-                (serial_logs['date'] > departure_date) & 
-                (serial_logs['to_loc'].str.contains('청명', na=False))
-            ]
-            
-            if not returns.empty:
-                return_date = returns.iloc[0]['date']
-            else:
-                return_date = date_range[-1]
-
-            away_dates = pd.date_range(start=departure_date, end=return_date)
-            valid_away_dates = inventory_df.columns.intersection(away_dates.strftime('%Y-%m-%d'))
-            
-            if not valid_away_dates.empty:
-                inventory_df.loc[serial, valid_away_dates] = 0
-        
-        if (i + 1) % 30 == 0:
-            print(f"  - 처리 진행: {i+1}/{len(serial_list)} 장비 완료...")
-
-    print("  - 재고 계산이 완료되었습니다.")
-
-    # 5. Add the category column and save the result
-    print(f"\n5. 품목계열을 추가하고 최종 결과를 '{output_file}' 파일로 저장합니다...")
-    
-    # Add 'category' column using the map created earlier
-    inventory_df['품목계열'] = inventory_df.index.map(category_map)
-    
-    # Reorder columns to have '품목계열' first
-    date_columns = [col for col in inventory_df.columns if col != '품목계열']
-    final_df = inventory_df[['품목계열'] + date_columns]
-    
-    final_df.to_excel(output_file)
-    
-    print("\n--- 작업 완료 ---")
-    print(f"바탕화면의 '{os.path.basename(output_file)}' 파일에서 결과를 확인해주세요.")
-
-except FileNotFoundError as e:
-    print(f"\n[오류] 파일을 찾을 수 없습니다: {e.filename}")
-    print("바탕화면에 'serials.csv'와 'logs.csv' 파일이 있는지, 파일 이름이 정확한지 확인해주세요.")
-except Exception as e:
-    print(f"\n[오류] 스크립트 실행 중 예상치 못한 문제가 발생했습니다: {e}")
-    print("CSV 파일의 형식이나 내용이 예상과 다를 수 있습니다. (예: 날짜 형식, 열 위치, 인코딩 문제 등)")
+    return logs_df.sort_values(by=['serial', 'date'], kind='stable')
+
+
+def build_availability_matrix(serial_list, logs_df, start, end):
+    """시리얼 × 일 재고 행렬(uint8, 1=청명 재고, 0=외부)을 계산한다.
+
+    출고(출고창고에 '청명' 포함)마다 그 이후(date 초과) 첫 입고(입고창고에 '청명' 포함)일까지를
+    외부로 본다(양 끝 포함). 입고 기록이 없으면 조회 구간 끝까지 외부.
+    구간은 시리얼별 (code, day) 키를 한 번 정렬한 뒤 searchsorted로 짝짓고,
+    차분 배열 + 누적합으로 한 번에 칠한다.
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    n_serials = len(serial_list)
+    n_days = (end - start).days + 1
+    if n_days <= 0:
+        raise ValueError(f'조회 구간이 올바르지 않습니다: {start.date()} ~ {end.date()}')
+
+    codes = pd.Index(serial_list).get_indexer(logs_df['serial'])
+    days = ((logs_df['date'].dt.normalize() - start) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    departs = logs_df['from_loc'].str.contains(HOME_KEYWORD, na=False).to_numpy(dtype=bool)
+    returns = logs_df['to_loc'].str.contains(HOME_KEYWORD, na=False).to_numpy(dtype=bool)
+
+    # (시리얼, 일)을 하나의 정렬 키로 합친다. 일 번호는 구간 밖이어도 되도록 오프셋을 둔다.
+    offset = -min(int(days.min()) if len(days) else 0, 0)
+    span = max(int(days.max()) if len(days) else 0, n_days) + offset + 2
+    keys = codes.astype(np.int64) * span + (days + offset)
+
+    ret_keys = np.sort(keys[returns])
+    dep_keys = keys[departs]
+    dep_codes = codes[departs]
+    dep_days = days[departs]
+
+    # 출고 이후(같은 날 제외) 같은 시리얼의 첫 입고
+    idx = np.searchsorted(ret_keys, dep_keys, side='right')
+    has_next = idx < len(ret_keys)
+    if len(ret_keys):
+        ret_at = ret_keys[np.minimum(idx, len(ret_keys) - 1)]
+    else:
+        ret_at = np.zeros_like(dep_keys)
+    same_serial = has_next & (ret_at // span == dep_codes)
+    ret_days = np.where(same_serial, ret_at % span - offset, n_days - 1)
+
+    lo = np.clip(dep_days, 0, None)
+    hi = np.minimum(ret_days, n_days - 1)
+    keep = lo <= hi
+
+    diff = np.zeros((n_serials, n_days + 1), dtype=np.int32)
+    np.add.at(diff, (dep_codes[keep], lo[keep]), 1)
+    np.add.at(diff, (dep_codes[keep], hi[keep] + 1), -1)
+    away = np.cumsum(diff[:, :n_days], axis=1) > 0
+
+    matrix = (~away).astype(np.uint8)
+    dates = pd.date_range(start=start, end=end)
+    return matrix, dates
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='장비 일별 재고 현황표 생성')
+    parser.add_argument('--serials', default=serials_file, help='serials.csv 경로')
+    parser.add_argument('--logs', default=logs_file, help='logs.csv 경로')
+    parser.add_argument('--output', default=output_file, help='결과 엑셀 경로')
+    parser.add_argument('--start', default=DEFAULT_START, help='조회 시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', default=DEFAULT_END, help='조회 종료일 (YYYY-MM-DD)')
+    return parser.parse_args()
+
+
+# --- Main Script ---
+def main():
+    args = parse_args()
+    try:
+        # 1. Load serial numbers (col C) and categories (col B), skipping the header
+        print("1. 'serials.csv' 파일에서 장비 일련번호와 품목계열을 읽어옵니다...")
+        serial_list, category_map = load_serials(args.serials)
+        print(f"  - 총 {len(serial_list)}개의 고유한 장비 일련번호를 찾았습니다.")
+
+        # 2. Load and clean the movement logs
+        print("\n2. 'logs.csv' 파일에서 장비 이동 기록을 읽고 정리합니다...")
+        logs_df = load_logs(args.logs, serial_list)
+        print(f"  - 분석할 총 {len(logs_df)}개의 유효한 이동 기록을 찾았습니다.")
+
+        # 3-4. Build the inventory matrix
+        print(f"\n3. 재고 현황표를 생성합니다 ({args.start} ~ {args.end})...")
+        started = time.perf_counter()
+        matrix, dates = build_availability_matrix(serial_list, logs_df, args.start, args.end)
+        print(f"  - 재고 계산이 완료되었습니다. ({matrix.shape[0]}개 장비 × {matrix.shape[1]}일, {time.perf_counter() - started:.3f}초)")
+
+        # 4. Add the category column and save the result
+        print(f"\n4. 품목계열을 추가하고 최종 결과를 '{args.output}' 파일로 저장합니다...")
+        inventory_df = pd.DataFrame(matrix, index=pd.Index(serial_list, name='일련번호'), columns=dates.strftime('%Y-%m-%d'))
+        inventory_df.insert(0, '품목계열', inventory_df.index.map(category_map))
+        inventory_df.to_excel(args.output)
+
+        print("\n--- 작업 완료 ---")
+        print(f"'{os.path.basename(args.output)}' 파일에서 결과를 확인해주세요.")
+
+    except FileNotFoundError as e:
+        print(f"\n[오류] 파일을 찾을 수 없습니다: {e.filename}")
+        print("바탕화면에 'serials.csv'와 'logs.csv' 파일이 있는지, 파일 이름이 정확한지 확인해주세요.")
+    except Exception as e:
+        print(f"\n[오류] 스크립트 실행 중 예상치 못한 문제가 발생했습니다: {e}")
+        print("CSV 파일의 형식이나 내용이 예상과 다를 수 있습니다. (예: 날짜 형식, 열 위치, 인코딩 문제 등)")
+
+
+if __name__ == '__main__':
+    main()